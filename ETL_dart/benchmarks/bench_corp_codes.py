@@ -0,0 +1,112 @@
+"""corpCode.xml 파싱 벤치마크: 기존 BeautifulSoup find_all('list') vs corp_codes.iter_corp_codes
+
+사용법 (ETL_dart 에서 실행):
+    python -m benchmarks.bench_corp_codes                      # 합성 CORPCODE.xml (100,000건)
+    python -m benchmarks.bench_corp_codes --file corpCode.zip  # 실제 corpCode.xml 응답 ZIP
+"""
+import time
+import random
+import zipfile
+import argparse
+import tracemalloc
+from io import BytesIO
+from corp_codes import iter_corp_codes
+
+
+def make_corp_code_zip(count, listed_ratio=0.035, seed=0):
+    """실제 응답과 같은 구조의 CORPCODE.xml ZIP 생성 (상장사 비율은 실제와 비슷하게)"""
+    rng = random.Random(seed)
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<result>\n']
+    for i in range(count):
+        stock_code = f"{rng.randrange(1000000):06d}" if rng.random() < listed_ratio else " "
+        parts.append(
+            "<list>\n"
+            f"    <corp_code>{i:08d}</corp_code>\n"
+            f"    <corp_name>테스트기업{i}</corp_name>\n"
+            f"    <corp_eng_name>Test Corp {i}</corp_eng_name>\n"
+            f"    <stock_code>{stock_code}</stock_code>\n"
+            f"    <modify_date>2024{rng.randrange(1, 13):02d}{rng.randrange(1, 29):02d}</modify_date>\n"
+            "</list>\n"
+        )
+    parts.append("</result>\n")
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("CORPCODE.xml", "".join(parts).encode("utf-8"))
+    return buffer.getvalue()
+
+
+def parse_with_soup(content):
+    """기존 com_info / DAG 방식"""
+    from bs4 import BeautifulSoup
+    with zipfile.ZipFile(BytesIO(content)) as z:
+        with z.open(z.namelist()[0]) as f:
+            soup = BeautifulSoup(f.read(), 'xml')
+    corps = []
+    for corp in soup.find_all('list'):
+        stock_code = corp.find('stock_code').text.strip()
+        if stock_code and stock_code.isdigit():
+            corps.append((
+                corp.find('corp_code').text.strip(),
+                corp.find('corp_name').text.strip(),
+                stock_code,
+                corp.find('modify_date').text.strip()
+            ))
+    return corps
+
+
+def parse_streaming(content):
+    return [
+        (corp.corp_code, corp.corp_name, corp.stock_code, corp.modify_date)
+        for corp in iter_corp_codes(content, listed_only=True)
+    ]
+
+
+def measure(func, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(content)
+        timings.append(time.perf_counter() - started)
+    # 메모리는 별도 1회 실행으로 측정 (tracemalloc 오버헤드가 시간 측정에 섞이지 않도록)
+    tracemalloc.start()
+    func(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, min(timings), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="corpCode.xml 파싱 벤치마크")
+    parser.add_argument("--file", help="corpCode.xml API 응답 ZIP 경로 (없으면 합성 데이터)")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file, 'rb') as f:
+            content = f.read()
+    else:
+        content = make_corp_code_zip(args.count)
+    print(f"입력 ZIP: {len(content) / 1024 ** 2:.1f} MB")
+
+    candidates = [("iterparse (corp_codes)", parse_streaming)]
+    try:
+        import bs4  # noqa: F401
+        candidates.insert(0, ("BeautifulSoup find_all", parse_with_soup))
+    except ImportError:
+        print("bs4가 설치되어 있지 않아 BeautifulSoup 경로는 건너뜁니다.")
+
+    results = {}
+    print(f"{'parser':<24} {'best(s)':>9} {'peak MB':>9} {'listed':>8}")
+    for name, func in candidates:
+        corps, seconds, peak = measure(func, content, args.repeat)
+        results[name] = corps
+        print(f"{name:<24} {seconds:>9.3f} {peak / 1024 ** 2:>9.1f} {len(corps):>8}")
+
+    if len(results) == 2:
+        soup_result, stream_result = results.values()
+        print("결과 일치" if soup_result == stream_result else "⚠️ 결과 불일치")
+
+
+if __name__ == "__main__":
+    main()
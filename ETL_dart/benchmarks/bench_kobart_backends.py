@@ -0,0 +1,163 @@
+"""KoBART backend 벤치마크: PyTorch vs ONNX Runtime vs ONNX Runtime int8
+
+backend마다 별도 프로세스에서 모델 로드 시간, 1건 지연시간(latency), 배치 처리량(chunks/s),
+최대 RSS를 측정하고, PyTorch 요약문을 기준으로 ROUGE-1/2/L F1(공백 단위 토큰)을 계산한다.
+ONNX export / int8 양자화는 측정 전에 한 번 수행해 ONNX_MODEL_DIR에 저장해 둔다.
+
+사용법 (ETL_dart 에서 실행):
+    python -m benchmarks.bench_kobart_backends --from-cache 3       # DART 캐시의 큰 공시에서 청크 추출
+    python -m benchmarks.bench_kobart_backends --chunks 16            # 합성 청크
+    python -m benchmarks.bench_kobart_backends --tiny --max-length 40 # 작은 랜덤 BART로 경로만 확인
+"""
+import time
+import shutil
+import tempfile
+import argparse
+import resource
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from kobart_batch import (BatchSummarizer, SummaryRequest, BACKENDS, ONNX_MODEL_DIR, export_onnx, quantize_onnx,
+                          summary_lengths)
+from benchmarks.bench_kobart_batch import MODEL_NAME, make_chunks, tiny_model
+
+
+def ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def f1(overlap, predicted, reference):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / predicted, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(prediction, reference, n):
+    predicted, expected = ngrams(prediction.split(), n), ngrams(reference.split(), n)
+    return f1(sum((predicted & expected).values()), sum(predicted.values()), sum(expected.values()))
+
+
+def rouge_l(prediction, reference):
+    """최장 공통 부분열 기반 ROUGE-L F1 (한국어도 공백 단위로 비교)"""
+    a, b = prediction.split(), reference.split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b, 1):
+            current.append(previous[j - 1] + 1 if token == other else max(previous[j], current[j - 1]))
+        previous = current
+    return f1(previous[-1], len(a), len(b))
+
+
+def _run(backend, model_path, onnx_dir, requests, latency_samples, max_length):
+    started = time.perf_counter()
+    summarizer = BatchSummarizer.from_pretrained(model_path, backend=backend, onnx_dir=onnx_dir)
+    load_seconds = time.perf_counter() - started
+
+    def lengths(n_tokens):
+        max_len, min_len = summary_lengths(n_tokens)
+        return (max_length, min(min_len, max_length - 1)) if max_length else (max_len, min_len)
+
+    latencies = []
+    for request in requests[:latency_samples]:
+        started = time.perf_counter()
+        summarizer.generate([request.text], *lengths(request.n_tokens))
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    summaries = summarizer.summarize(requests, max_length=max_length,
+                                     min_length=min(50, max_length - 1) if max_length else None)
+    seconds = time.perf_counter() - started
+    # Linux ru_maxrss 단위: KB
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        "load": load_seconds,
+        "latency": sum(latencies) / len(latencies) if latencies else 0.0,
+        "throughput": len(requests) / seconds,
+        "peak_mb": peak_mb,
+        "summaries": summaries,
+    }
+
+
+def run_isolated(func, *args):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(func, *args).result()
+
+
+def load_requests(args, tokenizer):
+    if not args.from_cache:
+        return make_chunks(tokenizer, args.chunks, args.min_tokens, args.max_tokens)
+    from dart_cache import dart_cache
+    from report_sections import SectionExtractor, BUSINESS_PATTERNS
+    from text_normalizer import TextNormalizer
+    from text_chunker import TextChunker
+    extractor, normalizer = SectionExtractor(BUSINESS_PATTERNS), TextNormalizer()
+    chunker = TextChunker.for_huggingface(tokenizer, max_tokens=1000)
+    requests = []
+    for _, body in dart_cache.iter_largest("document.xml", args.from_cache):
+        text = extractor.extract_text(body)
+        if text:
+            for chunk in chunker.split(normalizer.normalize(text)):
+                requests.append(SummaryRequest(len(requests), chunk.text, chunk.n_tokens))
+    return requests[:args.chunks]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KoBART backend 벤치마크 (torch / onnx / onnx-int8)")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--tiny", action="store_true", help="작은 랜덤 BART 사용")
+    parser.add_argument("--from-cache", type=int, metavar="N", help="DART 캐시의 가장 큰 document.xml N건에서 청크 추출")
+    parser.add_argument("--chunks", type=int, default=16)
+    parser.add_argument("--min-tokens", type=int, default=100)
+    parser.add_argument("--max-tokens", type=int, default=900)
+    parser.add_argument("--latency-samples", type=int, default=4)
+    parser.add_argument("--max-length", type=int, default=None, help="생성 길이 고정 (짧게 하면 측정이 빨라짐)")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args(argv)
+
+    onnx_dir = ONNX_MODEL_DIR
+    if args.tiny:
+        # 랜덤 모델은 임시 디렉터리에 저장해 from_pretrained / ONNX export 경로를 그대로 사용
+        temp_dir = tempfile.mkdtemp(prefix="kobart-tiny-")
+        model, tokenizer = tiny_model()
+        model.save_pretrained(temp_dir)
+        tokenizer.save_pretrained(temp_dir)
+        model_path, onnx_dir = temp_dir, f"{temp_dir}/onnx"
+    else:
+        from transformers import AutoTokenizer
+        model_path, tokenizer = args.model, AutoTokenizer.from_pretrained(args.model)
+    requests = load_requests(args, tokenizer)
+    print(f"{len(requests)} chunks, {min(r.n_tokens for r in requests)}-{max(r.n_tokens for r in requests)} tokens")
+
+    # export / 양자화 시간은 측정에서 제외
+    if "onnx-int8" in args.backends:
+        run_isolated(quantize_onnx, model_path, onnx_dir)
+    elif "onnx" in args.backends:
+        run_isolated(export_onnx, model_path, onnx_dir)
+
+    results = {}
+    for backend in args.backends:
+        results[backend] = run_isolated(
+            _run, backend, model_path, onnx_dir, requests, args.latency_samples, args.max_length
+        )
+
+    reference = results.get("torch", {}).get("summaries")
+    print(f"\n{'backend':<10} {'load s':>7} {'latency s':>10} {'chunks/s':>9} {'peak RSS MB':>12} "
+          f"{'ROUGE-1':>8} {'ROUGE-2':>8} {'ROUGE-L':>8}")
+    for backend, result in results.items():
+        rouge = "-"
+        if reference:
+            pairs = [(p or "", r or "") for p, r in zip(result["summaries"], reference)]
+            scores = [sum(score(p, r) for p, r in pairs) / len(pairs) for score in (
+                lambda p, r: rouge_n(p, r, 1), lambda p, r: rouge_n(p, r, 2), rouge_l)]
+            rouge = " ".join(f"{score:>8.3f}" for score in scores)
+        print(f"{backend:<10} {result['load']:>7.2f} {result['latency']:>10.2f} {result['throughput']:>9.2f} "
+              f"{result['peak_mb']:>12.1f} {rouge}")
+    if args.tiny:
+        shutil.rmtree(model_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""KoBART 요약 처리량 벤치마크 (CPU): 청크별 1건씩 생성 vs kobart_batch.BatchSummarizer
+
+길이가 제각각인 합성 청크를 만들어 초당 처리 청크 수(chunks/s)를 비교한다.
+기존 방식은 청크마다 pipeline을 호출하던 것과 같이 배치 크기 1로 생성한다.
+
+사용법 (ETL_dart 에서 실행):
+    python -m benchmarks.bench_kobart_batch --chunks 32 --batch-sizes 4 8 --threads 1 4
+    python -m benchmarks.bench_kobart_batch --tiny      # 모델 다운로드 없이 작은 랜덤 BART로 경로만 측정
+"""
+import time
+import random
+import argparse
+import torch
+from kobart_batch import BatchSummarizer, SummaryRequest, summary_lengths
+
+MODEL_NAME = "digit82/kobart-summarization"
+WORDS = ("메모리 반도체 DRAM NAND 서버 모바일 수요 공급 매출 영업이익 증가 감소 전년 대비 생산 설비 투자 "
+         "연구개발 신규 사업 시장 점유율 고객 해외 법인 환율 원가 제품 부문 전략 확대 개선 합니다. 있습니다.").split()
+
+
+def tiny_model():
+    """작은 랜덤 BART + 단어 단위 tokenizer (네트워크 없이 배치 경로를 확인할 때)"""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import BartConfig, BartForConditionalGeneration, PreTrainedTokenizerFast
+
+    specials = ["<pad>", "<s>", "</s>", "<unk>"]
+    vocab = {token: i for i, token in enumerate(specials + sorted(set(WORDS)))}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend, pad_token="<pad>", bos_token="<s>", eos_token="</s>", unk_token="<unk>",
+        model_max_length=1024
+    )
+    config = BartConfig(
+        vocab_size=len(vocab), d_model=256, encoder_layers=3, decoder_layers=3,
+        encoder_attention_heads=4, decoder_attention_heads=4, encoder_ffn_dim=1024, decoder_ffn_dim=1024,
+        max_position_embeddings=1024, pad_token_id=0, bos_token_id=1, eos_token_id=2,
+        decoder_start_token_id=2, forced_eos_token_id=2
+    )
+    torch.manual_seed(0)
+    return BartForConditionalGeneration(config), tokenizer
+
+
+def make_chunks(tokenizer, count, min_tokens, max_tokens, seed=0):
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_tokens, max_tokens)))
+        n_tokens = len(tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"])
+        requests.append(SummaryRequest(i, text, n_tokens))
+    return requests
+
+
+def run_sequential(summarizer, requests):
+    """기존 summarize_text처럼 청크마다 따로 생성"""
+    for request in requests:
+        summarizer.generate([request.text], *summary_lengths(request.n_tokens))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KoBART 배치 요약 처리량 벤치마크")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--tiny", action="store_true", help="작은 랜덤 BART 사용")
+    parser.add_argument("--chunks", type=int, default=32)
+    parser.add_argument("--min-tokens", type=int, default=100)
+    parser.add_argument("--max-tokens", type=int, default=900)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--threads", type=int, nargs="+", default=[torch.get_num_threads()])
+    parser.add_argument("--max-length", type=int, default=None, help="생성 길이 고정 (짧게 하면 측정이 빨라짐)")
+    args = parser.parse_args(argv)
+
+    if args.tiny:
+        model, tokenizer = tiny_model()
+        summarizer = BatchSummarizer(model, tokenizer)
+    else:
+        summarizer = BatchSummarizer.from_pretrained(args.model)
+        tokenizer = summarizer.tokenizer
+    requests = make_chunks(tokenizer, args.chunks, args.min_tokens, args.max_tokens)
+    if args.max_length:
+        generate = summarizer.generate
+        summarizer.generate = lambda texts, max_length, min_length: generate(
+            texts, args.max_length, min(min_length, args.max_length - 1)
+        )
+    print(f"{len(requests)} chunks, {min(r.n_tokens for r in requests)}-{max(r.n_tokens for r in requests)} tokens")
+
+    print(f"{'threads':>7} {'mode':<12} {'seconds':>8} {'chunks/s':>9}")
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        started = time.perf_counter()
+        run_sequential(summarizer, requests)
+        seconds = time.perf_counter() - started
+        print(f"{threads:>7} {'sequential':<12} {seconds:>8.2f} {len(requests) / seconds:>9.2f}")
+        for batch_size in args.batch_sizes:
+            summarizer.batch_size = batch_size
+            started = time.perf_counter()
+            summarizer.summarize(requests)
+            seconds = time.perf_counter() - started
+            print(f"{threads:>7} {f'batch={batch_size}':<12} {seconds:>8.2f} {len(requests) / seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""document.xml 섹션 추출 벤치마크: 기존 BeautifulSoup 방식 vs report_sections.SectionExtractor
+
+각 추출기를 별도 프로세스에서 실행해 시간과 최대 RSS를 비교한다.
+
+사용법 (ETL_dart 에서 실행):
+    python -m benchmarks.bench_section_extractor --from-cache 5          # DART 캐시의 가장 큰 공시 5건
+    python -m benchmarks.bench_section_extractor --file a.zip b.zip      # document.xml 응답 ZIP
+    python -m benchmarks.bench_section_extractor --sections 400          # 합성 보고서
+"""
+import re
+import time
+import random
+import zipfile
+import argparse
+import resource
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from report_sections import SectionExtractor, BUSINESS_PATTERNS
+
+
+def make_report_zip(sections, paragraphs=40, seed=0):
+    """DART 보고서와 같은 TITLE/SUBTITLE/P/TABLE 구조의 합성 document.xml ZIP"""
+    rng = random.Random(seed)
+    titles = ["사업의 개요", "주요 제품 및 서비스", "원재료 및 생산설비", "매출 및 수주상황", "재무에 관한 사항",
+              "이사회 등 회사의 기관에 관한 사항", "주주에 관한 사항", "임원 및 직원 등에 관한 사항"]
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n<DOCUMENT><BODY>\n']
+    for i in range(sections):
+        parts.append(f'<SECTION-1><TITLE ATOC="Y">{i + 1}. {titles[i % len(titles)]}</TITLE>\n')
+        for j in range(paragraphs):
+            if j % 10 == 0:
+                parts.append(f"<SUBTITLE>가. 세부 항목 {j}</SUBTITLE>\n")
+            sentence = f"당사는 {rng.choice(['반도체', '디스플레이', '모바일', '가전'])} 부문에서 {rng.randrange(1000)}억원의 매출을 기록하였습니다."
+            parts.append(f"<P>{sentence}</P>\n")
+            if j % 8 == 0:
+                cells = "".join(f"<TD><P>{rng.randrange(10 ** 6):,}</P></TD>" for _ in range(6))
+                parts.append(f"<TABLE><TR>{cells}</TR><TR>{cells}</TR></TABLE>\n")
+        parts.append("</SECTION-1>\n")
+    parts.append("</BODY></DOCUMENT>\n")
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("report.xml", "".join(parts).encode("utf-8"))
+    return buffer.getvalue()
+
+
+def extract_with_soup(report):
+    """기존 big5_ETL_pipeline.extract_section (패턴 × 제목 × find_next 순회)"""
+    from bs4 import BeautifulSoup
+    with zipfile.ZipFile(BytesIO(report)) as z:
+        xml_content = z.read(z.namelist()[0]).decode('utf-8', errors='ignore')
+    soup = BeautifulSoup(xml_content, 'xml')
+    all_titles = soup.find_all(['TITLE', 'SUBTITLE'])
+    contents = []
+    for patterns in BUSINESS_PATTERNS.values():
+        for pattern in patterns:
+            for title in all_titles:
+                if re.search(pattern, title.get_text(strip=True), re.IGNORECASE):
+                    section_content = []
+                    current = title.find_next()
+                    safety_counter = 0
+                    while current and current.name != 'TITLE' and safety_counter < 1000:
+                        safety_counter += 1
+                        if current.name in ['P', 'TABLE', 'SPAN', 'SUBTITLE']:
+                            text = current.get_text(strip=True)
+                            if text and len(text) > 5:
+                                if not any(skip in text for skip in ['참고하시기 바랍니다', '참조하시기 바랍니다']):
+                                    section_content.append(text)
+                        current = current.find_next()
+                    for text in section_content:
+                        if text not in contents:
+                            contents.append(text)
+    return "\n".join(contents) if contents else None
+
+
+def extract_streaming(report):
+    return SectionExtractor(BUSINESS_PATTERNS).extract_text(report)
+
+
+def _run(name, report):
+    extractor = {"soup": extract_with_soup, "stream": extract_streaming}[name]
+    started = time.perf_counter()
+    text = extractor(report)
+    seconds = time.perf_counter() - started
+    # Linux ru_maxrss 단위: KB
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, len(text or "")
+
+
+def run_isolated(name, report):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(_run, name, report).result()
+
+
+def load_reports(args):
+    if args.file:
+        for path in args.file:
+            with open(path, 'rb') as f:
+                yield path, f.read()
+    elif args.from_cache:
+        from dart_cache import dart_cache
+        for content_hash, body in dart_cache.iter_largest("document.xml", args.from_cache):
+            yield content_hash[:12], body
+    else:
+        yield f"synthetic({args.sections} sections)", make_report_zip(args.sections)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="document.xml 섹션 추출 벤치마크")
+    parser.add_argument("--file", nargs="+", help="document.xml 응답 ZIP 경로")
+    parser.add_argument("--from-cache", type=int, metavar="N", help="DART 캐시의 가장 큰 document.xml N건")
+    parser.add_argument("--sections", type=int, default=300, help="합성 보고서 섹션 수")
+    args = parser.parse_args(argv)
+
+    extractors = ["stream"]
+    try:
+        import bs4  # noqa: F401
+        extractors.insert(0, "soup")
+    except ImportError:
+        print("bs4가 설치되어 있지 않아 BeautifulSoup 경로는 건너뜁니다.")
+
+    print(f"{'report':<28} {'MB':>6} {'extractor':<9} {'seconds':>9} {'peak RSS MB':>12} {'chars':>9}")
+    for name, report in load_reports(args):
+        for extractor in extractors:
+            seconds, peak_mb, chars = run_isolated(extractor, report)
+            print(f"{name:<28} {len(report) / 1024 ** 2:>6.1f} {extractor:<9} {seconds:>9.2f} {peak_mb:>12.1f} {chars:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""유사 문장 제거 벤치마크: 기존 O(n²) 단어 Jaccard vs sentence_dedup.NearDuplicateFilter (MinHash/LSH)
+
+문장 수별 처리 시간과 남은 문장 수, 그리고 삽입한 유사 문장을 얼마나 찾았는지(재현율)를 출력한다.
+
+사용법 (ETL_dart 에서 실행):
+    python -m benchmarks.bench_sentence_dedup
+    python -m benchmarks.bench_sentence_dedup --sizes 1000 10000 50000 --legacy-max 5000
+"""
+import time
+import random
+import argparse
+from sentence_dedup import NearDuplicateFilter
+
+WORDS = ("메모리 반도체 DRAM NAND 서버 모바일 수요 공급 매출 영업이익 증가 감소 전년 대비 생산 설비 투자 "
+         "연구개발 신규 사업 시장 점유율 고객 해외 법인 환율 원가 제품 부문 전략 확대 개선").split()
+
+
+def legacy_remove_duplicate_sentences(sentences):
+    """big5_ETL_pipeline의 기존 Jaccard 버전"""
+    unique_sentences = []
+    seen_content = set()
+    for sentence in sentences:
+        normalized = ' '.join(sentence.lower().split())
+        words = set(normalized.split())
+        is_duplicate = False
+        for seen in seen_content:
+            common_words = words.intersection(set(seen.split()))
+            if len(common_words) > len(words) * 0.6:
+                is_duplicate = True
+                break
+        if not is_duplicate and len(normalized) > 10:
+            unique_sentences.append(sentence)
+            seen_content.add(normalized)
+    return unique_sentences
+
+
+def make_sentences(count, duplicate_ratio=0.2, seed=0):
+    """무작위 문장 + 앞 문장을 살짝 바꾼 유사 문장. (문장 목록, 유사 문장 위치 집합) 반환"""
+    rng = random.Random(seed)
+    sentences = []
+    duplicates = set()
+    for i in range(count):
+        if sentences and rng.random() < duplicate_ratio:
+            words = rng.choice(sentences).split()
+            # 단어 하나만 바꿔 유사 문장 생성
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            duplicates.add(i)
+            sentences.append(" ".join(words))
+        else:
+            sentences.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))) + f" {i}호")
+    return sentences, duplicates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="유사 문장 제거 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000])
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--legacy-max", type=int, default=5000, help="이보다 큰 입력은 기존 방식 측정 생략")
+    args = parser.parse_args(argv)
+
+    dedup = NearDuplicateFilter(threshold=args.threshold)
+    print(f"bands={dedup.bands} rows={dedup.rows}")
+    print(f"{'sentences':>10} {'legacy s':>9} {'kept':>7} {'minhash s':>10} {'kept':>7} {'dup recall':>10}")
+    for size in args.sizes:
+        sentences, duplicates = make_sentences(size)
+        if size <= args.legacy_max:
+            started = time.perf_counter()
+            legacy_kept = len(legacy_remove_duplicate_sentences(sentences))
+            legacy = f"{time.perf_counter() - started:>9.2f} {legacy_kept:>7}"
+        else:
+            legacy = f"{'-':>9} {'-':>7}"
+        started = time.perf_counter()
+        mask = dedup.keep_mask(sentences)
+        seconds = time.perf_counter() - started
+        recall = sum(not mask[i] for i in duplicates) / len(duplicates) if duplicates else 1.0
+        print(f"{size:>10} {legacy} {seconds:>10.2f} {sum(mask):>7} {recall:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""요약 캐시 재사용률 벤치마크: 토큰 예산 기준 청크 경계 vs 내용 기준(anchor) 청크 경계
+
+이전 보고서를 청크로 나눠 캐시에 넣었다고 보고, 문장 일부를 추가/삭제/수정한 다음 보고서의 청크 중
+캐시에 있는 것(모델에 다시 보내지 않아도 되는 것)의 비율과 토큰 수를 비교한다.
+청크 경계가 앞부분 변경에 밀리면 뒤쪽의 바뀌지 않은 문단도 캐시를 쓰지 못한다.
+
+사용법 (ETL_dart 에서 실행):
+    python -m benchmarks.bench_summary_cache --sentences 800 --edits 5 20 --anchors 0 8 16 32
+    python -m benchmarks.bench_summary_cache --model digit82/kobart-summarization   # 실제 tokenizer 사용
+"""
+import random
+import argparse
+from summary_cache import normalize_chunk
+from text_chunker import TextChunker
+from benchmarks.bench_kobart_batch import WORDS, tiny_model
+
+
+def make_report(rng, count):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))) + "다." for _ in range(count)]
+
+
+def next_report(rng, sentences, edits):
+    """문장 edits개를 임의 위치에서 추가 / 삭제 / 수정"""
+    sentences = list(sentences)
+    for _ in range(edits):
+        position = rng.randrange(len(sentences))
+        action = rng.choice(("insert", "delete", "replace"))
+        new = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))) + "다."
+        if action == "insert":
+            sentences.insert(position, new)
+        elif action == "delete" and len(sentences) > 1:
+            del sentences[position]
+        else:
+            sentences[position] = new
+    return sentences
+
+
+def reuse(chunker, previous, current):
+    cached = {normalize_chunk(chunk.text) for chunk in chunker.split(previous)}
+    chunks = chunker.split(current)
+    hits = [chunk for chunk in chunks if normalize_chunk(chunk.text) in cached]
+    return len(chunks), len(hits), sum(chunk.n_tokens for chunk in chunks), sum(chunk.n_tokens for chunk in hits)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="요약 캐시 재사용률 벤치마크 (청크 경계 방식별)")
+    parser.add_argument("--model", help="Hugging Face tokenizer 이름 (기본: 단어 단위 tokenizer)")
+    parser.add_argument("--sentences", type=int, default=800)
+    parser.add_argument("--edits", type=int, nargs="+", default=[1, 5, 20, 50], help="보고서 사이 변경 문장 수")
+    parser.add_argument("--anchors", type=int, nargs="+", default=[0, 8, 16, 32], help="anchor_every (0: 토큰 예산 기준)")
+    parser.add_argument("--max-tokens", type=int, default=1000)
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.model:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(args.model)
+    else:
+        _, tokenizer = tiny_model()
+
+    print(f"{'edits':>5} {'anchor':>6} {'chunks':>7} {'reused':>7} {'tokens saved':>13}")
+    for edits in args.edits:
+        for anchor_every in args.anchors:
+            chunker = TextChunker.for_huggingface(tokenizer, args.max_tokens, overlap_tokens=0,
+                                                  anchor_every=anchor_every)
+            totals = [0, 0, 0, 0]
+            for trial in range(args.trials):
+                rng = random.Random(trial)
+                previous = make_report(rng, args.sentences)
+                current = next_report(rng, previous, edits)
+                totals = [a + b for a, b in zip(totals, reuse(chunker, " ".join(previous), " ".join(current)))]
+            chunks, hits, tokens, saved = totals
+            print(f"{edits:>5} {anchor_every:>6} {chunks / args.trials:>7.1f} {hits / chunks:>7.0%} "
+                  f"{saved / tokens:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""텍스트 정규화 벤치마크: 기존 preprocess_text + clean_text vs text_normalizer.TextNormalizer
+
+문서 크기별 처리량(MB/s)과 normalize_batch의 worker 수별 처리량을 출력한다.
+
+사용법 (ETL_dart 에서 실행):
+    python -m benchmarks.bench_text_normalizer
+    python -m benchmarks.bench_text_normalizer --sizes 10000 100000 1000000 --batch 200 --workers 1 4
+"""
+import re
+import time
+import random
+import argparse
+from text_normalizer import TextNormalizer
+
+COMPANY = "SK하이닉스"
+
+
+def legacy_preprocess_text(text, company_name, rating_pattern):
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"[^\w\s.,!?]", "", text)
+    text = re.sub(fr"({company_name})\b.*?\b\1", r"\1", text)
+    text = re.sub(r"(?i)([A-Za-z]* ?Bonds? -? [0-9A-Za-z ]+|Issuer Credit Rating|채권보다는|원리금 지급능력|기업신용평가)", "", text)
+    text = re.sub(r"(?i)(Moodys|S&P|Fitch|한국기업평가|한국신용평가)", "", text)
+    text = re.sub(rating_pattern, "", text)
+    return text.strip()
+
+
+def legacy_clean_text(text):
+    text = re.sub(r'(?:Lt\.,?\s*)+', 'Ltd.', text)
+    text = re.sub(r'\b\d+(?:,\d+)*\b(?:\s*\b\d+(?:,\d+)*\b)+', '', text)
+    text = re.sub(r'SK\s+[Hh]ynix\s+(?:Semiconductor|Semionutor)\s+[A-Za-z]+\s+(?:Ltd\.|Inc\.)', 'SK하이닉스', text)
+    text = re.sub(r'(?:Co\.,?|Corp\.,?|Inc\.,?)\s*', '', text)
+    text = re.sub(r'(?:SK하이닉스|에스케이하이닉스)\s*주식회사', 'SK하이닉스', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+# 기존 등급 패턴은 C, D를 단어 경계 없이 지워 영문 단어의 c/d까지 삭제했다.
+# 결과 비교에는 새 모듈과 같은 단어 단위 패턴을 쓰고, 속도 측정에는 원래 패턴을 쓴다.
+LEGACY_RATING = r"(?i)(AAA|AA|A3|BBB|BB|CCC|CC|C|D)([\s-]*안정적|[\s-]*부정적|[\s-]*긍정적)?"
+BOUNDED_RATING = r"(?i)\b(?:AAA|AA|A3|BBB|BB|CCC|CC|C|D)\b(?:[\s-]*안정적|[\s-]*부정적|[\s-]*긍정적)?"
+
+
+def legacy_normalize(text, rating_pattern=LEGACY_RATING):
+    return legacy_clean_text(legacy_preprocess_text(text, COMPANY, rating_pattern))
+
+
+def make_document(size, seed=0):
+    rng = random.Random(seed)
+    sentences = [
+        "당사는 메모리 반도체를 주력으로 DRAM과 NAND Flash 제품을 생산하고 있습니다.",
+        "SK Hynix Semiconductor America Inc. 등 해외 판매법인을 운영하고 있습니다.",
+        "에스케이하이닉스 주식회사의 신용등급은 AA 안정적 으로 평가되었습니다.",
+        "매출액은 32,765,719 44,621,568 42,997,792 백만원을 기록하였습니다.",
+        "Moodys 및 S&P의 Issuer Credit Rating은 Baa2 수준입니다.",
+        "SK Hynix Semiconductor China Lt., Lt. 는 우시 공장을 운영합니다.",
+        "(주요 제품) 서버용 고대역폭 메모리(HBM)의 수요가 확대되고 있습니다.",
+        "Samsung Electronics Co., Ltd. 와의 경쟁이 심화되고 있습니다.",
+    ]
+    parts = []
+    length = 0
+    while length < size:
+        sentence = rng.choice(sentences) + ("\n" if rng.random() < 0.2 else " ")
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size]
+
+
+def throughput(func, docs, repeat):
+    total_mb = sum(len(doc.encode("utf-8")) for doc in docs) / 1024 ** 2
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for doc in docs:
+            func(doc)
+        best = min(best, time.perf_counter() - started)
+    return total_mb / best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="텍스트 정규화 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=100, help="batch 측정용 문서 수 (각 100KB)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    normalizer = TextNormalizer()
+    print(f"{'chars':>10} {'legacy MB/s':>12} {'new MB/s':>10} {'speedup':>8}  same output")
+    for size in args.sizes:
+        doc = make_document(size)
+        # 큰 문서는 반복 횟수를 줄여 전체 실행 시간을 제한
+        repeat = args.repeat if size <= 1_000_000 else 1
+        legacy = throughput(legacy_normalize, [doc], repeat)
+        new = throughput(lambda d: normalizer.normalize(d, COMPANY), [doc], repeat)
+        same = legacy_normalize(doc, BOUNDED_RATING) == normalizer.normalize(doc, COMPANY)
+        print(f"{size:>10} {legacy:>12.2f} {new:>10.2f} {new / legacy:>7.1f}x  {same}")
+
+    docs = [(make_document(100_000, seed=i), COMPANY) for i in range(args.batch)]
+    total_mb = sum(len(doc.encode("utf-8")) for doc, _ in docs) / 1024 ** 2
+    print(f"\nnormalize_batch: {args.batch} docs x 100K chars ({total_mb:.1f} MB)")
+    for workers in args.workers:
+        started = time.perf_counter()
+        normalizer.normalize_batch(docs, workers=workers)
+        seconds = time.perf_counter() - started
+        print(f"workers={workers:<3} {seconds:>7.2f}s {total_mb / seconds:>8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
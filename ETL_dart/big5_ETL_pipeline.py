@@ -1,17 +1,54 @@
 import requests
 import json
-import re
 import os
-import zipfile
-import xml.etree.ElementTree as ET
-from io import BytesIO
-from bs4 import BeautifulSoup
+import multiprocessing
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
-from transformers import pipeline, AutoTokenizer
+from passage_index import build_passage_index, ensure_passage_mapping
+from dart_client import DartClient
+from corp_codes import iter_corp_codes
+from report_sections import SectionExtractor, BUSINESS_PATTERNS
+from text_normalizer import TextNormalizer
+from sentence_dedup import NearDuplicateFilter
+from dart_quota import QuotaExceeded
+from etl_watermark import WatermarkStore
+from summary_status import is_failed_summary
+from summary_worker import SummaryClient, SUMMARY_WORKER_URL
+from staged_pipeline import Stage, StagedPipeline
+
+# run()의 단계별 동시성: DART 조회/다운로드 스레드, XML 파싱 프로세스, 요약 배치 크기, ES 업로드 스레드
+PIPELINE_FETCH_WORKERS = int(os.getenv('PIPELINE_FETCH_WORKERS', 4))
+PIPELINE_EXTRACT_WORKERS = int(os.getenv('PIPELINE_EXTRACT_WORKERS', 2))
+PIPELINE_SUMMARY_BATCH = int(os.getenv('PIPELINE_SUMMARY_BATCH', 8))
+PIPELINE_UPLOAD_WORKERS = int(os.getenv('PIPELINE_UPLOAD_WORKERS', 2))
+# 단계 사이 큐 크기: 다음 단계가 밀리면 앞 단계가 기다려 메모리에 쌓이는 문서 수를 제한
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 4))
+# 같은 index를 쓰는 OpenAI 파이프라인과 보고서 종류가 달라 watermark를 따로 둠
+WATERMARK_REPORT_KIND = "kobart:business"
+
+_section_extractor = None
+
+
+def extract_business_sections(report):
+    """Extract business-related sections from the report ZIP/XML (also the process-pool entry point)"""
+    global _section_extractor
+    if _section_extractor is None:
+        _section_extractor = SectionExtractor(BUSINESS_PATTERNS)
+    sections = _section_extractor.extract(report)
+    for section in sections:
+        print(f"Found section: {section.title} ({section.label}, {sum(1 for _ in section.iter_blocks())} blocks)")
+    
+    contents = [block for section in sections for block in section.iter_blocks()]
+    if not contents:
+        print("No business-related sections found")
+        return None
+    
+    return "\n".join(contents)
+
 
 class BusinessAnalysisSystem:
-    def __init__(self):
+    def __init__(self, summary_backend=None, summary_worker_url=SUMMARY_WORKER_URL):
         # Load environment variables
         load_dotenv()
         
@@ -21,6 +58,7 @@ class BusinessAnalysisSystem:
             raise ValueError("DART_API_KEY environment variable is not set")
             
         self.base_url = "https://opendart.fss.or.kr/api"
+        self.dart = DartClient(self.api_key)
         self.companies = {
             "삼성전자": "005930",
             "SK하이닉스": "000660",
@@ -29,36 +67,36 @@ class BusinessAnalysisSystem:
             "카카오": "035720"
         }
         self.corp_codes = {}
+        self.modify_dates = {}
+        self.normalizer = TextNormalizer()
+        self.dedup = NearDuplicateFilter()
         
         # Elasticsearch settings
         self.es_url = os.getenv("ELASTICSEARCH_URL")
         self.index_name = os.getenv("INDEX_NAME", "business_overview")
         
         # KoBART model setup
-        print("Loading KoBART model...")
         self.model_name = "digit82/kobart-summarization"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.summarizer = pipeline("summarization", model=self.model_name, tokenizer=self.tokenizer)
-        print("Model loaded successfully")
+        if summary_worker_url:
+            # 요약 워커가 모델을 들고 있으므로 여기서는 로드하지 않음
+            print(f"Using summary worker at {summary_worker_url}")
+            self.summary_service = SummaryClient(summary_worker_url)
+        else:
+            # summary_backend: torch / onnx / onnx-int8 (기본: SUMMARY_BACKEND)
+            # torch/transformers는 로컬에서 요약할 때만 import
+            from kobart_batch import DocumentSummarizer
+            print("Loading KoBART model...")
+            self.summary_service = DocumentSummarizer(self.model_name, summary_backend)
+            print("Model loaded successfully")
 
     def download_corp_codes(self):
         """Download company unique codes"""
-        url = f"{self.base_url}/corpCode.xml"
-        params = {"crtfc_key": self.api_key}
-        
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            response = self.dart.get("corpCode.xml")
             
-            with zipfile.ZipFile(BytesIO(response.content)) as zf:
-                xml_data = zf.read('CORPCODE.xml')
-                
-            root = ET.fromstring(xml_data)
-            for company in root.findall('.//list'):
-                corp_code = company.findtext('corp_code')
-                stock_code = company.findtext('stock_code')
-                if stock_code and stock_code.strip():
-                    self.corp_codes[stock_code] = corp_code
+            for corp in iter_corp_codes(response.content, listed_only=True):
+                self.corp_codes[corp.stock_code] = corp.corp_code
+                self.modify_dates[corp.corp_code] = corp.modify_date
             
             print("Corporate code list downloaded successfully")
             
@@ -68,16 +106,12 @@ class BusinessAnalysisSystem:
 
     def get_company_info(self, company_name, stock_code):
         """Get basic company information"""
-        url = f"{self.base_url}/company.json"
         params = {
-            "crtfc_key": self.api_key,
             "stock_code": stock_code
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self.dart.get_json("company.json", params)
             
             if data.get("status") == "000":
                 return {
@@ -100,9 +134,7 @@ class BusinessAnalysisSystem:
 
     def get_business_report(self, corp_code):
         """Retrieve business report information"""
-        url = f"{self.base_url}/list.json"
         params = {
-            "crtfc_key": self.api_key,
             "corp_code": corp_code,
             "bgn_de": "20230101",
             "end_de": datetime.now().strftime("%Y%m%d"),
@@ -111,295 +143,60 @@ class BusinessAnalysisSystem:
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self.dart.get_json("list.json", params)
         except requests.exceptions.RequestException as e:
             print(f"Error retrieving business report (corp_code: {corp_code}): {e}")
             return None
 
     def download_report(self, rcept_no):
-        """Download business report document"""
-        url = f"{self.base_url}/document.xml"
+        """Download business report document ZIP (served from the DART cache once fetched)"""
         params = {
-            "crtfc_key": self.api_key,
             "rcept_no": rcept_no
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            with zipfile.ZipFile(BytesIO(response.content)) as z:
-                file_list = z.namelist()
-                if not file_list:
-                    raise ValueError("ZIP file is empty")
-                
-                xml_content = z.read(file_list[0]).decode('utf-8', errors='ignore')
-                
-                # Debug: Save XML file
-                debug_dir = "debug"
-                os.makedirs(debug_dir, exist_ok=True)
-                debug_file = os.path.join(debug_dir, f"report_{rcept_no}.xml")
-                with open(debug_file, 'w', encoding='utf-8') as f:
-                    f.write(xml_content)
-                print(f"- XML file saved: {debug_file}")
-                
-                return xml_content
+            # ZIP 그대로 반환: extract_section이 ZIP 멤버를 바로 스트리밍 파싱
+            return self.dart.get_bytes("document.xml", params)
                 
+        except QuotaExceeded:
+            raise
         except Exception as e:
             print(f"Error downloading report (rcept_no: {rcept_no}): {e}")
             return None
 
-    def extract_section(self, xml_content):
-        """Extract business-related sections from XML content"""
+    def extract_section(self, report):
+        """Extract business-related sections from the report ZIP/XML in a single streaming pass"""
         print("Starting section extraction...")
-        soup = BeautifulSoup(xml_content, 'xml')
-        
-        business_patterns = {
-            "사업개요": [
-                r"사업의\s*개요",
-                r"기업의\s*개요",
-                r"회사의\s*개요",
-                r"기업개요",
-                r"사업개요"
-            ],
-            "주요사업": [
-                r"주요\s*사업",
-                r"주요제품",
-                r"주요.*현황",
-                r"사업의\s*내용",
-                r"사업내용"
-            ],
-            "영업개황": [
-                r"영업의\s*개황",
-                r"영업\s*개황",
-                r"사업의\s*현황"
-            ]
-        }
-        
-        print("Searching for section titles...")
-        all_titles = soup.find_all(['TITLE', 'SUBTITLE'])
-        print(f"Found {len(all_titles)} title elements")
-        contents = []
-        
-        for pattern_type, patterns in business_patterns.items():
-            print(f"\nProcessing {pattern_type} patterns...")
-            for pattern in patterns:
-                for title in all_titles:
-                    title_text = title.get_text(strip=True)
-                    if re.search(pattern, title_text, re.IGNORECASE):
-                        print(f"\nFound section: {title_text}")
-                        
-                        section_content = []
-                        current = title.find_next()
-                        safety_counter = 0
-                        max_iterations = 1000
-                        
-                        while current and current.name != 'TITLE' and safety_counter < max_iterations:
-                            safety_counter += 1
-                            if current.name in ['P', 'TABLE', 'SPAN', 'SUBTITLE']:
-                                text = current.get_text(strip=True)
-                                if text and len(text) > 5:
-                                    if not any(skip in text for skip in ['참고하시기 바랍니다', '참조하시기 바랍니다']):
-                                        section_content.append(text)
-                                        print(f"Found content: {text[:50]}...")
-                            current = current.find_next()
-                        
-                        if safety_counter >= max_iterations:
-                            print("Warning: Maximum iteration limit reached")
-                        
-                        if section_content:
-                            print(f"Processing {len(section_content)} content blocks...")
-                            cleaned_content = []
-                            for text in section_content:
-                                if text not in cleaned_content:
-                                    cleaned_content.append(text)
-                            
-                            contents.extend(cleaned_content)
-        
-        if not contents:
-            print("No business-related sections found")
-            return None
-        
-        return "\n".join(contents)
+        return extract_business_sections(report)
 
     def preprocess_text(self, text, company_name):
         """Preprocess text for summarization"""
-        text = re.sub(r"\s+", " ", text)
-        text = re.sub(r"[^\w\s.,!?]", "", text)
-        text = re.sub(fr"({company_name})\b.*?\b\1", r"\1", text)
-        text = re.sub(r"(?i)([A-Za-z]* ?Bonds? -? [0-9A-Za-z ]+|Issuer Credit Rating|채권보다는|원리금 지급능력|기업신용평가)", "", text)
-        text = re.sub(r"(?i)(Moodys|S&P|Fitch|한국기업평가|한국신용평가)", "", text)
-        text = re.sub(r"(?i)(AAA|AA|A3|BBB|BB|CCC|CC|C|D)([\s-]*안정적|[\s-]*부정적|[\s-]*긍정적)?", "", text)
-        return text.strip()
-
-    def chunk_text(self, text, max_tokens=1000):
-            """Split text into chunks that won't exceed token limit"""
-            sentences = text.split('. ')
-            chunks = []
-            current_chunk = []
-            current_length = 0
-            
-            for sentence in sentences:
-                sentence_tokens = len(self.tokenizer.encode(sentence))
-                if current_length + sentence_tokens > max_tokens:
-                    if current_chunk:  # 현재 청크가 있으면 저장
-                        chunks.append('. '.join(current_chunk) + '.')
-                    current_chunk = [sentence]
-                    current_length = sentence_tokens
-                else:
-                    current_chunk.append(sentence)
-                    current_length += sentence_tokens
-            
-            if current_chunk:  # 마지막 청크 저장
-                chunks.append('. '.join(current_chunk) + '.')
-                
-            return chunks
+        return self.normalizer.preprocess(text, company_name)
 
     def clean_text(self, text):
             """Clean text by removing unnecessary patterns and duplicates"""
-            # 반복되는 'Lt.' 패턴 제거
-            text = re.sub(r'(?:Lt\.,?\s*)+', 'Ltd.', text)
-            
-            # 반복되는 숫자 패턴 제거
-            text = re.sub(r'\b\d+(?:,\d+)*\b(?:\s*\b\d+(?:,\d+)*\b)+', '', text)
-            
-            # 반복되는 SK 관련 패턴 정리
-            text = re.sub(r'SK\s+[Hh]ynix\s+(?:Semiconductor|Semionutor)\s+[A-Za-z]+\s+(?:Ltd\.|Inc\.)', 'SK하이닉스', text)
-            
-            # 불필요한 약어와 기호 제거
-            text = re.sub(r'(?:Co\.,?|Corp\.,?|Inc\.,?)\s*', '', text)
-            
-            # 중복되는 회사명 정리
-            text = re.sub(r'(?:SK하이닉스|에스케이하이닉스)\s*주식회사', 'SK하이닉스', text)
-            
-            # 연속된 공백 제거
-            text = re.sub(r'\s+', ' ', text)
-            
-            return text.strip()
-
-    def remove_duplicate_sentences(self, text):
-        """Remove duplicate sentences and similar content"""
-        sentences = text.split('. ')
-        unique_sentences = []
-        seen_content = set()
-        
-        for sentence in sentences:
-            # 문장을 정규화 (공백 제거, 소문자 변환)
-            normalized = ' '.join(sentence.lower().split())
-            
-            # 유사한 문장 감지를 위한 핵심 단어 추출
-            words = set(normalized.split())
-            
-            # 이미 비슷한 내용이 있는지 확인
-            is_duplicate = False
-            for seen in seen_content:
-                common_words = words.intersection(set(seen.split()))
-                if len(common_words) > len(words) * 0.6:  # 60% 이상 단어가 겹치면 중복으로 간주
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate and len(normalized) > 10:  # 너무 짧은 문장 제외
-                unique_sentences.append(sentence)
-                seen_content.add(normalized)
-        
-        return '. '.join(unique_sentences)
+            # 기업별 표기 통일 규칙은 text_normalizer.COMPANY_RULES (또는 COMPANY_RULES_PATH JSON)
+            return self.normalizer.clean(text)
 
     def remove_duplicate_sentences(self, text):
-        """Remove duplicate sentences from summary"""
-        sentences = text.split(". ")
-        seen = set()
-        filtered_sentences = []
-        
-        for sentence in sentences:
-            if sentence not in seen:
-                filtered_sentences.append(sentence)
-                seen.add(sentence)
-        
-        return ". ".join(filtered_sentences)
-
+        """Remove duplicate and near-duplicate sentences (MinHash/LSH, threshold: DEDUP_THRESHOLD)"""
+        return self.dedup.filter_text(text)
 
     def summarize_text(self, text, company_name):
         """Summarize text using KoBART with improved cleaning"""
-        print(f"\nStarting text summarization for {company_name}...")
-        
-        if not text:
-            print("Error: Empty text received")
-            return "No content to summarize"
-            
-        print(f"Original text length: {len(text)} characters")
-        
-        try:
-            # 전처리 및 청크 분할 전 기본 정제
-            text = self.preprocess_text(text, company_name)
-            text = self.clean_text(text)
-            print("Text preprocessing and cleaning completed")
-            
-            # 텍스트를 청크로 분할
-            chunks = self.chunk_text(text)
-            print(f"Split text into {len(chunks)} chunks")
-            
-            summaries = []
-            for i, chunk in enumerate(chunks, 1):
-                print(f"\nProcessing chunk {i}/{len(chunks)}")
-                input_length = len(self.tokenizer.encode(chunk, add_special_tokens=False))
-                max_length = min(500, max(100, input_length // 2))
-                min_length = min(50, max_length - 1)
-                
-                try:
-                    summary = self.summarizer(
-                        chunk,
-                        max_length=max_length,
-                        min_length=min_length,
-                        do_sample=False,
-                        num_beams=4,
-                        early_stopping=True
-                    )
-                    
-                    if summary and summary[0].get('summary_text'):
-                        # 각 청크의 요약문도 정제
-                        cleaned_summary = self.clean_text(summary[0]['summary_text'])
-                        summaries.append(cleaned_summary)
-                    else:
-                        print(f"Warning: Empty summary for chunk {i}")
-                        cleaned_chunk = self.clean_text(chunk[:200])
-                        summaries.append(cleaned_chunk + "...")
-                        
-                except Exception as e:
-                    print(f"Error summarizing chunk {i}: {str(e)}")
-                    cleaned_chunk = self.clean_text(chunk[:200])
-                    summaries.append(cleaned_chunk + "...")
-            
-            if not summaries:
-                return "Summarization failed for all chunks"
-                
-            # 모든 요약문 합치고 중복 제거
-            final_summary = " ".join(summaries)
-            final_summary = self.remove_duplicate_sentences(final_summary)
-            final_summary = self.clean_text(final_summary)
-            
-            # 최종 요약이 너무 길면 다시 한 번 요약
-            if len(self.tokenizer.encode(final_summary)) > 1000:
-                try:
-                    print("\nFinal summarization of combined summaries...")
-                    final_summary = self.summarizer(
-                        final_summary,
-                        max_length=700,
-                        min_length=100,
-                        do_sample=False,
-                        num_beams=4
-                    )[0]['summary_text']
-                    final_summary = self.clean_text(final_summary)
-                except Exception as e:
-                    print(f"Error in final summarization: {str(e)}")
-            
-            print(f"Final summary length: {len(final_summary)} characters")
-            return final_summary
-            
-        except Exception as e:
-            print(f"Error in summarization process: {str(e)}")
-            return "Error during text processing"
+        return self.summarize_many({company_name: text})[company_name]
+
+    def summarize_many(self, texts):
+        """Summarize {company_name: text} with chunks from all companies batched together"""
+        summaries = self.summary_service.summarize_many(list(texts.items()))
+        return dict(zip(texts, summaries))
+
+    def get_latest_rcept_no(self, corp_code):
+        """Latest business report receipt number (list.json is cached, so process_company reuses it)"""
+        business_reports = self.get_business_report(corp_code)
+        if business_reports and business_reports.get("list"):
+            return business_reports["list"][0].get("rcept_no")
+        return None
 
     def get_business_report_content(self, corp_code):
         """Get and process business report content"""
@@ -412,11 +209,11 @@ class BusinessAnalysisSystem:
         rcept_no = latest_report.get("rcept_no")
         print(f"- Found business report: {latest_report.get('rpt_nm')} ({rcept_no})")
         
-        xml_content = self.download_report(rcept_no)
-        if not xml_content:
+        report = self.download_report(rcept_no)
+        if not report:
             return None
             
-        return self.extract_section(xml_content)
+        return self.extract_section(report)
 
     def upload_to_elasticsearch(self, company_data):
         """Upload data to Elasticsearch with update functionality"""
@@ -428,16 +225,22 @@ class BusinessAnalysisSystem:
         original_content = company_data.get("business_overview", "")
         company_info = company_data.get("company_info", {})
         
-        if not business_overview_summary:
+        if is_failed_summary(business_overview_summary):
+            # 실패 문구는 올리지 않음 (watermark도 그대로 두어 다음 실행에서 다시 요약)
             print(f"Warning: No summary data for {company_name}, skipping.")
-            return
+            return False
             
         print(f"Preparing data for {company_name}")
+        uploaded = False
         doc = {
             "company_name": company_name,
             "business_overview_summary": business_overview_summary,
             "business_overview_original": original_content,
             "company_info": company_info,
+            "passage_index": build_passage_index({
+                "summary": business_overview_summary,
+                "original": original_content
+            }),
             "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
@@ -481,6 +284,7 @@ class BusinessAnalysisSystem:
             
             if response.status_code in [200, 201]:
                 print(f"Successfully {'updated' if hits else 'created'} data for {company_name}")
+                uploaded = True
                 print(f"Response: {response.json()}")
             else:
                 print(f"Failed to {'update' if hits else 'create'} data for {company_name}")
@@ -495,9 +299,10 @@ class BusinessAnalysisSystem:
             print(f"Error uploading to Elasticsearch: {e}")
         
         print("Upload process completed")
+        return uploaded
 
-    def process_company(self, company_name, stock_code):
-            """Process a single company's data"""
+    def collect_company(self, company_name, stock_code):
+            """Fetch a single company's info and report content (without summary)"""
             print(f"\nProcessing {company_name}...")
             
             # Get business report
@@ -516,16 +321,91 @@ class BusinessAnalysisSystem:
             if not report_content:
                 return None
                 
-            # Summarize content
-            summary = self.summarize_text(report_content, company_name)
-            
             return {
                 "company_name": company_name,
                 "company_info": company_info,
-                "business_overview": report_content,  # 원문 저장
-                "business_overview_summary": summary
+                "business_overview": report_content  # 원문 저장
             }
 
+    def process_company(self, company_name, stock_code):
+            """Process a single company's data"""
+            company_data = self.collect_company(company_name, stock_code)
+            if company_data:
+                company_data["business_overview_summary"] = self.summarize_text(
+                    company_data["business_overview"], company_name
+                )
+            return company_data
+
+    def _fetch_stage(self, company):
+        """DART: 새 공시 확인, 기업 정보, 보고서 목록, document.xml 다운로드"""
+        company_name, stock_code = company["company_name"], company["stock_code"]
+        if self.pipeline.stopped:
+            # 할당량 소진 후 큐에 남아 있던 기업은 다음 실행에서 처리
+            return None
+        corp_code = self.corp_codes.get(stock_code)
+        if not corp_code:
+            print(f"Could not find corporate code for {company_name}")
+            return None
+        try:
+            latest_rcept_no = self.get_latest_rcept_no(corp_code)
+            mark = self.watermarks.get(corp_code)
+            if latest_rcept_no and mark and mark["rcept_no"] == latest_rcept_no:
+                # 마지막 실행 이후 새 공시가 없으면 문서 다운로드/요약 생략
+                print(f"\nNo new filing for {company_name} ({latest_rcept_no}), skipping")
+                self.watermarks.advance(corp_code, latest_rcept_no, self.modify_dates.get(corp_code))
+                return None
+            print(f"\nProcessing {company_name}...")
+            company_info = self.get_company_info(company_name, stock_code)
+            if not company_info:
+                return None
+            business_reports = self.get_business_report(corp_code)
+            if not business_reports or not business_reports.get("list"):
+                print(f"No business reports found for {company_name}")
+                return None
+            latest_report = business_reports["list"][0]
+            print(f"- Found business report: {latest_report.get('rpt_nm')} ({latest_report.get('rcept_no')})")
+            report = self.download_report(latest_report.get("rcept_no"))
+        except QuotaExceeded as e:
+            # 새 기업 투입만 멈추고 이미 받은 문서는 끝까지 요약/업로드
+            print(f"{e}. Stopping before {company_name}")
+            self.pipeline.stop()
+            return None
+        if not report:
+            return None
+        return dict(company, corp_code=corp_code, latest_rcept_no=latest_rcept_no,
+                    company_info=company_info, report=report)
+
+    def _extract_stage(self, company):
+        """XML 파싱은 CPU 작업이므로 프로세스 풀에서 실행"""
+        report_content = self.extract_pool.submit(extract_business_sections, company.pop("report")).result()
+        if not report_content:
+            return None
+        company["business_overview"] = report_content
+        return company
+
+    def _summarize_stage(self, companies):
+        """큐에 모인 기업들의 청크를 한 번에 배치 요약"""
+        summaries = self.summarize_many({
+            company["company_name"]: company["business_overview"] for company in companies
+        })
+        for company in companies:
+            company["business_overview_summary"] = summaries[company["company_name"]]
+        return companies
+
+    def _upload_stage(self, company):
+        company_data = {
+            "company_name": company["company_name"],
+            "company_info": company["company_info"],
+            "business_overview": company["business_overview"],  # 원문 저장
+            "business_overview_summary": company["business_overview_summary"]
+        }
+        # Upload to Elasticsearch
+        if self.upload_to_elasticsearch(company_data):
+            self.watermarks.advance(
+                company["corp_code"], company["latest_rcept_no"], self.modify_dates.get(company["corp_code"])
+            )
+        return company_data
+
     def run(self):
         """Main execution method"""
         try:
@@ -533,15 +413,23 @@ class BusinessAnalysisSystem:
             
             # Download corporate codes
             self.download_corp_codes()
-            
-            # Process each company
-            results = []
-            for company_name, stock_code in self.companies.items():
-                company_data = self.process_company(company_name, stock_code)
-                if company_data:
-                    results.append(company_data)
-                    # Upload to Elasticsearch
-                    self.upload_to_elasticsearch(company_data)
+            ensure_passage_mapping(self.es_url, self.index_name)
+            
+            # Process only companies with a new filing since the last run
+            self.watermarks = WatermarkStore(f"es:{self.index_name}:{WATERMARK_REPORT_KIND}")
+            # 모델/스레드를 가진 프로세스를 fork하지 않도록 spawn 사용
+            with ProcessPoolExecutor(PIPELINE_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn")) as pool:
+                self.extract_pool = pool
+                self.pipeline = StagedPipeline([
+                    Stage("fetch", self._fetch_stage, workers=PIPELINE_FETCH_WORKERS),
+                    Stage("extract", self._extract_stage, workers=PIPELINE_EXTRACT_WORKERS),
+                    Stage("summarize", self._summarize_stage, batch_size=PIPELINE_SUMMARY_BATCH),
+                    Stage("upload", self._upload_stage, workers=PIPELINE_UPLOAD_WORKERS),
+                ], queue_size=PIPELINE_QUEUE_SIZE)
+                results = self.pipeline.run(
+                    {"company_name": company_name, "stock_code": stock_code}
+                    for company_name, stock_code in self.companies.items()
+                )
             
             # Save results to file
             self.save_results(results)
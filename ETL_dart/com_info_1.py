@@ -1,12 +1,12 @@
 import requests
-import zipfile
 import os
-from io import BytesIO
-from bs4 import BeautifulSoup
+from itertools import islice
 import mysql.connector
 from datetime import datetime
 from dotenv import load_dotenv
-import time
+from dart_client import DartClient
+from dart_quota import QuotaExceeded, todays_batch
+from corp_codes import iter_corp_codes, is_listed
 from typing import Dict, Any, Optional
 import json
 
@@ -24,82 +24,37 @@ class DartCrawler:
             'database': 'DART_DB'
         }
         self.base_url = "https://opendart.fss.or.kr/api"
+        self.dart = DartClient(self.api_key)
         
     def get_corp_list(self, start_idx: int = 0, end_idx: Optional[int] = None) -> list:
         """기업 목록 조회"""
-        url = f"{self.base_url}/corpCode.xml"
-        params = {'crtfc_key': self.api_key}
-        
         print(f"API KEY: {self.api_key}")  # API 키 확인
         print("기업 목록 다운로드 중...")
-        response = requests.get(url, params=params)
+        try:
+            response = self.dart.get("corpCode.xml")
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"기업 목록 조회 실패: {e}")
         print(f"응답 상태 코드: {response.status_code}")  # 응답 상태 확인
-        
-        if response.status_code != 200:
-            raise Exception(f"기업 목록 조회 실패: {response.status_code}")
             
-        # ZIP 파일 처리
-        print("ZIP 파일 압축 해제 중...")
-        with zipfile.ZipFile(BytesIO(response.content)) as z:
-            if not z.namelist():
-                raise Exception("ZIP 파일이 비어있습니다.")
-            print(f"ZIP 파일 내용: {z.namelist()}")
-            with z.open(z.namelist()[0]) as f:
-                xml_content = f.read()
-                
+        # ZIP 안의 XML을 스트리밍 파싱 (인덱스는 전체 기업 목록 기준)
         print("XML 파싱 중...")
-        soup = BeautifulSoup(xml_content, 'xml')
         corps = []
+        skipped_count = 0
+        for corp in islice(iter_corp_codes(response.content), start_idx, end_idx):
+            # 주식코드가 있는 기업만 필터링 (상장사만)
+            if is_listed(corp.stock_code):
+                corps.append({
+                    'corp_code': corp.corp_code,
+                    'corp_name': corp.corp_name,
+                    'corp_name_eng': corp.corp_eng_name,
+                    'stock_code': corp.stock_code,
+                    'modify_date': corp.modify_date
+                })
+            else:
+                skipped_count += 1
         
-        # 전체 기업 목록
-        print("기업 목록 필터링 중...")
-        all_corps = soup.find_all('list')
-        
-        # XML 내용 샘플 출력
-        print("\nXML 내용 샘플:")
-        print(xml_content[:1000])  # 처음 1000바이트만 출력
-        
-        if not all_corps:
+        if not corps and not skipped_count:
             raise Exception("기업 목록을 찾을 수 없습니다.")
-            
-        print(f"\n전체 기업 수: {len(all_corps)}")
-        print(f"샘플 기업 데이터:")
-        for i in range(min(5, len(all_corps))):
-            corp = all_corps[i]
-            print(f"\n기업 {i+1}:")
-            print(corp.prettify())
-        
-        # 인덱스 조정
-        if end_idx is None:
-            end_idx = len(all_corps)
-            
-        # 주식코드가 있는 기업만 필터링 (상장사만)
-        skipped_count = 0
-        for corp in all_corps[start_idx:end_idx]:
-            try:
-                corp_code = corp.find('corp_code').text.strip()
-                corp_name = corp.find('corp_name').text.strip()
-                stock_code = corp.find('stock_code').text.replace(" ", "").strip()  # 공백 제거 추가
-                modify_date = corp.find('modify_date').text.strip()
-                
-                if stock_code and len(stock_code) == 6 and stock_code.isdigit():  # 숫자 여부 확인 추가
-                    corps.append({
-                        'corp_code': corp_code,
-                        'corp_name': corp_name,
-                        'stock_code': stock_code,
-                        'modify_date': modify_date
-                    })
-                else:
-                    skipped_count += 1
-                    if skipped_count <= 5:  # 처음 5개의 건너뛴 기업만 출력
-                        print(f"\n건너뛴 기업 {skipped_count}:")
-                        print(f"기업명: {corp_name}")
-                        print(f"종목코드: '{stock_code}'")  # 종목코드 값 확인용
-                        print(f"기업코드: {corp_code}")
-            except Exception as e:
-                print(f"기업 데이터 처리 중 오류: {e}")
-                print(f"문제된 데이터: {corp}")
-                continue
         
         print(f"\n상장사 수: {len(corps)}")
         print(f"건너뛴 기업 수: {skipped_count}")
@@ -115,16 +70,12 @@ class DartCrawler:
 
     def get_company_info(self, corp_code: str) -> Dict[str, Any]:
         """기업 기본 정보 조회 (https://opendart.fss.or.kr/api/company.json)"""
-        url = f"{self.base_url}/company.json"
         params = {
-            'crtfc_key': self.api_key,
             'corp_code': corp_code
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self.dart.get_json("company.json", params)
             if 'status' in data and data['status'] != '000':
                 print(f"기업정보 조회 실패 ({corp_code}): {data.get('message', '')}")
                 return {}
@@ -135,9 +86,7 @@ class DartCrawler:
 
     def get_financial_info(self, corp_code: str, bsns_year: str, reprt_code: str) -> Dict[str, Any]:
         """재무정보 조회 (https://opendart.fss.or.kr/api/fnlttSinglAcnt.json)"""
-        url = f"{self.base_url}/fnlttSinglAcnt.json"
         params = {
-            'crtfc_key': self.api_key,
             'corp_code': corp_code,
             'bsns_year': bsns_year,
             'reprt_code': reprt_code,
@@ -145,9 +94,7 @@ class DartCrawler:
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self.dart.get_json("fnlttSinglAcnt.json", params)
             if 'status' in data and data['status'] != '000':
                 print(f"재무정보 조회 실패 ({corp_code}): {data.get('message', '')}")
                 return {}
@@ -204,6 +151,11 @@ class DartCrawler:
     def process_companies(self, start_idx: int = 0, end_idx: Optional[int] = None):
         """기업 데이터 수집 및 저장 실행"""
         corps = self.get_corp_list(start_idx, end_idx)
+        # 기업당 company.json + fnlttSinglAcnt.json 2건: 오늘 남은 한도만큼만 처리
+        todays = todays_batch(corps, calls_per_item=2, api_key=self.api_key)
+        if len(todays) < len(corps):
+            print(f"⚠️ 일일 한도로 {len(corps) - len(todays)}개 기업은 다음 실행으로 이월")
+        corps = todays
         print(f"처리할 기업 수: {len(corps)}")
         
         current_year = str(datetime.now().year)
@@ -212,14 +164,12 @@ class DartCrawler:
             try:
                 print(f"\n[{i}/{len(corps)}] {corp['corp_name']} 처리 중...")
                 
-                # 기업 기본 정보 조회
-                time.sleep(1)  # API 호출 간격
+                # 기업 기본 정보 조회 (호출 간격은 DartClient의 rate limiter가 관리)
                 company_info = self.get_company_info(corp['corp_code'])
                 if not company_info:
                     continue
                 
                 # 재무 정보 조회 (사업보고서)
-                time.sleep(1)  # API 호출 간격
                 financial_info = self.get_financial_info(
                     corp['corp_code'], 
                     current_year,
@@ -268,6 +218,9 @@ class DartCrawler:
                 else:
                     print(f"❌ {corp['corp_name']} 데이터베이스 저장 실패")
                 
+            except QuotaExceeded as e:
+                print(f"⚠️ {e}. 요청 중단.")
+                break
             except Exception as e:
                 print(f"❌ {corp['corp_name']} 처리 중 오류 발생: {e}")
                 continue
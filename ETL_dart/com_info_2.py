@@ -1,9 +1,11 @@
 import requests
 import mysql.connector
 import os
-import time
+import asyncio
 from dotenv import load_dotenv
 from typing import Dict, Any, List
+from dart_client import DartClient, AsyncDartClient
+from dart_quota import QuotaExceeded, todays_batch
 
 # .env 파일 로드
 load_dotenv()
@@ -19,6 +21,7 @@ class DartCrawler:
             'database': 'DART_DB'
         }
         self.base_url = "https://opendart.fss.or.kr/api"
+        self.dart = DartClient(self.api_key)
 
     def get_total_corp_count(self) -> int:
         """MySQL에서 전체 기업 개수 가져오기"""
@@ -58,47 +61,51 @@ class DartCrawler:
             cursor.close()
             conn.close()
 
+    OVERVIEW_KEYS = [
+        'business_number', 'jurir_no', 'ceo_name', 'corp_name_eng', 'est_dt',
+        'corp_cls', 'addr', 'hm_url', 'ir_url', 'phn_no', 'fax_no',
+        'induty_code', 'acc_mt', 'zip_code'
+    ]
+
+    def parse_company_overview(self, corp_code: str, data) -> Dict[str, Any]:
+        """company.json 응답(또는 요청 중 발생한 예외)을 저장용 dict로 변환"""
+        if isinstance(data, Exception):
+            print(f"❌ 기업개황 조회 중 오류 발생 ({corp_code}): {data}")
+            return {key: None for key in self.OVERVIEW_KEYS}
+
+        if 'status' in data and data['status'] != '000':
+            print(f"❌ 기업개황 조회 실패 ({corp_code}): {data.get('message', '')}")
+            return {key: None for key in self.OVERVIEW_KEYS}
+
+        return {
+            'business_number': data.get('bizr_no'),
+            'jurir_no': data.get('jurir_no'),
+            'ceo_name': data.get('ceo_nm'),
+            'corp_name_eng': data.get('corp_name_eng'),
+            'est_dt': data.get('est_dt'),
+            'corp_cls': data.get('corp_cls'),
+            'addr': data.get('adres'),
+            'hm_url': data.get('hm_url'),
+            'ir_url': data.get('ir_url'),
+            'phn_no': data.get('phn_no'),
+            'fax_no': data.get('fax_no'),
+            'induty_code': data.get('induty_code'),
+            'acc_mt': data.get('acc_mt'),
+            'zip_code': data.get('zip_cd')
+        }
+
     def get_company_overview(self, corp_code: str) -> Dict[str, Any]:
         """기업개황 정보 조회 (DART API - 기업개황)"""
-        url = f"{self.base_url}/company.json"
-        params = {'crtfc_key': self.api_key, 'corp_code': corp_code}
-
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'status' in data and data['status'] != '000':
-                print(f"❌ 기업개황 조회 실패 ({corp_code}): {data.get('message', '')}")
-                return {key: None for key in [
-                    'business_number', 'jurir_no', 'ceo_name', 'corp_name_eng', 'est_dt',
-                    'corp_cls', 'addr', 'hm_url', 'ir_url', 'phn_no', 'fax_no',
-                    'induty_code', 'acc_mt', 'zip_code'
-                ]}
-
-            return {
-                'business_number': data.get('bizr_no'),
-                'jurir_no': data.get('jurir_no'),
-                'ceo_name': data.get('ceo_nm'),
-                'corp_name_eng': data.get('corp_name_eng'),
-                'est_dt': data.get('est_dt'),
-                'corp_cls': data.get('corp_cls'),
-                'addr': data.get('adres'),
-                'hm_url': data.get('hm_url'),
-                'ir_url': data.get('ir_url'),
-                'phn_no': data.get('phn_no'),
-                'fax_no': data.get('fax_no'),
-                'induty_code': data.get('induty_code'),
-                'acc_mt': data.get('acc_mt'),
-                'zip_code': data.get('zip_cd')
-            }
+            data = self.dart.get_json("company.json", {'corp_code': corp_code})
         except requests.exceptions.RequestException as e:
-            print(f"❌ 기업개황 조회 중 오류 발생 ({corp_code}): {e}")
-            return {key: None for key in [
-                'business_number', 'jurir_no', 'ceo_name', 'corp_name_eng', 'est_dt',
-                'corp_cls', 'addr', 'hm_url', 'ir_url', 'phn_no', 'fax_no',
-                'induty_code', 'acc_mt', 'zip_code'
-            ]}
+            data = e
+        return self.parse_company_overview(corp_code, data)
+
+    async def fetch_company_overviews(self, corp_codes: List[str]) -> List[Any]:
+        """여러 기업의 company.json을 동시에 요청 (속도는 공유 rate limiter가 제한)"""
+        async with AsyncDartClient(self.api_key) as dart:
+            return await dart.gather_json("company.json", [{'corp_code': code} for code in corp_codes])
 
     def save_batch_to_database(self, conn, data_list):
         """배치 업데이트를 통해 여러 기업 데이터를 한 번에 MySQL에 적재"""
@@ -134,7 +141,7 @@ class DartCrawler:
             cursor.close()
 
     def process_company_overviews(self, start_idx: int, end_idx: int):
-        """MySQL에서 기업 리스트 조회 후 기업개황 정보 업데이트 (배치 저장 + 2초 대기)"""
+        """MySQL에서 기업 리스트 조회 후 기업개황 정보 업데이트 (동시 요청 + 배치 저장)"""
         total_count = self.get_total_corp_count()
         corp_list = self.get_corp_list_from_db(start_idx, end_idx)
 
@@ -142,28 +149,45 @@ class DartCrawler:
             print("⚠️ 조회된 기업이 없습니다.")
             return
 
+        # 다른 스크립트/재시작과 공유하는 일일 한도 중 오늘 남은 만큼만 처리
+        todays = todays_batch(corp_list, calls_per_item=1, api_key=self.api_key)
+        if len(todays) < len(corp_list):
+            print(f"⚠️ 일일 한도로 {len(corp_list) - len(todays)}개 기업은 다음 실행으로 이월")
+        corp_list = todays
+        if not corp_list:
+            return
+
+        # 기업개황은 서로 독립적이므로 한 번에 요청 (고정 sleep 대신 rate limiter가 호출 간격 관리)
+        overviews = asyncio.run(self.fetch_company_overviews([corp['corp_code'] for corp in corp_list]))
+
         conn = mysql.connector.connect(**self.db_config)  # MySQL 연결 유지
         batch_data = []
+        deferred = 0
 
-        for idx, corp in enumerate(corp_list, start=start_idx + 1):
+        for idx, (corp, data) in enumerate(zip(corp_list, overviews), start=start_idx + 1):
             corp_code = corp['corp_code']
             corp_name = corp['corp_name']
+            if isinstance(data, QuotaExceeded):
+                # 한도 초과로 요청하지 못한 기업은 기존 정보를 NULL로 덮어쓰지 않고 다음 실행으로 넘김
+                deferred += 1
+                continue
             print(f"\n🔎 [{idx}/{total_count}] {corp_name} ({corp_code}) 기업개황 정보 수집 중...")
 
-            overview_data = self.get_company_overview(corp_code)
+            overview_data = self.parse_company_overview(corp_code, data)
 
             if overview_data:
                 batch_data.append(tuple(overview_data.values()) + (corp_code,))
 
-            # 5개 기업마다 배치 저장 & 2초 대기
+            # 5개 기업마다 배치 저장
             if idx % 5 == 0 and batch_data:
                 self.save_batch_to_database(conn, batch_data)
                 batch_data.clear()
-                time.sleep(2)  # 2초 대기
 
         # 남아 있는 데이터 저장
         if batch_data:
             self.save_batch_to_database(conn, batch_data)
+        if deferred:
+            print(f"⚠️ OpenDART 일일 호출 한도 도달: {deferred}개 기업은 저장하지 않고 요청 중단")
 
         conn.close()  # MySQL 연결 닫기
 
@@ -1,12 +1,11 @@
 import requests
-import zipfile
 import os
-from io import BytesIO
-from bs4 import BeautifulSoup
 import mysql.connector
 from datetime import datetime
 from dotenv import load_dotenv
-import time
+from dart_client import DartClient
+from dart_quota import QuotaExceeded, todays_batch
+from corp_codes import iter_corp_codes
 from typing import Dict, Any, Optional, List
 
 # .env 파일 로드
@@ -23,8 +22,8 @@ class DartCrawler:
             'database': 'DART_DB'
         }
         self.base_url = "https://opendart.fss.or.kr/api"
+        self.dart = DartClient(self.api_key)
         self.init_database()
-        self.api_call_count = 0  # ✅ API 호출 횟수 관리
 
     def init_database(self):
         """MySQL 테이블 초기화"""
@@ -77,29 +76,16 @@ class DartCrawler:
 
     def fetch_and_store_corp_list(self):
         """OpenDART API에서 기업 리스트를 가져와 MySQL에 저장 (API 호출 1회)"""
-        url = f"{self.base_url}/corpCode.xml"
-        params = {'crtfc_key': self.api_key}
-
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
-            raise Exception(f"기업 목록 조회 실패: {response.status_code}")
-
-        with zipfile.ZipFile(BytesIO(response.content)) as z:
-            with z.open(z.namelist()[0]) as f:
-                xml_content = f.read()
-
-        soup = BeautifulSoup(xml_content, 'xml')
-        corps = []
-
-        for corp in soup.find_all('list'):
-            stock_code = corp.find('stock_code').text.strip()
-            if stock_code and stock_code.isdigit():
-                corps.append((
-                    corp.find('corp_code').text.strip(),
-                    corp.find('corp_name').text.strip(),
-                    stock_code,
-                    corp.find('modify_date').text.strip()
-                ))
+        try:
+            response = self.dart.get("corpCode.xml")
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"기업 목록 조회 실패: {e}")
+
+        # ZIP 안의 XML을 스트리밍 파싱해 상장사만 수집
+        corps = [
+            (corp.corp_code, corp.corp_name, corp.stock_code, corp.modify_date)
+            for corp in iter_corp_codes(response.content, listed_only=True)
+        ]
 
         # MySQL에 배치 저장
         conn = mysql.connector.connect(**self.db_config)
@@ -150,27 +136,25 @@ class DartCrawler:
             conn.close()
 
     def get_company_info(self, corp_code: str) -> Dict[str, Any]:
-        """기업 기본 정보 조회 (API 호출 제한 관리)"""
-        if self.api_call_count >= 19950:  # ✅ API 제한 관리
-            print("⚠️ API 일일 할당량 초과 방지. 요청 중단.")
+        """기업 기본 정보 조회 (일일 한도는 dart_quota ledger, 요청 간격은 DartClient rate limiter가 관리)"""
+        try:
+            data = self.dart.get_json("company.json", {'corp_code': corp_code})
+        except requests.exceptions.RequestException as e:
+            print(f"❌ 기업 정보 조회 실패 ({corp_code}): {e}")
             return {}
 
-        url = f"{self.base_url}/company.json"
-        params = {'crtfc_key': self.api_key, 'corp_code': corp_code}
-        response = requests.get(url, params=params)
-
-        self.api_call_count += 1  # ✅ API 호출 횟수 증가
-        time.sleep(1.5)  # ✅ API 요청 간격 조절 (속도 제한 방지)
-
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('status') == '000':
-                return data
+        if data.get('status') == '000':
+            return data
         return {}
 
     def process_companies(self, start_idx: int = 0, end_idx: Optional[int] = None):
         """기업 데이터 수집 및 저장 실행"""
         corps = self.get_corp_list_from_db(start_idx, end_idx)
+        # 다른 스크립트/재시작과 공유하는 일일 한도 중 오늘 남은 만큼만 처리
+        todays = todays_batch(corps, calls_per_item=1, api_key=self.api_key)
+        if len(todays) < len(corps):
+            print(f"⚠️ 일일 한도로 {len(corps) - len(todays)}개 기업은 다음 실행으로 이월")
+        corps = todays
         print(f"처리할 기업 수: {len(corps)}")
 
         current_year = str(datetime.now().year)
@@ -185,6 +169,9 @@ class DartCrawler:
 
                 # MySQL 저장 생략 (가져온 정보 활용 가능)
 
+            except QuotaExceeded as e:
+                print(f"⚠️ {e}. 요청 중단.")
+                break
             except Exception as e:
                 print(f"❌ {corp['corp_name']} 처리 중 오류 발생: {e}")
 
@@ -0,0 +1,64 @@
+"""corpCode.xml 스트리밍 파서
+
+CORPCODE.xml(약 10만 개 <list>)을 BeautifulSoup으로 한 번에 읽지 않고, ZIP 멤버에서 바로
+iterparse로 한 건씩 읽어 CorpCode 레코드로 반환한다. 처리한 요소는 즉시 비워 메모리를 일정하게 유지한다.
+
+    from corp_codes import iter_corp_codes
+    for corp in iter_corp_codes(dart.get_bytes("corpCode.xml"), listed_only=True):
+        print(corp.corp_code, corp.stock_code)
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from typing import NamedTuple
+
+
+class CorpCode(NamedTuple):
+    corp_code: str
+    corp_name: str
+    corp_eng_name: str
+    stock_code: str
+    modify_date: str
+
+
+FIELDS = CorpCode._fields
+
+
+def is_listed(stock_code):
+    """상장사: 6자리 숫자 종목코드 (비상장사는 공백)"""
+    return len(stock_code) == 6 and stock_code.isdigit()
+
+
+def _open_zip(source):
+    """bytes(응답 본문), 파일 경로, 파일 객체 모두 허용"""
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    return zipfile.ZipFile(source)
+
+
+def iter_corp_codes(source, listed_only=False):
+    """Yield CorpCode records from a corpCode.xml ZIP without building the whole tree"""
+    with _open_zip(source) as z:
+        names = z.namelist()
+        if not names:
+            raise ValueError("ZIP file is empty")
+        with z.open(names[0]) as f:
+            root = None
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if root is None:
+                    root = elem
+                if event != "end" or elem.tag != "list":
+                    continue
+                # 상장사 필터는 종목코드만 먼저 확인해 나머지 필드 추출을 생략
+                if not listed_only or is_listed((elem.findtext("stock_code") or "").strip()):
+                    record = CorpCode(*((elem.findtext(field) or "").strip() for field in FIELDS))
+                else:
+                    record = None
+                # 처리한 <list>를 루트에서 떼어내 파싱이 끝날 때까지 쌓이지 않도록 함
+                root.clear()
+                if record is not None:
+                    yield record
+
+
+def load_corp_codes(source, listed_only=False):
+    return list(iter_corp_codes(source, listed_only))
@@ -0,0 +1,271 @@
+"""OpenDART 응답 로컬 캐시
+
+요청 키(endpoint + 파라미터, API 키 제외) -> 응답 본문 해시 인덱스는 SQLite에, 본문은
+sha256 이름의 압축 파일(blobs/ab/abcd...)로 저장한다. 같은 본문은 한 번만 저장된다.
+
+- document.xml: 공시 원문은 바뀌지 않으므로 만료 없음
+- list.json / company.json 등: 짧은 TTL
+- 전체 크기가 DART_CACHE_MAX_BYTES를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+
+사용법:
+    python dart_cache.py --stats
+    python dart_cache.py --purge-expired
+    python dart_cache.py --clear
+"""
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
+
+DART_CACHE_DIR = os.getenv(
+    'DART_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dart_cache")
+)
+DART_CACHE_MAX_BYTES = int(os.getenv('DART_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+DART_CACHE_ENABLED = os.getenv('DART_CACHE_ENABLED', 'true').lower() == 'true'
+
+# endpoint별 TTL (초). None: 만료 없음, 목록에 없는 endpoint는 캐시하지 않음
+CACHE_TTL = {
+    "document.xml": None,
+    "corpCode.xml": 24 * 3600,
+    "company.json": 6 * 3600,
+    "fnlttSinglAcnt.json": 6 * 3600,
+    "list.json": 3600,
+}
+
+# 캐시할 DART 응답 status (000: 정상, 013: 조회된 데이터 없음)
+CACHEABLE_DART_STATUS = {"000", "013"}
+
+
+def request_key(endpoint, params):
+    """endpoint + 파라미터(crtfc_key 제외)의 안정적인 해시"""
+    params = {k: v for k, v in (params or {}).items() if k != "crtfc_key"}
+    raw = json.dumps([endpoint, params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def is_cacheable(endpoint, body):
+    """오류 응답은 캐시하지 않음 (zip endpoint는 오류 시 zip 대신 XML/JSON 메시지를 반환)"""
+    if endpoint.endswith(".json"):
+        try:
+            return json.loads(body).get("status") in CACHEABLE_DART_STATUS
+        except (ValueError, AttributeError):
+            return False
+    return body[:2] == b"PK"
+
+
+class DartCache:
+    """Content-addressed, compressed on-disk cache for DART responses"""
+
+    def __init__(self, directory=DART_CACHE_DIR, max_bytes=DART_CACHE_MAX_BYTES, ttl=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl if ttl is not None else CACHE_TTL
+        self.hits = 0
+        self.misses = 0
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.join(self.directory, "blobs"), exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_content_hash ON entries (content_hash)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.directory, "blobs", content_hash[:2], content_hash)
+
+    def cacheable(self, endpoint):
+        return DART_CACHE_ENABLED and endpoint in self.ttl
+
+    def get(self, endpoint, params):
+        """Return the cached body (bytes) or None"""
+        if not self.cacheable(endpoint):
+            return None
+        key = request_key(endpoint, params)
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT content_hash, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                self.misses += 1
+                return None
+            try:
+                with open(self._blob_path(row[0]), 'rb') as f:
+                    body = zlib.decompress(f.read())
+            except (OSError, zlib.error):
+                # 본문 파일이 지워졌거나 깨졌으면 인덱스만 정리하고 다시 받는다
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return body
+        finally:
+            conn.close()
+
+    def put(self, endpoint, params, body):
+        if not self.cacheable(endpoint) or not is_cacheable(endpoint, body):
+            return False
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(content_hash)
+        conn = self._connect()
+        try:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일 후 교체
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(zlib.compress(body, 6))
+                os.replace(tmp_path, path)
+            now = time.time()
+            ttl = self.ttl[endpoint]
+            conn.execute(
+                "REPLACE INTO entries (key, endpoint, content_hash, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (request_key(endpoint, params), endpoint, content_hash, os.path.getsize(path),
+                 now, None if ttl is None else now + ttl, now)
+            )
+            conn.commit()
+            self._evict(conn)
+            return True
+        finally:
+            conn.close()
+
+    def iter_largest(self, endpoint, limit=5):
+        """Yield the largest cached bodies for an endpoint (benchmarks use this to pick big filings)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT content_hash, size FROM entries WHERE endpoint = ? ORDER BY size DESC LIMIT ?",
+                (endpoint, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        for content_hash, _ in rows:
+            with open(self._blob_path(content_hash), 'rb') as f:
+                yield content_hash, zlib.decompress(f.read())
+
+    def _remove_unreferenced(self, conn, content_hashes):
+        for content_hash in set(content_hashes):
+            still_used = conn.execute(
+                "SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (content_hash,)
+            ).fetchone()
+            if not still_used:
+                try:
+                    os.remove(self._blob_path(content_hash))
+                except FileNotFoundError:
+                    pass
+
+    def total_bytes(self, conn):
+        # 같은 본문을 여러 키가 공유하므로 본문 단위로 합산
+        row = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT content_hash, MAX(size) AS size FROM entries GROUP BY content_hash)"
+        ).fetchone()
+        return row[0]
+
+    def _evict(self, conn):
+        """크기 상한을 넘으면 last_access가 오래된 항목부터 삭제"""
+        total = self.total_bytes(conn)
+        if total <= self.max_bytes:
+            return
+        removed = []
+        for key, content_hash, size in conn.execute(
+            "SELECT key, content_hash, size FROM entries ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            removed.append(content_hash)
+            total -= size
+        conn.commit()
+        self._remove_unreferenced(conn, removed)
+
+    def purge_expired(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT key, content_hash FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),)
+            ).fetchall()
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in rows])
+            conn.commit()
+            self._remove_unreferenced(conn, [content_hash for _, content_hash in rows])
+            return len(rows)
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT content_hash FROM entries").fetchall()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+            self._remove_unreferenced(conn, [content_hash for content_hash, in rows])
+        finally:
+            conn.close()
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            by_endpoint = conn.execute(
+                "SELECT endpoint, COUNT(*), SUM(size) FROM entries GROUP BY endpoint ORDER BY endpoint"
+            ).fetchall()
+            return {
+                "total_bytes": self.total_bytes(conn),
+                "max_bytes": self.max_bytes,
+                "endpoints": {endpoint: {"entries": count, "bytes": size} for endpoint, count, size in by_endpoint},
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+        finally:
+            conn.close()
+
+
+# 같은 프로세스의 모든 DART 클라이언트가 공유
+dart_cache = DartCache()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenDART 응답 로컬 캐시")
+    parser.add_argument("--stats", action="store_true", help="캐시 사용 현황")
+    parser.add_argument("--purge-expired", action="store_true", help="만료된 항목 삭제")
+    parser.add_argument("--clear", action="store_true", help="전체 삭제")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        dart_cache.clear()
+        print("🗑️ 캐시 전체 삭제 완료")
+    elif args.purge_expired:
+        print(f"🗑️ 만료 항목 {dart_cache.purge_expired()}개 삭제")
+    stats = dart_cache.stats()
+    print(f"캐시 크기: {stats['total_bytes'] / 1024 ** 2:.1f} MB / {stats['max_bytes'] / 1024 ** 2:.0f} MB")
+    for endpoint, row in stats["endpoints"].items():
+        print(f"{endpoint:<22} {row['entries']:>7}개 {row['bytes'] / 1024 ** 2:>10.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
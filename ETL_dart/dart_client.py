@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dart_quota import quota_ledger, QuotaExceeded
+from dart_cache import dart_cache
+
+try:
+    import aiohttp
+except ImportError:  # 동기 클라이언트만 쓰는 환경 (예: aiohttp 없는 Airflow 이미지)
+    aiohttp = None
+
+BASE_URL = "https://opendart.fss.or.kr/api"
+
+# OpenDART는 분당 요청이 과도하면 키를 일시 차단하므로 한도보다 약간 낮게 유지
+DART_RATE_PER_MINUTE = float(os.getenv('DART_RATE_PER_MINUTE', 900))
+DART_BURST = int(os.getenv('DART_BURST', 20))
+DART_MAX_RETRIES = int(os.getenv('DART_MAX_RETRIES', 5))
+DART_TIMEOUT = float(os.getenv('DART_TIMEOUT', 60))
+DART_POOL_SIZE = int(os.getenv('DART_POOL_SIZE', 10))
+
+# 재시도 대상: HTTP 상태 코드 / DART 응답 status (020: 요청 제한 초과, 800: 시스템 점검)
+RETRY_HTTP_STATUS = {429, 500, 502, 503, 504}
+RETRY_DART_STATUS = {"020", "800"}
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by sync and async callers
+
+    Each call reserves a token immediately (the balance may go negative) and
+    returns how long the caller must wait, so waiters are served in order.
+    """
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """Take `amount` tokens now and return the seconds to wait before using them"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self, amount=1):
+        wait = self.reserve(amount)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, amount=1):
+        wait = self.reserve(amount)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+# 같은 프로세스의 모든 DART 클라이언트가 공유하는 전역 limiter
+rate_limiter = TokenBucket(DART_RATE_PER_MINUTE, DART_BURST)
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _dart_status(payload):
+    return payload.get("status") if isinstance(payload, dict) else None
+
+
+def _is_retryable(endpoint, response):
+    if response.status_code in RETRY_HTTP_STATUS:
+        return True
+    if endpoint.endswith(".json") and response.ok:
+        try:
+            return _dart_status(response.json()) in RETRY_DART_STATUS
+        except ValueError:
+            return False
+    return False
+
+
+def _cached_response(endpoint, body):
+    """캐시 본문을 requests.Response로 감싸 호출부가 캐시 여부와 무관하게 동작하도록 함"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = f"{BASE_URL}/{endpoint}"
+    response._content = body
+    return response
+
+
+class DartClient:
+    """Blocking OpenDART client (keep-alive session + global rate limit + retry)"""
+
+    def __init__(self, api_key=None, limiter=None, max_retries=DART_MAX_RETRIES, timeout=DART_TIMEOUT,
+                 quota=None, cache=None):
+        self.api_key = api_key or os.getenv('DART_API_KEY')
+        self.limiter = limiter or rate_limiter
+        self.quota = quota or quota_ledger
+        self.cache = cache or dart_cache
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=DART_POOL_SIZE, pool_maxsize=DART_POOL_SIZE)
+        self.session.mount("https://", adapter)
+
+    def get(self, endpoint, params=None):
+        """GET {BASE_URL}/{endpoint}; retries network errors and retryable status codes
+
+        Returns the final requests.Response (raise_for_status applied), so callers
+        keep handling requests.exceptions.RequestException as before. Every attempt
+        is reserved against the daily quota ledger first; QuotaExceeded is raised
+        once today's quota is used up. Cached responses skip the network, the
+        quota and the rate limiter entirely.
+        """
+        cached = self.cache.get(endpoint, params)
+        if cached is not None:
+            return _cached_response(endpoint, cached)
+
+        request_params = {"crtfc_key": self.api_key, **(params or {})}
+        url = f"{BASE_URL}/{endpoint}"
+        for attempt in range(self.max_retries + 1):
+            if not self.quota.reserve(self.api_key):
+                raise QuotaExceeded(f"OpenDART 일일 호출 한도 도달 ({self.quota.limit}건)")
+            self.limiter.acquire()
+            try:
+                response = self.session.get(url, params=request_params, timeout=self.timeout)
+                if not _is_retryable(endpoint, response) or attempt == self.max_retries:
+                    response.raise_for_status()
+                    self.cache.put(endpoint, params, response.content)
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            time.sleep(backoff_delay(attempt))
+
+    def get_json(self, endpoint, params=None):
+        return self.get(endpoint, params).json()
+
+    def get_bytes(self, endpoint, params=None):
+        return self.get(endpoint, params).content
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncDartClient:
+    """Async OpenDART client for fan-out over many companies
+
+    async with AsyncDartClient() as dart:
+        results = await dart.gather_json("company.json", [{"corp_code": c} for c in codes])
+    """
+
+    def __init__(self, api_key=None, limiter=None, max_retries=DART_MAX_RETRIES,
+                 timeout=DART_TIMEOUT, concurrency=DART_POOL_SIZE, quota=None, cache=None):
+        if aiohttp is None:
+            raise ImportError("AsyncDartClient requires aiohttp (pip install aiohttp)")
+        self.api_key = api_key or os.getenv('DART_API_KEY')
+        self.limiter = limiter or rate_limiter
+        self.quota = quota or quota_ledger
+        self.cache = cache or dart_cache
+        self.max_retries = max_retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.concurrency = concurrency
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def _fetch(self, endpoint, params):
+        cached = await asyncio.to_thread(self.cache.get, endpoint, params)
+        if cached is not None:
+            return cached
+
+        request_params = {"crtfc_key": self.api_key, **(params or {})}
+        url = f"{BASE_URL}/{endpoint}"
+        for attempt in range(self.max_retries + 1):
+            # SQLite 잠금 대기가 이벤트 루프를 막지 않도록 스레드에서 예약
+            if not await asyncio.to_thread(self.quota.reserve, self.api_key):
+                raise QuotaExceeded(f"OpenDART 일일 호출 한도 도달 ({self.quota.limit}건)")
+            await self.limiter.acquire_async()
+            try:
+                async with self.session.get(url, params=request_params) as response:
+                    if response.status not in RETRY_HTTP_STATUS or attempt == self.max_retries:
+                        response.raise_for_status()
+                        body = await response.read()
+                        retry_status = endpoint.endswith(".json") and _dart_status(json.loads(body)) in RETRY_DART_STATUS
+                        if not retry_status or attempt == self.max_retries:
+                            await asyncio.to_thread(self.cache.put, endpoint, params, body)
+                            return body
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def get_json(self, endpoint, params=None):
+        return json.loads(await self._fetch(endpoint, params))
+
+    async def get_bytes(self, endpoint, params=None):
+        return await self._fetch(endpoint, params)
+
+    async def gather_json(self, endpoint, params_list, return_exceptions=True):
+        """Fetch many requests concurrently (bounded by the connector and the rate limiter)"""
+        return await asyncio.gather(
+            *(self.get_json(endpoint, params) for params in params_list),
+            return_exceptions=return_exceptions
+        )
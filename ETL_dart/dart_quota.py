@@ -0,0 +1,179 @@
+"""OpenDART 일일 호출 한도 ledger
+
+여러 스크립트 / Airflow 재시도 / 재시작 사이에서도 같은 (API 키, 날짜) 카운터를 공유하도록
+SQLite 파일에 예약 기록을 남긴다. DartClient는 HTTP 요청 전에 reserve()로 1건씩 예약한다.
+
+사용법:
+    python dart_quota.py --status
+    python dart_quota.py --plan 12000 --calls-per-item 2
+"""
+import os
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# OpenDART 개인 키 기본 한도는 하루 20,000건, 한도 직전 여유분을 남겨 둔다
+DART_DAILY_LIMIT = int(os.getenv('DART_DAILY_LIMIT', 20000))
+DART_QUOTA_MARGIN = int(os.getenv('DART_QUOTA_MARGIN', 50))
+DART_QUOTA_DB_PATH = os.getenv(
+    'DART_QUOTA_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dart_quota.sqlite3")
+)
+# 한도는 한국 시간 자정에 초기화
+QUOTA_TIMEZONE = ZoneInfo("Asia/Seoul")
+
+
+class QuotaExceeded(Exception):
+    """Raised when the daily OpenDART quota for an API key is used up"""
+
+
+def quota_day(now=None):
+    return (now or datetime.now(QUOTA_TIMEZONE)).strftime("%Y-%m-%d")
+
+
+def key_id(api_key):
+    """API 키 원문 대신 해시로 저장"""
+    return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+
+class QuotaLedger:
+    """(API 키, 날짜)별 예약 건수를 저장하는 process-safe 카운터"""
+
+    def __init__(self, path=DART_QUOTA_DB_PATH, daily_limit=DART_DAILY_LIMIT, margin=DART_QUOTA_MARGIN):
+        self.path = path
+        self.limit = daily_limit - margin
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # isolation_level=None: BEGIN IMMEDIATE로 트랜잭션을 직접 관리
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS dart_quota (
+                key_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                reserved INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT,
+                PRIMARY KEY (key_id, day)
+            )
+            """)
+            self._ready = True
+        return conn
+
+    def reserve(self, api_key, calls=1, day=None):
+        """Atomically reserve `calls` requests for today; returns False if over the limit"""
+        day = day or quota_day()
+        conn = self._connect()
+        try:
+            # 쓰기 잠금을 먼저 잡아 다른 프로세스와의 read-modify-write 경쟁을 막는다
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT reserved FROM dart_quota WHERE key_id = ? AND day = ?", (key_id(api_key), day)
+            ).fetchone()
+            reserved = row[0] if row else 0
+            if reserved + calls > self.limit:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT INTO dart_quota (key_id, day, reserved, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key_id, day) DO UPDATE SET reserved = reserved + excluded.reserved, "
+                "updated_at = excluded.updated_at",
+                (key_id(api_key), day, calls, datetime.now(QUOTA_TIMEZONE).isoformat())
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def used(self, api_key, day=None):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT reserved FROM dart_quota WHERE key_id = ? AND day = ?",
+                (key_id(api_key), day or quota_day())
+            ).fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    def remaining(self, api_key, day=None):
+        return max(0, self.limit - self.used(api_key, day))
+
+    def status(self, days=7):
+        conn = self._connect()
+        try:
+            since = (datetime.now(QUOTA_TIMEZONE) - timedelta(days=days)).strftime("%Y-%m-%d")
+            rows = conn.execute(
+                "SELECT key_id, day, reserved FROM dart_quota WHERE day >= ? ORDER BY day DESC, key_id",
+                (since,)
+            ).fetchall()
+            return [{"key_id": k, "day": d, "reserved": r, "limit": self.limit} for k, d, r in rows]
+        finally:
+            conn.close()
+
+
+# 같은 프로세스의 모든 DART 클라이언트가 공유
+quota_ledger = QuotaLedger()
+
+
+def plan_backfill(items, calls_per_item, api_key=None, ledger=None, start=None):
+    """Split a backfill into per-day batches that fit the quota
+
+    Today's batch uses only what is left today; later days get the full limit.
+    Returns [(day, items), ...] — run the first batch now and the rest on later days.
+    """
+    ledger = ledger or quota_ledger
+    api_key = api_key or os.getenv('DART_API_KEY')
+    items = list(items)
+    start = start or datetime.now(QUOTA_TIMEZONE)
+
+    plan = []
+    offset = 0
+    day_index = 0
+    while offset < len(items):
+        day = quota_day(start + timedelta(days=day_index))
+        budget = ledger.remaining(api_key, day) if day_index == 0 else ledger.limit
+        count = budget // calls_per_item
+        if count:
+            plan.append((day, items[offset:offset + count]))
+            offset += count
+        elif day_index > 0:
+            raise ValueError(f"calls_per_item({calls_per_item})가 일일 한도({ledger.limit})보다 큽니다.")
+        day_index += 1
+    return plan
+
+
+def todays_batch(items, calls_per_item, api_key=None, ledger=None):
+    """plan_backfill 중 오늘 처리할 몫만 반환 (나머지는 다음 실행에서 처리)"""
+    plan = plan_backfill(items, calls_per_item, api_key, ledger)
+    if plan and plan[0][0] == quota_day():
+        return plan[0][1]
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenDART 일일 호출 한도 ledger")
+    parser.add_argument("--status", action="store_true", help="최근 7일 사용 현황")
+    parser.add_argument("--plan", type=int, metavar="ITEMS", help="ITEMS개 기업 백필 일정 계산")
+    parser.add_argument("--calls-per-item", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    api_key = os.getenv('DART_API_KEY')
+    if args.plan:
+        for day, batch in plan_backfill(range(args.plan), args.calls_per_item, api_key):
+            print(f"{day}  {len(batch):>6}개 기업  ({len(batch) * args.calls_per_item}건 호출)")
+    else:
+        print(f"오늘({quota_day()}) 남은 호출: {quota_ledger.remaining(api_key)} / {quota_ledger.limit}")
+        for row in quota_ledger.status():
+            print(f"{row['day']}  {row['key_id']}  {row['reserved']:>6} / {row['limit']}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    main()
@@ -5,14 +5,19 @@ import requests
 import logging
 import zipfile
 from io import BytesIO
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 import time
 from dotenv import load_dotenv
-from transformers import pipeline, AutoTokenizer
 import xml.etree.ElementTree as ET
-import os
 
+# ETL_dart/summary_worker.py (요약 워커 클라이언트)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from summary_worker import SummaryClient, SUMMARY_WORKER_URL
+from summary_status import is_failed_summary
+
+# 요약 워커(kobart_batch)와 같은 디코딩 설정 (--summary-backend에 따라 요약 품질이 달라지지 않도록)
+SUMMARY_NUM_BEAMS = int(os.getenv('SUMMARY_NUM_BEAMS', 4))
 
 # 보고서 확인 용
 OUTPUT_DIR = "output"
@@ -50,12 +55,26 @@ class DartETLPipeline:
         self.successful_uploads = 0
         self.failed_uploads = 0
 
-        # KoBART 모델 로드
-        logger.info("KoBART 요약 모델 로드 중...")
+        # KoBART 모델 로드 (SUMMARY_WORKER_URL이 있으면 요약 워커 사용)
         self.model_name = "digit82/kobart-summarization"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.summarizer = pipeline("summarization", model=self.model_name, tokenizer=self.tokenizer)
-        logger.info("KoBART 모델 로드 완료.")
+        self.summary_client = SummaryClient(SUMMARY_WORKER_URL) if SUMMARY_WORKER_URL else None
+        if self.summary_client:
+            logger.info(f"요약 워커 사용: {SUMMARY_WORKER_URL}")
+        else:
+            from transformers import pipeline, AutoTokenizer
+            logger.info("KoBART 요약 모델 로드 중...")
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.summarizer = pipeline("summarization", model=self.model_name, tokenizer=self.tokenizer)
+            logger.info("KoBART 모델 로드 완료.")
+
+    def summarize(self, text: str) -> Optional[str]:
+        """워커에서 생성에 실패하면 None (호출한 쪽에서 업로드하지 않음)"""
+        if self.summary_client:
+            return self.summary_client.generate([text], max_length=500, min_length=100)[0]
+        return self.summarizer(
+            text, max_length=500, min_length=100, do_sample=False,
+            num_beams=SUMMARY_NUM_BEAMS, early_stopping=True, truncation=True
+        )[0]['summary_text']
 
     def test_elasticsearch_connection(self) -> bool:
         """Elasticsearch 연결 테스트"""
@@ -192,7 +211,11 @@ class DartETLPipeline:
             if not text.strip():
                 continue  # ✅ 개별 기업 출력 제거
 
-            summary = self.summarizer(text, max_length=500, min_length=100, do_sample=False)[0]['summary_text']
+            summary = self.summarize(text)
+            if is_failed_summary(summary):
+                logger.warning(f"⚠️ 요약 실패로 업로드 건너뜀: {corp['corp_name']}")
+                self.failed_uploads += 1
+                continue
             corp['business_overview'] = text
             corp['summary'] = summary
 
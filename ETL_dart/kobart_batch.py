@@ -0,0 +1,295 @@
+"""KoBART 배치 요약 (CPU)
+
+pipeline("summarization")에 청크를 하나씩 넣는 대신
+- 청크를 토큰 길이순으로 정렬해 비슷한 길이끼리 배치(bucket)로 묶고,
+- 배치마다 가장 긴 입력에 맞춰서만 padding 하고 (dynamic padding),
+- torch intra-op 스레드 수를 지정해 model.generate를 배치 단위로 실행한다.
+여러 기업의 청크를 한 번에 넘기면 기업 구분 없이 같은 배치에 섞인다.
+
+추론 backend (SUMMARY_BACKEND):
+- torch: PyTorch 모델 (기본값)
+- onnx: ONNX Runtime. 처음 한 번 encoder / decoder / decoder_with_past(KV cache) 그래프로
+  export해 ONNX_MODEL_DIR에 저장하고 이후에는 저장된 그래프를 바로 읽는다 (optimum[onnxruntime] 필요)
+- onnx-int8: 위 그래프의 가중치를 dynamic int8 양자화한 버전
+
+    summarizer = BatchSummarizer.from_pretrained("digit82/kobart-summarization", backend="onnx-int8")
+    summaries = summarizer.summarize([SummaryRequest(("삼성전자", 0), chunk_text, n_tokens), ...])
+"""
+import os
+import re
+import shutil
+from typing import Any, NamedTuple
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from text_normalizer import TextNormalizer
+from text_chunker import TextChunker
+from sentence_dedup import NearDuplicateFilter
+from summary_cache import SummaryCache, SUMMARY_CACHE, SUMMARY_CACHE_ANCHOR_EVERY
+from summary_status import NO_CONTENT, TEXT_PROCESSING_ERROR, NO_CHUNKS_ERROR
+
+# 0이면 torch 기본값(물리 코어 수)
+TORCH_NUM_THREADS = int(os.getenv('TORCH_NUM_THREADS', 0))
+SUMMARY_BATCH_SIZE = int(os.getenv('SUMMARY_BATCH_SIZE', 8))
+# 배치당 padding 포함 입력 토큰 상한 (긴 청크는 배치 크기를 자동으로 줄임)
+SUMMARY_BATCH_TOKENS = int(os.getenv('SUMMARY_BATCH_TOKENS', 4096))
+SUMMARY_NUM_BEAMS = int(os.getenv('SUMMARY_NUM_BEAMS', 4))
+SUMMARY_BACKEND = os.getenv('SUMMARY_BACKEND', 'torch')
+MODEL_NAME = "digit82/kobart-summarization"
+ONNX_MODEL_DIR = os.getenv(
+    'ONNX_MODEL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "onnx")
+)
+BACKENDS = ("torch", "onnx", "onnx-int8")
+# KoBART에는 프롬프트가 없으므로 정제/요약 방식을 바꿔 이전 요약 캐시를 쓰면 안 될 때 올림
+PROMPT_VERSION = 1
+
+
+class SummaryRequest(NamedTuple):
+    key: Any
+    text: str
+    n_tokens: int
+
+
+def summary_lengths(input_length):
+    """청크 입력 길이에 따른 (max_length, min_length) - 기존 청크별 요약과 같은 규칙"""
+    max_length = min(500, max(100, input_length // 2))
+    return max_length, min(50, max_length - 1)
+
+
+def length_buckets(requests, batch_size=SUMMARY_BATCH_SIZE, batch_tokens=SUMMARY_BATCH_TOKENS):
+    """Group request indices into batches of similar length (longest first)"""
+    order = sorted(range(len(requests)), key=lambda i: requests[i].n_tokens, reverse=True)
+    batches = []
+    current = []
+    for i in order:
+        # 긴 것부터 넣으므로 배치의 padding 길이는 첫 요청의 길이
+        longest = requests[current[0]].n_tokens if current else requests[i].n_tokens
+        if current and (len(current) >= batch_size or longest * (len(current) + 1) > batch_tokens):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def onnx_model_path(model_name, quantized=False, root=ONNX_MODEL_DIR):
+    name = re.sub(r"[^\w.-]+", "--", model_name)
+    return os.path.join(root, f"{name}-int8" if quantized else name)
+
+
+def export_onnx(model_name, root=ONNX_MODEL_DIR):
+    """Export encoder/decoder(+past) ONNX graphs once and return the directory"""
+    path = onnx_model_path(model_name, root=root)
+    if not os.path.exists(os.path.join(path, "config.json")):
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        print(f"Exporting {model_name} to ONNX ({path})...")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+        model.save_pretrained(path)
+    return path
+
+
+def quantize_onnx(model_name, root=ONNX_MODEL_DIR):
+    """Dynamic int8 quantization of every exported graph (same file names, separate directory)"""
+    source = export_onnx(model_name, root)
+    path = onnx_model_path(model_name, quantized=True, root=root)
+    if not os.path.exists(os.path.join(path, "config.json")):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        print(f"Quantizing {model_name} to int8 ({path})...")
+        os.makedirs(path, exist_ok=True)
+        for file_name in os.listdir(source):
+            if file_name.endswith(".onnx"):
+                quantize_dynamic(os.path.join(source, file_name), os.path.join(path, file_name),
+                                 weight_type=QuantType.QInt8)
+        # 설정 파일은 마지막에 복사 (config.json이 있으면 양자화가 끝난 것으로 간주)
+        for file_name in sorted(os.listdir(source), key=lambda name: name == "config.json"):
+            if file_name.endswith(".json"):
+                shutil.copy(os.path.join(source, file_name), os.path.join(path, file_name))
+    return path
+
+
+def load_model(model_name, backend=SUMMARY_BACKEND, onnx_dir=ONNX_MODEL_DIR):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown summary backend: {backend} (choose from {', '.join(BACKENDS)})")
+    if backend == "torch":
+        return AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    path = quantize_onnx(model_name, onnx_dir) if backend == "onnx-int8" else export_onnx(model_name, onnx_dir)
+    return ORTModelForSeq2SeqLM.from_pretrained(path, use_cache=True)
+
+
+class BatchSummarizer:
+    """Length-bucketed, dynamically padded batch generation for a seq2seq summarization model"""
+
+    def __init__(self, model, tokenizer, batch_size=SUMMARY_BATCH_SIZE, batch_tokens=SUMMARY_BATCH_TOKENS,
+                 num_beams=SUMMARY_NUM_BEAMS, num_threads=TORCH_NUM_THREADS):
+        # ONNX Runtime 모델에는 eval()이 없음
+        self.model = model.eval() if hasattr(model, "eval") else model
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.num_beams = num_beams
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+    @classmethod
+    def from_pretrained(cls, model_name, tokenizer=None, backend=SUMMARY_BACKEND, onnx_dir=ONNX_MODEL_DIR, **kwargs):
+        tokenizer = tokenizer or AutoTokenizer.from_pretrained(model_name)
+        return cls(load_model(model_name, backend, onnx_dir), tokenizer, **kwargs)
+
+    def generate(self, texts, max_length, min_length):
+        """Summarize one batch; inputs are padded only to the longest text in the batch"""
+        inputs = self.tokenizer(
+            texts, padding="longest", truncation=True,
+            max_length=self.tokenizer.model_max_length, return_tensors="pt"
+        )
+        # KoBART는 token_type_ids를 받지 않음
+        inputs.pop("token_type_ids", None)
+        with torch.inference_mode():
+            output = self.model.generate(
+                **inputs,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                num_beams=self.num_beams,
+                early_stopping=True
+            )
+        return self.tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    def summarize(self, requests, max_length=None, min_length=None):
+        """Summaries in request order; None where a batch failed
+
+        max_length/min_length override the per-chunk length rule (used for the final pass).
+        """
+        requests = list(requests)
+        results = [None] * len(requests)
+        batches = length_buckets(requests, self.batch_size, self.batch_tokens)
+        for number, batch in enumerate(batches, 1):
+            lengths = [requests[i].n_tokens for i in batch]
+            # 배치 안에서는 가장 긴 입력 기준 max_length, 가장 짧은 입력 기준 min_length
+            batch_max, _ = summary_lengths(max(lengths))
+            _, batch_min = summary_lengths(min(lengths))
+            print(f"Summarizing batch {number}/{len(batches)} ({len(batch)} chunks, up to {max(lengths)} tokens)")
+            try:
+                summaries = self.generate(
+                    [requests[i].text for i in batch],
+                    max_length or batch_max,
+                    min_length if min_length is not None else batch_min
+                )
+            except Exception as e:
+                print(f"Error summarizing batch {number}: {e}")
+                continue
+            for i, summary in zip(batch, summaries):
+                results[i] = summary
+        return results
+
+
+class DocumentSummarizer:
+    """Full document summarization (normalize -> chunk -> batched KoBART -> dedup -> final pass)
+
+    모델을 한 번 올려 두고 여러 기업 문서를 함께 요약한다. big5_ETL_pipeline과 summary_worker가 공유한다.
+    청크 요약은 요약 캐시에 있으면 모델에 보내지 않는다.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, backend=None, max_chunk_tokens=1000, cache=None):
+        self.model_name = model_name
+        self.backend = backend or SUMMARY_BACKEND
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.batch_summarizer = BatchSummarizer.from_pretrained(
+            model_name, tokenizer=self.tokenizer, backend=self.backend
+        )
+        self.cache = cache or (SummaryCache() if SUMMARY_CACHE else None)
+        self.chunker = TextChunker.for_huggingface(
+            self.tokenizer, max_tokens=max_chunk_tokens, anchor_every=SUMMARY_CACHE_ANCHOR_EVERY if self.cache else 0
+        )
+        self.max_chunk_tokens = max_chunk_tokens
+        self.normalizer = TextNormalizer()
+        self.dedup = NearDuplicateFilter()
+
+    def generate(self, texts, max_length=None, min_length=None):
+        """Summarize raw texts as-is (no normalization/chunking); None where generation failed"""
+        requests = [SummaryRequest(i, text, len(self.tokenizer.encode(text, add_special_tokens=False)))
+                    for i, text in enumerate(texts)]
+        return self.batch_summarizer.summarize(requests, max_length=max_length, min_length=min_length)
+
+    def _summarize_cached(self, requests, kind, max_length=None, min_length=None):
+        """BatchSummarizer.summarize that only generates chunks missing from the summary cache"""
+        if not self.cache:
+            return self.batch_summarizer.summarize(requests, max_length=max_length, min_length=min_length)
+        params = {"kind": kind, "backend": self.backend, "num_beams": self.batch_summarizer.num_beams,
+                  "max_length": max_length, "min_length": min_length}
+        keys = [SummaryCache.key(request.text, self.model_name, PROMPT_VERSION, params) for request in requests]
+        results = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in results]
+        if len(missing) < len(requests):
+            print(f"{len(requests) - len(missing)}/{len(requests)} chunk summaries reused from cache")
+        generated = self.batch_summarizer.summarize([requests[i] for i in missing],
+                                                    max_length=max_length, min_length=min_length)
+        for i, summary in zip(missing, generated):
+            if summary:
+                self.cache.put(keys[i], summary, requests[i].n_tokens, self.model_name)
+                results[keys[i]] = summary
+        return [results.get(key) for key in keys]
+
+    def summarize_many(self, items):
+        """Summarize [(company_name, text), ...] with chunks from all documents batched together"""
+        results = [None] * len(items)
+        requests = []
+        # summary_worker처럼 오래 떠 있는 프로세스에서도 이번 호출의 캐시 적중만 보고
+        cache_before = self.cache.stats() if self.cache else None
+        for index, (company_name, text) in enumerate(items):
+            print(f"\nStarting text summarization for {company_name}...")
+            if not text:
+                print("Error: Empty text received")
+                results[index] = NO_CONTENT
+                continue
+            print(f"Original text length: {len(text)} characters")
+            try:
+                # 전처리 및 청크 분할 전 기본 정제
+                text = self.normalizer.normalize(text, company_name)
+                # 문서를 한 번만 토큰화하고, 청크별 토큰 수도 그 결과를 그대로 사용
+                chunks = self.chunker.split(text)
+            except Exception as e:
+                print(f"Error in summarization process: {str(e)}")
+                results[index] = TEXT_PROCESSING_ERROR
+                continue
+            print(f"Split text into {len(chunks)} chunks")
+            if not chunks:
+                results[index] = NO_CHUNKS_ERROR
+            requests.extend(SummaryRequest((index, i), chunk.text, chunk.n_tokens) for i, chunk in enumerate(chunks))
+
+        # 모든 문서의 청크를 길이별 배치로 한 번에 요약
+        by_document = {}
+        for request, summary in zip(requests, self._summarize_cached(requests, "chunk")):
+            index, i = request.key
+            if summary:
+                # 각 청크의 요약문도 정제
+                by_document.setdefault(index, []).append(self.normalizer.clean(summary))
+            else:
+                print(f"Warning: Empty summary for {items[index][0]} chunk {i + 1}")
+                by_document.setdefault(index, []).append(self.normalizer.clean(request.text[:200]) + "...")
+
+        final_requests = []
+        for index, summaries in by_document.items():
+            # 모든 요약문 합치고 중복 제거
+            final_summary = self.dedup.filter_text(" ".join(summaries))
+            final_summary = self.normalizer.clean(final_summary)
+            results[index] = final_summary
+            # 최종 요약이 너무 길면 다시 한 번 요약
+            n_tokens = len(self.tokenizer.encode(final_summary))
+            if n_tokens > self.max_chunk_tokens:
+                final_requests.append(SummaryRequest(index, final_summary, n_tokens))
+
+        if final_requests:
+            print("\nFinal summarization of combined summaries...")
+            final_summaries = self._summarize_cached(final_requests, "final", max_length=700, min_length=100)
+            for request, summary in zip(final_requests, final_summaries):
+                if summary:
+                    results[request.key] = self.normalizer.clean(summary)
+
+        for (company_name, _), final_summary in zip(items, results):
+            print(f"Final summary length for {company_name}: {len(final_summary)} characters")
+        if self.cache:
+            self.cache.report(since=cache_before)
+        return results
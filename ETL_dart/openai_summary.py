@@ -0,0 +1,251 @@
+"""OpenAI 청크 요약 (map-reduce)
+
+문서를 tiktoken 토큰 수 기준으로 청크로 나눈 뒤 청크 요약(map)을 동시에 요청하고, 부분 요약을 합쳐
+최종 요약(reduce)을 만든다. 부분 요약을 합친 길이가 최종 프롬프트에 들어가지 않으면 한 번 더 요약한다.
+
+- 동시 요청 수는 OPENAI_CONCURRENCY, 속도는 분당 요청 수(OPENAI_RPM)와 분당 토큰 수(OPENAI_TPM)로 제한
+  (토큰은 프롬프트 토큰 + max_tokens 로 미리 예약)
+- 429/5xx/타임아웃은 청크 단위로 재시도 (Retry-After 헤더가 있으면 그만큼 대기)
+- 성공한 청크 요약은 바로 요약 캐시(summary_cache)에 저장하므로, 다시 실행하면 실패했거나
+  바뀐 청크만 요청한다. 다른 보고서와 같은 청크도 캐시에서 가져온다
+
+    summarizer = OpenAISummarizer(api_key)
+    summary = summarizer.summarize(text, "삼성전자")
+"""
+import os
+import asyncio
+from dart_client import TokenBucket, backoff_delay, RETRY_HTTP_STATUS
+from text_chunker import TextChunker, TiktokenTokens
+from summary_cache import SummaryCache, SUMMARY_CACHE, SUMMARY_CACHE_ANCHOR_EVERY
+from summary_status import NO_CONTENT, SUMMARY_ERROR, FINAL_SUMMARY_ERROR
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', "https://api.openai.com/v1")
+OPENAI_MODEL = os.getenv('OPENAI_MODEL', "gpt-3.5-turbo-16k")
+# 계정 tier의 한도보다 약간 낮게 설정
+OPENAI_RPM = float(os.getenv('OPENAI_RPM', 3000))
+OPENAI_TPM = float(os.getenv('OPENAI_TPM', 50000))
+OPENAI_CONCURRENCY = int(os.getenv('OPENAI_CONCURRENCY', 8))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 5))
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', 300))
+
+CHUNK_TOKENS = 3000
+CHUNK_MAX_TOKENS = 5000
+FINAL_MAX_TOKENS = 4000
+# 16k context - 최종 요약 max_tokens - 시스템 프롬프트
+FINAL_INPUT_TOKENS = 10000
+
+TEMPERATURE = 0.3
+# 프롬프트를 바꾸면 올려서 이전 캐시를 쓰지 않도록 함
+PROMPT_VERSION = 1
+
+CHUNK_SYSTEM_PROMPT = "당신은 기업의 구체적인 사업 내용을 설명하는 경영 컨설턴트입니다. 다음 텍스트에서 핵심 사업/제품/서비스스 내용을 구체적인 키워드와 수치를 포함해서 요약하세요."
+FINAL_SYSTEM_PROMPT = """당신은 기업의 구체적인 사업 내용을 설명하는 경영 컨설턴트입니다. 기업의 실제 진행 중인 사업과 제품을 구체적으로 설명하고, 각각의 핵심 특성이나 용도를 정확히 서술하십시오.
+
+                    또한, 보고서에 포함된 정량적 데이터(평균 판매 가격, 출하량, 매출 비중 등)가 있을 경우 이를 중요한 정보로 반영하십시오. 하지만, 없는 경우 임의로 생성하지 마십시오.
+                    
+                    * 주의사항:
+                    1. 실제 진행 중인 내용만 포함
+                    2. 구체적인 제품/서비스/기술명 필수 포함
+                    3. 정량적 데이터가 보고서에 있으면 포함하되, 없는 경우 생성하지 않음
+                    4. 지나치게 일반적인 설명보다는 기업의 구체적인 상황을 반영
+                    5. 각 문장은 내용이 분리된 리스트 형태인 개별 항목(-)으로 나누어 작성 
+
+                    다음 형식으로 작성:
+
+                    0. 전체 기업 내용 요약
+                    - 해당 기업의 핵심 사업, 제품, 시장 동향을 종합적으로 요약.
+                    - 보고서에서 제공하는 정량적 데이터(평균 판매 가격, 출하량, 매출 비중 등)가 있으면 포함하여 트렌드 분석.
+
+                    1. 주요 제품 및 서비스
+                    - 제품명과 서비스명을 구체적으로 명시하고, 해당 제품의 핵심 기능 및 용도를 설명.
+                    - 시장 반응, 평균 판매 가격 변동, 매출 기여도 변화 등의 정량적 정보가 있으면 포함.
+
+                    2. 주요 기술 및 인프라
+                    - 사용된 기술의 핵심 특성과 해당 기술이 적용된 제품/서비스를 설명.
+                    - 생산능력, 비용 절감 효과 등 관련된 수치적 변화가 있으면 포함.
+
+                    3. 핵심 사업 영역
+                    - 현재 진행 중인 주요 사업 활동을 설명하고, 향후 성장 전략이 아니라 현황에 초점을 맞춤.
+                    - 시장 반응, 성장률, 매출 기여도 등의 정량적 데이터가 존재하는 경우 이를 강조 (% 수치가 있다면 중요 정보로 간주).
+
+                    """
+
+
+def chunk_prompt(chunk):
+    return f"다음 텍스트의 핵심 내용을 요약해주세요:\n\n{chunk}"
+
+
+def final_prompt(company_name, combined_summary):
+    return (f"다음은 {company_name}의 사업 관련 주요 내용입니다. "
+            f"이 내용을 기반으로 위의 형식에 맞춰 전체적으로 재구성하여 요약하십시오:\n\n{combined_summary}")
+
+
+def retry_after(headers):
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class OpenAILimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by all callers of one API key"""
+
+    def __init__(self, rpm=OPENAI_RPM, tpm=OPENAI_TPM):
+        # 최대 10초 분량까지 몰아서 보낼 수 있도록 함
+        self.requests = TokenBucket(rpm, max(1, int(rpm / 6)))
+        self.tokens = TokenBucket(tpm, max(1, int(tpm / 6)))
+
+    async def acquire_async(self, n_tokens):
+        wait = max(self.requests.reserve(), self.tokens.reserve(n_tokens))
+        if wait:
+            await asyncio.sleep(wait)
+
+
+openai_limiter = OpenAILimiter()
+
+
+class OpenAISummarizer:
+    """Map-reduce summarization with concurrent, rate-limited, cached chunk requests"""
+
+    def __init__(self, api_key=None, model=OPENAI_MODEL, limiter=None, cache=None,
+                 concurrency=OPENAI_CONCURRENCY, max_retries=OPENAI_MAX_RETRIES, timeout=OPENAI_TIMEOUT,
+                 base_url=OPENAI_BASE_URL):
+        if aiohttp is None:
+            raise ImportError("OpenAISummarizer requires aiohttp (pip install aiohttp)")
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.model = model
+        self.limiter = limiter or openai_limiter
+        self.cache = cache or (SummaryCache() if SUMMARY_CACHE else None)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.url = f"{base_url}/chat/completions"
+        self.tokens = TiktokenTokens(model)
+        self.chunker = TextChunker(self.tokens, max_tokens=CHUNK_TOKENS,
+                                   anchor_every=SUMMARY_CACHE_ANCHOR_EVERY if self.cache else 0)
+
+    def cache_key(self, text, kind, max_tokens):
+        return SummaryCache.key(text, self.model, PROMPT_VERSION,
+                              {"kind": kind, "temperature": TEMPERATURE, "max_tokens": max_tokens})
+
+    async def _cached(self, keys):
+        if not self.cache:
+            return {}
+        return await asyncio.to_thread(self.cache.get_many, keys)
+
+    async def _store(self, key, summary, n_tokens):
+        if self.cache:
+            await asyncio.to_thread(self.cache.put, key, summary, n_tokens, self.model)
+
+    def truncate(self, text, max_tokens):
+        """Cut text at the token boundary so that at most max_tokens remain"""
+        starts = self.tokens.token_starts(text)
+        return text if len(starts) <= max_tokens else text[:starts[max_tokens]].rstrip()
+
+    def summarize(self, text, company_name):
+        return asyncio.run(self.summarize_async(text, company_name))
+
+    async def summarize_async(self, text, company_name):
+        """청크별 요약을 동시에 수행한 후, 전체 내용을 종합하여 최종 요약"""
+        if not text:
+            return NO_CONTENT
+        chunks = self.chunker.chunk_texts(text)
+        print(f"🔹 총 {len(chunks)}개의 청크 생성됨.")
+
+        # 동시 요청 수는 connector 연결 수로 제한
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        async with aiohttp.ClientSession(connector=connector, headers=headers,
+                                         timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            while True:
+                summaries = await self._map(session, chunks)
+                if summaries is None:
+                    return SUMMARY_ERROR
+                combined_summary = "\n".join(summaries)
+                if self.tokens.count(combined_summary) <= FINAL_INPUT_TOKENS:
+                    break
+                # 부분 요약을 합쳐도 최종 프롬프트에 들어가지 않으면 한 단계 더 요약
+                next_chunks = self.chunker.chunk_texts(combined_summary)
+                if len(next_chunks) >= len(chunks):
+                    # 더 줄지 않으면 context 초과로 실패할 요청을 보내지 않도록 예산까지만 사용
+                    print(f"Combined summaries still exceed {FINAL_INPUT_TOKENS} tokens, truncating")
+                    combined_summary = self.truncate(combined_summary, FINAL_INPUT_TOKENS)
+                    break
+                print(f"🔹 부분 요약 {len(chunks)}개 -> {len(next_chunks)}개 청크로 다시 요약")
+                chunks = next_chunks
+
+            prompt = final_prompt(company_name, combined_summary)
+            key = self.cache_key(prompt, "final", FINAL_MAX_TOKENS)
+            summary = (await self._cached([key])).get(key)
+            if summary is None:
+                summary, n_tokens = await self._complete(session, FINAL_SYSTEM_PROMPT, prompt, FINAL_MAX_TOKENS)
+                if summary is None:
+                    # 부분 요약은 캐시에 남아 있으므로 재시도 시 최종 요약만 다시 요청
+                    return FINAL_SUMMARY_ERROR
+                await self._store(key, summary, n_tokens)
+        return summary
+
+    async def _map(self, session, chunks):
+        """Summaries of all chunks in order, or None if any chunk still failed after retries"""
+        keys = [self.cache_key(chunk, "chunk", CHUNK_MAX_TOKENS) for chunk in chunks]
+        cached = await self._cached(keys)
+        summaries = {index: cached[key] for index, key in enumerate(keys) if key in cached}
+        if summaries:
+            print(f"{len(summaries)}/{len(chunks)} chunk summaries reused from cache")
+
+        async def summarize_chunk(index):
+            summary, n_tokens = await self._complete(
+                session, CHUNK_SYSTEM_PROMPT, chunk_prompt(chunks[index]), CHUNK_MAX_TOKENS
+            )
+            # 성공한 청크는 바로 저장해 두어 다른 청크가 실패해도 다시 요청하지 않음
+            if summary is not None:
+                await self._store(keys[index], summary, n_tokens)
+            return summary
+
+        pending = [index for index in range(len(chunks)) if index not in summaries]
+        results = await asyncio.gather(*(summarize_chunk(index) for index in pending))
+        summaries.update(zip(pending, results))
+        failed = sum(summary is None for summary in summaries.values())
+        if failed:
+            print(f"Summarization error: {failed}/{len(chunks)} chunks failed")
+            return None
+        return [summaries[index] for index in range(len(chunks))]
+
+    async def _complete(self, session, system_prompt, user_prompt, max_tokens):
+        """One chat completion with retries -> (content, total tokens used); (None, 0) if it still fails"""
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": TEMPERATURE,
+            "max_tokens": max_tokens
+        }
+        # TPM 한도는 max_tokens까지 포함해 계산되므로 같은 값으로 예약
+        n_tokens = self.tokens.count(system_prompt) + self.tokens.count(user_prompt) + max_tokens
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire_async(n_tokens)
+            delay = backoff_delay(attempt)
+            try:
+                async with session.post(self.url, json=payload) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        content = data["choices"][0]["message"]["content"].strip()
+                        return content, data.get("usage", {}).get("total_tokens", n_tokens)
+                    body = await response.text()
+                    if response.status not in RETRY_HTTP_STATUS:
+                        print(f"Summarization error: {response.status} {body[:200]}")
+                        return None, 0
+                    print(f"OpenAI {response.status}, retrying (attempt {attempt + 1})")
+                    delay = retry_after(response.headers) or delay
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"OpenAI request error: {e!r}, retrying (attempt {attempt + 1})")
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+        return None, 0
@@ -0,0 +1,117 @@
+import re
+import zlib
+import requests
+import numpy as np
+
+# 백엔드(project/backend/app/retrieval.py)와 동일한 해싱 규칙을 사용해야 함
+HASH_DIM = 2 ** 16
+NGRAM_RANGE = (2, 3)
+PASSAGE_MAX_CHARS = 500
+
+# 문장 경계: 마침표/물음표/느낌표 뒤의 공백 (한국어 "~다." 포함)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def char_ngrams(text, ngram_range=NGRAM_RANGE):
+    """Yield character n-grams of normalized text (Korean-friendly, no tokenizer needed)"""
+    text = WHITESPACE.sub(" ", text.lower()).strip()
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        for i in range(len(text) - n + 1):
+            gram = text[i:i + n]
+            if not gram.isspace():
+                yield gram
+
+
+def hash_ngrams(text, dim=HASH_DIM):
+    """Count hashed character n-grams -> {index: count}"""
+    counts = {}
+    for gram in char_ngrams(text):
+        index = zlib.crc32(gram.encode("utf-8")) % dim
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+def split_passages(text, max_chars=PASSAGE_MAX_CHARS):
+    """Split text into passages on line/sentence boundaries, packed up to max_chars"""
+    units = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= max_chars:
+            units.append(line)
+        else:
+            units.extend(s for s in SENTENCE_BOUNDARY.split(line) if s.strip())
+
+    passages = []
+    current = ""
+    for unit in units:
+        if current and len(current) + 1 + len(unit) > max_chars:
+            passages.append(current)
+            current = unit
+        else:
+            current = f"{current} {unit}" if current else unit
+    if current:
+        passages.append(current)
+
+    # 문장 하나가 max_chars를 넘는 경우 강제로 자름
+    return [p[i:i + max_chars] for p in passages for i in range(0, len(p), max_chars)]
+
+
+def build_passage_index(sources, dim=HASH_DIM):
+    """Build hashed TF-IDF vectors for passages of each source text
+
+    sources: {"summary": text, "original": text, ...}
+    Vectors are L2-normalized and stored sparse (sorted indices + weights).
+    """
+    passages = [
+        (source, passage)
+        for source, text in sources.items() if text
+        for passage in split_passages(text)
+    ]
+    if not passages:
+        return None
+
+    counts = [hash_ngrams(passage, dim) for _, passage in passages]
+    document_frequency = {}
+    for count in counts:
+        for index in count:
+            document_frequency[index] = document_frequency.get(index, 0) + 1
+
+    n_passages = len(passages)
+    entries = []
+    for (source, passage), count in zip(passages, counts):
+        indices = np.fromiter(count.keys(), dtype=np.int64, count=len(count))
+        tf = np.fromiter(count.values(), dtype=np.float64, count=len(count))
+        df = np.fromiter((document_frequency[i] for i in count), dtype=np.float64, count=len(count))
+        weights = (1 + np.log(tf)) * (np.log((1 + n_passages) / (1 + df)) + 1)
+        norm = np.linalg.norm(weights)
+        if norm:
+            weights /= norm
+        order = np.argsort(indices)
+        entries.append({
+            "source": source,
+            "text": passage,
+            "indices": indices[order].tolist(),
+            "weights": np.round(weights[order], 5).tolist()
+        })
+
+    return {
+        "dim": dim,
+        "ngram_range": list(NGRAM_RANGE),
+        "passages": entries
+    }
+
+
+def ensure_passage_mapping(es_url, index_name):
+    """Store passage_index in _source only (vectors must not be indexed as fields)"""
+    mapping = {"properties": {"passage_index": {"type": "object", "enabled": False}}}
+    try:
+        response = requests.put(f"{es_url}/{index_name}/_mapping", json=mapping, timeout=30)
+        if response.status_code == 404:
+            response = requests.put(f"{es_url}/{index_name}", json={"mappings": mapping}, timeout=30)
+        if response.status_code not in [200, 201]:
+            print(f"Failed to set passage_index mapping: {response.text}")
+    except requests.exceptions.RequestException as e:
+        print(f"Error setting passage_index mapping: {e}")
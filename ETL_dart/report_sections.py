@@ -0,0 +1,248 @@
+"""DART 보고서(document.xml) 섹션 추출기
+
+ZIP 멤버를 lxml iterparse로 한 번만 훑으면서
+- TITLE/SUBTITLE 텍스트를 모든 패턴을 합친 정규식 하나로 검사해 섹션을 열고,
+- 섹션 안의 P/TABLE/SPAN 블록 텍스트를 (중첩 블록은 가장 바깥 것만) 중복 없이 모으고,
+- 처리가 끝난 노드는 바로 비워 문서 크기와 무관하게 메모리를 일정하게 유지한다.
+- 넓은 키워드 패턴이 끝없이 본문을 끌어오지 않도록 섹션 제목마다 이후 노드를 max_nodes개까지만 본다.
+
+    extractor = SectionExtractor(BUSINESS_PATTERNS)
+    text = extractor.extract_text(dart.get_bytes("document.xml", {"rcept_no": rcept_no}))
+"""
+import os
+import re
+import zipfile
+from io import BytesIO
+from contextlib import contextmanager, ExitStack
+from lxml import etree
+
+# 제목 하나가 모으는 노드 수 상한 (기존 BeautifulSoup 추출기의 max_iterations와 같은 기준)
+SECTION_MAX_NODES = int(os.getenv('SECTION_MAX_NODES', 1000))
+
+# big5_ETL_pipeline: 사업 관련 섹션
+BUSINESS_PATTERNS = {
+    "사업개요": [
+        r"사업의\s*개요",
+        r"기업의\s*개요",
+        r"회사의\s*개요",
+        r"기업개요",
+        r"사업개요"
+    ],
+    "주요사업": [
+        r"주요\s*사업",
+        r"주요제품",
+        r"주요.*현황",
+        r"사업의\s*내용",
+        r"사업내용"
+    ],
+    "영업개황": [
+        r"영업의\s*개황",
+        r"영업\s*개황",
+        r"사업의\s*현황"
+    ]
+}
+
+# big5_ETL_pipeline_OpenAI_all_doc: I~V 주요 섹션과 사업 관련 하위 섹션
+MAJOR_SECTION_PATTERNS = {
+    "주요섹션": [
+        r"I\.?\s*회사의\s*개요",
+        r"II\.?\s*사업의\s*내용",
+        r"III\.?\s*재무에\s*관한\s*사항",
+        r"IV\.?\s*이사의\s*경영진단\s*및\s*분석의견",
+        r"V\.?\s*주주에\s*관한\s*사항",
+        r"1\.?\s*회사의\s*개요",
+        r"2\.?\s*사업의\s*내용",
+        r"3\.?\s*재무에\s*관한\s*사항",
+        r"4\.?\s*이사의\s*경영진단",
+        r"5\.?\s*주주에\s*관한\s*사항"
+    ],
+    "하위섹션": [
+        r"가\.\s*업계의\s*현황",
+        r"나\.\s*회사의\s*현황",
+        r"다\.\s*사업부문별\s*현황",
+        r"라\.\s*신규사업\s*등의\s*내용",
+        r"마\.\s*조직도",
+        r"바\.\s*재무상태\s*및\s*영업실적"
+    ],
+    "키워드": [
+        r"사업의\s*내용",
+        r"주요\s*제품",
+        r"매출\s*현황",
+        r"시장\s*점유율",
+        r"신규\s*사업",
+        r"주요\s*고객",
+        r"생산\s*능력",
+        r"연구개발",
+        r"시장\s*전망"
+    ]
+}
+
+# Airflow DAG: 회사의 개요
+COMPANY_OVERVIEW_PATTERNS = {
+    "회사의개요": [r"회사의\s*개요"]
+}
+
+# 본문 없이 다른 항목을 안내만 하는 문장
+SKIP_PHRASES = ('참고하시기 바랍니다', '참조하시기 바랍니다')
+
+
+def compile_patterns(patterns):
+    """{label: [regex, ...]} -> 이름 있는 그룹 하나의 alternation + 그룹명 -> label"""
+    groups = {}
+    alternatives = []
+    for label, regexes in patterns.items():
+        for regex in regexes:
+            name = f"p{len(groups)}"
+            groups[name] = label
+            alternatives.append(f"(?P<{name}>{regex})")
+    return re.compile("|".join(alternatives), re.IGNORECASE), groups
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def element_text(elem):
+    """BeautifulSoup get_text(strip=True)와 같은 결과"""
+    return "".join(part.strip() for part in elem.itertext())
+
+
+@contextmanager
+def open_report(source):
+    """document.xml ZIP bytes / XML bytes / 파일 경로 / 파일 객체 -> XML 스트림"""
+    with ExitStack() as stack:
+        if isinstance(source, str):
+            source = stack.enter_context(open(source, 'rb'))
+        elif isinstance(source, (bytes, bytearray)):
+            source = BytesIO(source)
+        if not zipfile.is_zipfile(source):
+            source.seek(0)
+            yield source
+            return
+        z = stack.enter_context(zipfile.ZipFile(source))
+        names = z.namelist()
+        if not names:
+            raise ValueError("ZIP file is empty")
+        yield stack.enter_context(z.open(names[0]))
+
+
+class Section:
+    """A matched TITLE/SUBTITLE with its content blocks and nested subsections"""
+
+    __slots__ = ("title", "label", "tag", "blocks", "children")
+
+    def __init__(self, title, label, tag):
+        self.title = title
+        self.label = label
+        self.tag = tag
+        self.blocks = []
+        self.children = []
+
+    def iter_blocks(self):
+        yield from self.blocks
+        for child in self.children:
+            yield from child.iter_blocks()
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "label": self.label,
+            "blocks": self.blocks,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class SectionExtractor:
+    """Single-pass streaming section extractor for DART report XML"""
+
+    def __init__(self, patterns, title_tags=("TITLE", "SUBTITLE"), content_tags=("P", "TABLE", "SPAN", "SUBTITLE"),
+                 min_chars=6, skip_phrases=SKIP_PHRASES, max_nodes=SECTION_MAX_NODES):
+        self.pattern, self.groups = compile_patterns(patterns)
+        self.title_tags = set(title_tags)
+        self.content_tags = set(content_tags)
+        # 중첩 깊이를 세는 본문 블록 (SUBTITLE처럼 제목으로도 쓰이는 태그는 제외)
+        self.block_tags = self.content_tags - self.title_tags
+        self.min_chars = min_chars
+        self.skip_phrases = skip_phrases
+        self.max_nodes = max_nodes
+
+    def match(self, title_text):
+        m = self.pattern.search(title_text)
+        return self.groups[m.lastgroup] if m else None
+
+    def _keep(self, text, seen):
+        if len(text) < self.min_chars or any(skip in text for skip in self.skip_phrases):
+            return False
+        key = normalize(text)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    def extract(self, source):
+        """Return the list of top-level matched sections (document order)"""
+        sections = []
+        seen = set()
+        section = None       # TITLE 단위로 열린 섹션 (다음 TITLE에서 닫힘)
+        current = None       # 블록을 넣을 섹션 (section 또는 그 하위 SUBTITLE 섹션)
+        content_depth = 0    # 열려 있는 P/TABLE/SPAN 중첩 깊이
+        nodes = 0            # current 제목 이후 지나간 노드 수
+
+        with open_report(source) as stream:
+            context = etree.iterparse(stream, events=("start", "end"), recover=True, huge_tree=True)
+            for event, elem in context:
+                tag = elem.tag
+                if event == "start":
+                    if tag in self.block_tags:
+                        content_depth += 1
+                    continue
+
+                if current is not None:
+                    nodes += 1
+                    if nodes > self.max_nodes:
+                        print(f"Warning: section '{current.title}' reached {self.max_nodes} nodes, truncated")
+                        current = None
+
+                if tag in self.block_tags:
+                    content_depth -= 1
+                    if content_depth > 0:
+                        # 바깥 블록의 텍스트에 포함되므로 아직 비우지 않음
+                        continue
+                    if current is not None:
+                        text = element_text(elem)
+                        if self._keep(text, seen):
+                            current.blocks.append(text)
+                elif content_depth > 0:
+                    continue
+                elif tag in self.title_tags:
+                    title_text = element_text(elem)
+                    label = self.match(title_text)
+                    if tag == "TITLE":
+                        section = current = None
+                    if label:
+                        matched = Section(title_text, label, tag)
+                        if section is None:
+                            sections.append(matched)
+                            section = matched
+                        else:
+                            section.children.append(matched)
+                        current = matched
+                        nodes = 0
+                    elif current is not None and tag in self.content_tags:
+                        # 패턴에 맞지 않는 SUBTITLE은 본문 블록으로 취급
+                        if self._keep(title_text, seen):
+                            current.blocks.append(title_text)
+
+                # 처리가 끝난 노드와 앞 형제 노드를 해제
+                elem.clear(keep_tail=True)
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+            del context
+        return sections
+
+    def extract_text(self, source):
+        """Deduplicated section text joined by newlines, or None if nothing matched"""
+        blocks = [block for section in self.extract(source) for block in section.iter_blocks()]
+        return "\n".join(blocks) if blocks else None
@@ -0,0 +1,125 @@
+"""MinHash + LSH 기반 유사 문장 제거
+
+문장을 문자 n-gram(shingle) 집합으로 보고 MinHash 서명을 만든 뒤, 서명을 band로 나눠
+같은 band 값을 가진 문장끼리만 비교한다. 새 문장마다 지금까지의 모든 문장과 비교하던
+O(n²) Jaccard 검사 대신, 후보(같은 bucket) 몇 개와만 실제 Jaccard를 계산하므로
+문장 수에 거의 선형으로 동작한다.
+
+    dedup = NearDuplicateFilter(threshold=0.6)
+    text = dedup.filter_text(summary_text)      # '. '로 나눈 문장 중 먼저 나온 것만 유지
+"""
+import os
+import zlib
+import numpy as np
+
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.6))
+DEDUP_NUM_PERM = int(os.getenv('DEDUP_NUM_PERM', 64))
+
+# 2^32보다 큰 소수: a, x < 2^32 이면 a * x + b 가 uint64 범위 안에서 정확히 계산됨
+_PRIME = np.uint64(4294967311)
+# MinHash를 한 번에 계산할 shingle 수 (num_perm x 이 값 크기의 행렬을 만듦)
+_BLOCK_SHINGLES = 65536
+
+
+def normalize(sentence):
+    """대소문자/공백 차이를 무시한 비교용 문장"""
+    return " ".join(sentence.lower().split())
+
+
+def shingles(text, size=3):
+    """공백을 뺀 문자 n-gram 집합 (한국어는 어절 단위보다 조사/어미 변화에 덜 민감함)"""
+    text = text.replace(" ", "")
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def optimal_bands(threshold, num_perm):
+    """(1/b)^(1/r) 가 threshold에 가장 가까운 (band 수, band당 row 수)"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicateFilter:
+    """Drop sentences whose shingle Jaccard similarity to an earlier kept sentence is >= threshold"""
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, num_perm=DEDUP_NUM_PERM, shingle_size=3, min_chars=10, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_chars = min_chars
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.randint(0, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+        # band의 row 값들을 정수 하나로 합칠 때 쓰는 계수 (충돌은 후보가 늘 뿐, Jaccard 검증으로 걸러짐)
+        self.band_mix = rng.randint(1, 2 ** 32, size=self.rows, dtype=np.uint64)
+
+    def signatures(self, shingle_sets):
+        """MinHash signatures, shape (len(shingle_sets), num_perm)"""
+        lengths = np.fromiter((len(s) for s in shingle_sets), dtype=np.int64, count=len(shingle_sets))
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for s in shingle_sets for shingle in s),
+            dtype=np.uint64, count=int(lengths.sum())
+        )
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        result = np.empty((len(shingle_sets), self.num_perm), dtype=np.uint64)
+        # 문장 경계에 맞춰 블록 단위로 계산해 행렬 크기를 제한
+        start = 0
+        while start < len(shingle_sets):
+            end = int(np.searchsorted(offsets, offsets[start] + _BLOCK_SHINGLES, side="right")) - 1
+            end = max(end, start + 1)
+            block = hashes[offsets[start]:offsets[end]]
+            permuted = (self.a * block + self.b) % _PRIME
+            result[start:end] = np.minimum.reduceat(permuted, offsets[start:end] - offsets[start], axis=1).T
+            start = end
+        return result
+
+    def keep_mask(self, sentences):
+        """True for sentences to keep (first occurrence wins; short sentences are dropped)"""
+        keep = [False] * len(sentences)
+        indices = []
+        shingle_sets = []
+        for i, sentence in enumerate(sentences):
+            normalized = normalize(sentence)
+            if len(normalized) > self.min_chars:
+                indices.append(i)
+                shingle_sets.append(shingles(normalized, self.shingle_size))
+        if not indices:
+            return keep
+
+        signatures = self.signatures(shingle_sets)
+        band_keys = (signatures.reshape(len(indices), self.bands, self.rows) * self.band_mix).sum(axis=2).tolist()
+        buckets = [{} for _ in range(self.bands)]
+        kept = []    # 유지한 문장의 shingle 집합 (후보 검증용)
+        for position, i in enumerate(indices):
+            keys = band_keys[position]
+            candidates = set()
+            for band, key in enumerate(keys):
+                candidates.update(buckets[band].get(key, ()))
+            current = shingle_sets[position]
+            # LSH 후보는 실제 Jaccard로 다시 확인해 false positive 제거
+            if any(jaccard(current, kept[c]) >= self.threshold for c in candidates):
+                continue
+            keep[i] = True
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(len(kept))
+            kept.append(current)
+        return keep
+
+    def filter(self, sentences):
+        return [sentence for sentence, keep in zip(sentences, self.keep_mask(sentences)) if keep]
+
+    def filter_text(self, text, separator=". "):
+        return separator.join(self.filter(text.split(separator)))
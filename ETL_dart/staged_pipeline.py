@@ -0,0 +1,144 @@
+"""단계별 동시 실행 파이프라인
+
+기업 하나를 처음부터 끝까지 처리한 뒤 다음 기업으로 넘어가는 대신, 단계(stage)마다 워커 스레드를 두고
+단계 사이를 크기가 정해진 큐로 연결한다. 다음 단계가 밀리면 큐가 차서 앞 단계가 기다리므로(backpressure)
+메모리에 쌓이는 문서 수가 제한되고, 전체 시간은 가장 느린 단계의 처리 시간에 가까워진다.
+
+    stages = [
+        Stage("fetch", fetch, workers=4),               # 네트워크 I/O
+        Stage("extract", extract, workers=2),           # 안에서 ProcessPoolExecutor 사용
+        Stage("summarize", summarize, batch_size=8),    # 큐에 쌓인 항목을 모아 한 번에 처리
+        Stage("upload", upload, workers=2),
+    ]
+    results = StagedPipeline(stages, queue_size=4).run(items)
+
+- 단계 함수가 None을 반환하거나 예외를 던지면 그 항목은 다음 단계로 넘어가지 않는다.
+- batch_size > 1인 단계는 list를 받아 같은 길이의 list를 반환한다.
+- stop()을 부르면 새 항목 투입만 멈추고, 이미 들어간 항목은 끝까지 처리한다.
+"""
+import time
+import queue
+import threading
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers=1, batch_size=1, queue_size=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.processed = 0
+        self.dropped = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _record(self, processed, dropped, seconds):
+        with self._lock:
+            self.processed += processed
+            self.dropped += dropped
+            self.busy_seconds += seconds
+
+
+class StagedPipeline:
+    """Run items through stages connected by bounded queues"""
+
+    def __init__(self, stages, queue_size=4):
+        self.stages = stages
+        self.queue_size = queue_size
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Stop feeding new items; items already in the pipeline are finished"""
+        self._stopped.set()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def _take(self, inbox, stage):
+        """다음 처리 단위. batch 단계는 첫 항목을 기다린 뒤 이미 큐에 있는 항목을 batch_size까지 더 가져옴"""
+        item = inbox.get()
+        if item is _DONE or stage.batch_size <= 1:
+            return item
+        batch = [item]
+        while len(batch) < stage.batch_size:
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                # 종료 신호는 다음 _take에서 처리되도록 되돌려 놓음
+                inbox.put(_DONE)
+                break
+            batch.append(item)
+        return batch
+
+    def _worker(self, stage, inbox, outbox, remaining):
+        while True:
+            work = self._take(inbox, stage)
+            if work is _DONE:
+                # 같은 단계의 다른 워커도 끝나도록 신호를 되돌리고, 마지막 워커가 다음 단계에 전달
+                inbox.put(_DONE)
+                with remaining["lock"]:
+                    remaining["count"] -= 1
+                    last = remaining["count"] == 0
+                if last:
+                    outbox.put(_DONE)
+                return
+            items = work if stage.batch_size > 1 else [work]
+            started = time.perf_counter()
+            try:
+                results = stage.func(work) if stage.batch_size > 1 else [stage.func(work)]
+            except Exception as e:
+                print(f"Error in {stage.name} stage: {e}")
+                results = [None] * len(items)
+            stage._record(sum(r is not None for r in results), sum(r is None for r in results),
+                          time.perf_counter() - started)
+            for result in results:
+                if result is not None:
+                    outbox.put(result)
+
+    def run(self, items):
+        """Feed items through all stages and return the outputs of the last stage"""
+        queues = [queue.Queue(maxsize=stage.queue_size or self.queue_size) for stage in self.stages]
+        results = queue.Queue()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else results
+            remaining = {"count": stage.workers, "lock": threading.Lock()}
+            for number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(stage, queues[index], outbox, remaining),
+                    name=f"{stage.name}-{number}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        started = time.perf_counter()
+        for item in items:
+            if self.stopped:
+                break
+            # 첫 단계 큐가 차 있으면 여기서 대기 (backpressure)
+            queues[0].put(item)
+        queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        outputs = []
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            outputs.append(item)
+        self.report(elapsed)
+        return outputs
+
+    def report(self, elapsed):
+        print(f"\nPipeline finished in {elapsed:.1f}s")
+        for stage in self.stages:
+            print(f"  {stage.name:<10} workers={stage.workers:<2} processed={stage.processed:<4} "
+                  f"dropped={stage.dropped:<4} busy={stage.busy_seconds:.1f}s")
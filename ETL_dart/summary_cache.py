@@ -0,0 +1,119 @@
+"""청크 단위 요약 캐시
+
+같은 기업의 분기/반기/사업보고서는 바뀌지 않은 상투적인 문단을 많이 공유한다. 부분 요약을
+(정규화한 청크 텍스트 해시, 모델, 프롬프트 버전, 생성 파라미터)를 키로 SQLite에 저장해 두고,
+새로 생겼거나 바뀐 청크만 모델에 보낸다. KoBART(DocumentSummarizer)와 OpenAI(OpenAISummarizer)가 함께 쓴다.
+
+    cache = SummaryCache()
+    key = cache.key(chunk, "gpt-3.5-turbo-16k", PROMPT_VERSION, {"max_tokens": 5000})
+    hits = cache.get_many([key])            # {key: summary}
+    cache.put(key, summary, n_tokens=1234)  # n_tokens: 캐시 적중 시 아끼는 토큰 수
+    before = cache.stats()
+    ...
+    cache.report(since=before)              # 이번 실행의 적중률 / 절약한 토큰 수
+
+SUMMARY_CACHE=0 이면 캐시를 쓰지 않는다.
+"""
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+from typing import NamedTuple
+from contextlib import closing
+from datetime import datetime
+
+SUMMARY_CACHE = os.getenv('SUMMARY_CACHE', '1') != '0'
+SUMMARY_CACHE_DB_PATH = os.getenv(
+    'SUMMARY_CACHE_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "summary_cache.sqlite3")
+)
+# 캐시를 쓰는 요약기는 내용 기준 청크 경계를 사용 (text_chunker 참고)
+SUMMARY_CACHE_ANCHOR_EVERY = int(os.getenv('SUMMARY_CACHE_ANCHOR_EVERY', 16))
+# SQLite 바인딩 변수 개수 제한보다 작게
+_LOOKUP_BATCH = 500
+
+
+class CacheStats(NamedTuple):
+    lookups: int
+    hits: int
+    saved_tokens: int
+
+
+def normalize_chunk(text):
+    """공백 차이만 있는 청크는 같은 키가 되도록 정규화"""
+    return " ".join(text.split())
+
+
+class SummaryCache:
+    """Persistent partial-summary cache; counters are cumulative, report(since=stats()) gives one run"""
+
+    def __init__(self, path=SUMMARY_CACHE_DB_PATH):
+        self.path = path
+        self.lookups = 0
+        self.hits = 0
+        self.saved_tokens = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_summary (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT,
+                summary TEXT NOT NULL,
+                n_tokens INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT,
+                used_at TEXT
+            )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(text, model, prompt_version, params=None):
+        payload = json.dumps([normalize_chunk(text), model, prompt_version, params or {}],
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """{key: summary} for the cached keys; counts hits and saved tokens"""
+        keys = list(keys)
+        found = {}
+        with closing(self._connect()) as conn, conn:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start:start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.update((key, (summary, n_tokens)) for key, summary, n_tokens in conn.execute(
+                    f"SELECT cache_key, summary, n_tokens FROM chunk_summary WHERE cache_key IN ({placeholders})",
+                    batch
+                ))
+                conn.execute(
+                    f"UPDATE chunk_summary SET used_at = ? WHERE cache_key IN ({placeholders})",
+                    [datetime.now().isoformat(), *batch]
+                )
+        with self._lock:
+            self.lookups += len(keys)
+            self.hits += sum(key in found for key in keys)
+            self.saved_tokens += sum(found[key][1] for key in keys if key in found)
+        return {key: summary for key, (summary, _) in found.items()}
+
+    def put(self, key, summary, n_tokens=0, model=None):
+        now = datetime.now().isoformat()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunk_summary (cache_key, model, summary, n_tokens, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, summary, n_tokens, now, now)
+            )
+
+    def stats(self):
+        with self._lock:
+            return CacheStats(self.lookups, self.hits, self.saved_tokens)
+
+    def report(self, since=None):
+        """Print hit rate and saved tokens since the `since` snapshot (whole process if None)"""
+        since = since or CacheStats(0, 0, 0)
+        lookups, hits, saved_tokens = (now - before for now, before in zip(self.stats(), since))
+        rate = hits / lookups if lookups else 0.0
+        print(f"Summary cache: {hits}/{lookups} chunks reused ({rate:.0%}), ~{saved_tokens:,} tokens saved")
@@ -0,0 +1,17 @@
+"""요약 실패 표시 문자열
+
+요약기(kobart_batch, openai_summary)는 실패한 문서에 예외 대신 아래 문자열을 요약으로 돌려준다.
+파이프라인은 is_failed_summary()로 걸러 ES에 올리지 않고 watermark도 올리지 않으므로 다음 실행에서 다시 요약한다.
+"""
+NO_CONTENT = "No content to summarize"
+TEXT_PROCESSING_ERROR = "Error during text processing"
+NO_CHUNKS_ERROR = "Summarization failed for all chunks"
+# OpenAI 요약. process_company는 이 문구가 들어 있으면 한 번 더 요약을 시도함
+SUMMARY_ERROR = "요약 처리 중 오류가 발생했습니다."
+FINAL_SUMMARY_ERROR = "최종 요약 처리 중 오류가 발생했습니다."
+
+FAILED_SUMMARIES = {NO_CONTENT, TEXT_PROCESSING_ERROR, NO_CHUNKS_ERROR, SUMMARY_ERROR, FINAL_SUMMARY_ERROR}
+
+
+def is_failed_summary(summary):
+    return not summary or summary.strip() in FAILED_SUMMARIES
@@ -0,0 +1,259 @@
+"""로컬 KoBART 요약 워커
+
+모델을 한 번만 올려 두고 Unix socket 또는 로컬 HTTP로 요약 요청을 받는다. ETL 스크립트와
+Airflow task는 SUMMARY_WORKER_URL만 지정하면 모델을 직접 로드하지 않는 얇은 클라이언트가 된다.
+동시에 들어온 요청은 SUMMARY_WORKER_BATCH_WAIT 동안 모아 한 번의 배치 요약으로 처리한다.
+
+실행:
+    python summary_worker.py --socket /tmp/kobart.sock --backend onnx-int8
+    python summary_worker.py --port 8765
+
+클라이언트:
+    SUMMARY_WORKER_URL=unix:///tmp/kobart.sock python big5_ETL_pipeline.py
+    client = SummaryClient("http://127.0.0.1:8765")
+    summaries = client.summarize_many([("삼성전자", text), ...])
+
+엔드포인트:
+    GET  /health
+    POST /summarize  {"items": [[company_name, text], ...]}                 -> {"summaries": [...]}
+    POST /generate   {"texts": [...], "max_length": 500, "min_length": 100}  -> {"summaries": [...]}
+"""
+import os
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+import http.client
+import socketserver
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# http://127.0.0.1:8765 또는 unix:///tmp/kobart.sock. 비어 있으면 각 스크립트가 모델을 직접 로드
+SUMMARY_WORKER_URL = os.getenv('SUMMARY_WORKER_URL')
+SUMMARY_WORKER_TIMEOUT = float(os.getenv('SUMMARY_WORKER_TIMEOUT', 3600))
+# 동시에 들어온 요청을 한 배치로 모으기 위해 기다리는 시간 (초)
+SUMMARY_WORKER_BATCH_WAIT = float(os.getenv('SUMMARY_WORKER_BATCH_WAIT', 0.05))
+
+
+class SummaryWorkerError(Exception):
+    pass
+
+
+class _Job:
+    def __init__(self, kind, payload):
+        self.kind = kind
+        self.payload = payload
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class BatchingQueue:
+    """Run jobs on one thread, merging jobs that arrive together into a single model call"""
+
+    def __init__(self, summarizer, batch_wait=SUMMARY_WORKER_BATCH_WAIT):
+        self.summarizer = summarizer
+        self.batch_wait = batch_wait
+        self.jobs = queue.Queue()
+        threading.Thread(target=self._loop, name="summary-batcher", daemon=True).start()
+
+    def submit(self, kind, payload):
+        job = _Job(kind, payload)
+        self.jobs.put(job)
+        job.done.wait()
+        if job.error:
+            raise job.error
+        return job.result
+
+    def _collect(self):
+        jobs = [self.jobs.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self.jobs.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _loop(self):
+        while True:
+            jobs = self._collect()
+            # 같은 종류, 같은 생성 길이의 요청끼리 합쳐 실행
+            groups = {}
+            for job in jobs:
+                if job.kind == "summarize":
+                    key = ("summarize",)
+                else:
+                    key = ("generate", job.payload.get("max_length"), job.payload.get("min_length"))
+                groups.setdefault(key, []).append(job)
+            for key, group in groups.items():
+                self._run(key, group)
+
+    def _run(self, key, group):
+        field = "items" if key[0] == "summarize" else "texts"
+        merged = [item for job in group for item in job.payload[field]]
+        try:
+            if key[0] == "summarize":
+                results = self.summarizer.summarize_many([tuple(item) for item in merged])
+            else:
+                results = self.summarizer.generate(merged, max_length=key[1], min_length=key[2])
+        except Exception as e:
+            for job in group:
+                job.error = e
+                job.done.set()
+            return
+        start = 0
+        for job in group:
+            count = len(job.payload[field])
+            job.result = results[start:start + count]
+            start += count
+            job.done.set()
+
+
+class SummaryRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SummaryWorker/1.0"
+
+    def address_string(self):
+        # Unix socket에는 클라이언트 주소가 없음
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        summarizer = self.server.batcher.summarizer
+        self._send_json(200, {"status": "ok", "model": summarizer.model_name, "backend": summarizer.backend})
+
+    def do_POST(self):
+        kind = {"/summarize": "summarize", "/generate": "generate"}.get(self.path)
+        if kind is None:
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("request body must be a JSON object")
+            if not isinstance(payload.get("items" if kind == "summarize" else "texts"), list):
+                raise ValueError("items (summarize) or texts (generate) must be a list")
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        try:
+            summaries = self.server.batcher.submit(kind, payload)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"summaries": summaries})
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(summarizer, host="127.0.0.1", port=8765, socket_path=None, batch_wait=SUMMARY_WORKER_BATCH_WAIT):
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, SummaryRequestHandler)
+        address = f"unix://{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), SummaryRequestHandler)
+        address = f"http://{host}:{port}"
+    server.batcher = BatchingQueue(summarizer, batch_wait)
+    print(f"Summary worker listening on {address} ({summarizer.model_name}, {summarizer.backend})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class SummaryClient:
+    """Thin client for the summary worker (no torch/transformers needed)"""
+
+    def __init__(self, url=SUMMARY_WORKER_URL, timeout=SUMMARY_WORKER_TIMEOUT):
+        if not url:
+            raise ValueError("SUMMARY_WORKER_URL is not set")
+        self.url = url
+        self.timeout = timeout
+        parsed = urlparse(url)
+        if parsed.scheme == "unix":
+            self._connect = lambda: UnixHTTPConnection(parsed.path, timeout)
+        elif parsed.scheme == "http":
+            self._connect = lambda: http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+        else:
+            raise ValueError(f"Unsupported summary worker URL: {url} (use http:// or unix://)")
+
+    def _request(self, method, path, payload=None):
+        conn = self._connect()
+        try:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"{}")
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            raise SummaryWorkerError(f"Summary worker at {self.url} is not reachable: {e}") from e
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise SummaryWorkerError(f"Summary worker error {response.status}: {data.get('error')}")
+        return data
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def summarize_many(self, items):
+        """[(company_name, text), ...] -> summaries in the same order"""
+        return self._request("POST", "/summarize", {"items": [list(item) for item in items]})["summaries"]
+
+    def generate(self, texts, max_length=None, min_length=None):
+        """Summarize raw texts without normalization/chunking (None where generation failed)"""
+        return self._request("POST", "/generate", {
+            "texts": list(texts), "max_length": max_length, "min_length": min_length
+        })["summaries"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 KoBART 요약 워커")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Unix socket 경로 (지정하면 HTTP 포트 대신 사용)")
+    parser.add_argument("--model", default=None, help="모델 이름 (기본: digit82/kobart-summarization)")
+    parser.add_argument("--backend", default=None, help="torch / onnx / onnx-int8 (기본: SUMMARY_BACKEND)")
+    parser.add_argument("--batch-wait", type=float, default=SUMMARY_WORKER_BATCH_WAIT,
+                        help="동시 요청을 한 배치로 모으는 대기 시간(초)")
+    args = parser.parse_args(argv)
+
+    # torch/transformers는 워커 프로세스에서만 필요
+    from kobart_batch import DocumentSummarizer, MODEL_NAME
+    summarizer = DocumentSummarizer(args.model or MODEL_NAME, args.backend)
+    serve(summarizer, args.host, args.port, args.socket, args.batch_wait)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""토큰 수 기준 문장 단위 청크 분할
+
+문서를 한 번만 토큰화해 각 토큰의 시작 위치(offset)를 구하고, 한국어 문장 경계(…다. / …요. 등)로
+나눈 문장마다 토큰 수를 offset 구간으로 센다. 문장 단위로 정확한 토큰 예산까지 채우고,
+예산보다 긴 문장은 토큰 경계에서 자른다. 필요하면 앞 청크의 마지막 문장들을 다음 청크에 겹쳐 넣는다.
+
+anchor_every를 주면 내용으로 정해지는 문장(해시 % anchor_every == 0)에서도 청크를 끊는다.
+앞부분에 문장이 추가/삭제되어도 다음 anchor 문장부터는 경계가 같아지므로, 바뀌지 않은 구간의
+청크가 이전 실행과 같은 텍스트가 되어 요약 캐시를 재사용할 수 있다.
+
+    chunker = TextChunker.for_huggingface(tokenizer, max_tokens=1000)      # KoBART
+    chunker = TextChunker.for_openai("gpt-3.5-turbo-16k", max_tokens=3000)  # OpenAI (tiktoken)
+    for chunk in chunker.split(text):
+        print(chunk.n_tokens, chunk.text[:50])
+"""
+import os
+import re
+import zlib
+from bisect import bisect_left
+from typing import NamedTuple
+
+CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', 0))
+# 0이면 토큰 예산을 채울 때만 끊음
+CHUNK_ANCHOR_EVERY = int(os.getenv('CHUNK_ANCHOR_EVERY', 0))
+
+# 문장 끝: 한국어 종결어미 + 마침표(숫자 소수점 제외), 공백 앞의 . ! ?, 줄바꿈
+SENTENCE_END = re.compile(r"(?:[다요음함됨임]\.(?!\d)|[.!?](?=\s|$))\s*|\n\s*")
+
+
+class Chunk(NamedTuple):
+    text: str
+    start: int
+    end: int
+    n_tokens: int
+
+
+class _Unit(NamedTuple):
+    start: int
+    end: int
+    n_tokens: int
+
+
+def sentence_spans(text):
+    """(start, end) character spans covering the whole text, split at sentence boundaries"""
+    spans = []
+    start = 0
+    for m in SENTENCE_END.finditer(text):
+        if m.end() > start and text[start:m.end()].strip():
+            spans.append((start, m.end()))
+            start = m.end()
+    if text[start:].strip():
+        spans.append((start, len(text)))
+    elif spans:
+        # 끝의 공백은 마지막 문장에 붙여 모든 토큰이 어느 문장엔가 속하도록 함
+        spans[-1] = (spans[-1][0], len(text))
+    return spans
+
+
+class HuggingFaceTokens:
+    """Token start offsets from a (fast) Hugging Face tokenizer, special tokens excluded"""
+
+    def __init__(self, tokenizer):
+        if not getattr(tokenizer, "is_fast", False):
+            raise ValueError("offset mapping requires a fast tokenizer (use_fast=True)")
+        self.tokenizer = tokenizer
+
+    def token_starts(self, text):
+        encoded = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return [start for start, end in encoded["offset_mapping"]]
+
+
+class TiktokenTokens:
+    """Token start offsets from tiktoken (OpenAI models)"""
+
+    def __init__(self, model):
+        import tiktoken
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text):
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def token_starts(self, text):
+        tokens = self.encoding.encode(text, disallowed_special=())
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        return offsets
+
+
+class TextChunker:
+    """Pack sentences into chunks of at most max_tokens using one tokenization of the document"""
+
+    def __init__(self, tokens, max_tokens, overlap_tokens=CHUNK_OVERLAP_TOKENS, anchor_every=CHUNK_ANCHOR_EVERY):
+        self.tokens = tokens
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.anchor_every = anchor_every
+
+    @classmethod
+    def for_huggingface(cls, tokenizer, max_tokens, overlap_tokens=CHUNK_OVERLAP_TOKENS,
+                        anchor_every=CHUNK_ANCHOR_EVERY):
+        return cls(HuggingFaceTokens(tokenizer), max_tokens, overlap_tokens, anchor_every)
+
+    @classmethod
+    def for_openai(cls, model, max_tokens, overlap_tokens=CHUNK_OVERLAP_TOKENS, anchor_every=CHUNK_ANCHOR_EVERY):
+        return cls(TiktokenTokens(model), max_tokens, overlap_tokens, anchor_every)
+
+    def _is_anchor(self, text, unit):
+        sentence = " ".join(text[unit.start:unit.end].split())
+        return zlib.crc32(sentence.encode("utf-8")) % self.anchor_every == 0
+
+    def _units(self, text, starts, max_tokens):
+        """문장 단위 (start, end, 토큰 수). 예산보다 긴 문장은 토큰 경계에서 여러 조각으로 나눔"""
+        units = []
+        for start, end in sentence_spans(text):
+            first, last = bisect_left(starts, start), bisect_left(starts, end)
+            if last - first <= max_tokens:
+                units.append(_Unit(start, end, last - first))
+                continue
+            for i in range(first, last, max_tokens):
+                j = min(i + max_tokens, last)
+                units.append(_Unit(start if i == first else starts[i], end if j == last else starts[j], j - i))
+        return units
+
+    def split(self, text, max_tokens=None, overlap_tokens=None):
+        """Return Chunk list; n_tokens is counted on the single document tokenization"""
+        max_tokens = max_tokens or self.max_tokens
+        overlap_tokens = self.overlap_tokens if overlap_tokens is None else overlap_tokens
+        if not text or not text.strip():
+            return []
+        units = self._units(text, self.tokens.token_starts(text), max_tokens)
+
+        chunks = []
+        # fresh: 겹쳐 넣은 문장을 제외하고 현재 청크에 새로 들어간 문장 수
+        current, current_tokens, fresh = [], 0, 0
+        for index, unit in enumerate(units):
+            if fresh and current_tokens + unit.n_tokens > max_tokens:
+                chunks.append(self._make_chunk(text, current, current_tokens))
+                current, current_tokens = self._carry(current, overlap_tokens, max_tokens - unit.n_tokens)
+                fresh = 0
+            current.append(unit)
+            current_tokens += unit.n_tokens
+            fresh += 1
+            # 청크가 너무 잘게 나뉘지 않도록 예산의 절반을 채운 뒤에만 anchor에서 끊음
+            if (self.anchor_every and current_tokens >= max_tokens // 2 and index + 1 < len(units)
+                    and self._is_anchor(text, unit)):
+                chunks.append(self._make_chunk(text, current, current_tokens))
+                current, current_tokens = self._carry(current, overlap_tokens, max_tokens - units[index + 1].n_tokens)
+                fresh = 0
+        if fresh:
+            chunks.append(self._make_chunk(text, current, current_tokens))
+        return chunks
+
+    @staticmethod
+    def _carry(units, overlap_tokens, budget):
+        """앞 청크 끝 문장들을 overlap 예산만큼 다음 청크 앞에 다시 넣음 (다음 문장이 들어갈 자리는 남김)"""
+        carried, carried_tokens = [], 0
+        for previous in reversed(units):
+            total = carried_tokens + previous.n_tokens
+            if total > overlap_tokens or total > budget:
+                break
+            carried.insert(0, previous)
+            carried_tokens = total
+        return carried, carried_tokens
+
+    @staticmethod
+    def _make_chunk(text, units, n_tokens):
+        start, end = units[0].start, units[-1].end
+        return Chunk(text[start:end].strip(), start, end, n_tokens)
+
+    def chunk_texts(self, text, max_tokens=None, overlap_tokens=None):
+        return [chunk.text for chunk in self.split(text, max_tokens, overlap_tokens)]
@@ -0,0 +1,126 @@
+"""요약 전처리용 텍스트 정규화
+
+big5_ETL_pipeline의 preprocess_text / clean_text가 패턴마다 re.sub를 따로 돌리던 것을
+- 미리 컴파일하고, 같은 치환(삭제)끼리는 하나의 alternation으로 합치고,
+- 기업별 표기 통일 규칙은 코드가 아니라 데이터(COMPANY_RULES 또는 JSON 파일)로 받고,
+- 여러 문서를 한 번에 처리하는 batch API(normalize_batch)를 제공한다.
+
+    normalizer = TextNormalizer()
+    text = normalizer.normalize(report_text, "SK하이닉스")     # preprocess + clean
+    summary = normalizer.clean(summary_text)
+"""
+import os
+import re
+import json
+from functools import lru_cache
+from multiprocessing import Pool
+
+# 기업별 표기 통일 규칙: {정식 표기: [별칭 정규식, ...]}
+COMPANY_RULES = {
+    "SK하이닉스": [
+        r"SK\s+[Hh]ynix\s+(?:Semiconductor|Semionutor)\s+[A-Za-z]+\s+(?:Ltd\.|Inc\.)",
+        r"(?:SK하이닉스|에스케이하이닉스)\s*주식회사",
+    ],
+}
+COMPANY_RULES_PATH = os.getenv('COMPANY_RULES_PATH')
+
+WHITESPACE = re.compile(r"\s+")
+DISALLOWED_CHARS = re.compile(r"[^\w\s.,!?]+")
+TRAILING_LT = re.compile(r"(?:Lt\.,?\s*)+")
+
+# preprocess 단계에서 지우는 신용등급/채권 관련 표현 (등급 기호는 단어 단위로만 매칭)
+# 채권 패턴은 영문 단어 시작에서만 시도해 단어 중간마다 [A-Za-z]*를 다시 훑지 않도록 함 (결과는 동일)
+PREPROCESS_DELETIONS = [
+    r"(?<![A-Za-z])[A-Za-z]* ?Bonds? -? [0-9A-Za-z ]+|Issuer Credit Rating|채권보다는|원리금 지급능력|기업신용평가",
+    r"Moodys|S&P|Fitch|한국기업평가|한국신용평가",
+    r"\b(?:AAA|AA|A3|BBB|BB|CCC|CC|C|D)\b(?:[\s-]*안정적|[\s-]*부정적|[\s-]*긍정적)?",
+]
+# clean 단계에서 지우는 숫자 나열과 법인 형태 약어
+CLEAN_DELETIONS = [
+    r"\b\d+(?:,\d+)*\b(?:\s*\b\d+(?:,\d+)*\b)+",
+    r"(?:Co\.,?|Corp\.,?|Inc\.,?)\s*",
+]
+
+
+def merge(patterns, flags=0):
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+
+
+def load_company_rules(path=COMPANY_RULES_PATH):
+    """JSON 파일({정식 표기: [별칭 정규식, ...]})이 있으면 기본 규칙에 덧붙여 반환"""
+    rules = {name: list(aliases) for name, aliases in COMPANY_RULES.items()}
+    if path:
+        with open(path, encoding='utf-8') as f:
+            for name, aliases in json.load(f).items():
+                rules.setdefault(name, []).extend(aliases)
+    return rules
+
+
+@lru_cache(maxsize=256)
+def repeated_name_pattern(company_name):
+    """회사명이 다시 나올 때까지의 구간을 회사명 하나로 줄이는 패턴 (기업별로 한 번만 컴파일)"""
+    return re.compile(fr"({re.escape(company_name)})\b.*?\b\1")
+
+
+class TextNormalizer:
+    """Precompiled, merged normalization passes with per-company alias rules as data"""
+
+    def __init__(self, company_rules=None):
+        rules = company_rules if company_rules is not None else load_company_rules()
+        self.preprocess_deletions = merge(PREPROCESS_DELETIONS, re.IGNORECASE)
+        self.clean_deletions = merge(CLEAN_DELETIONS)
+        # 모든 기업의 별칭을 그룹 하나씩으로 합쳐 한 번에 치환
+        self.canonical_names = {}
+        alternatives = []
+        for name, aliases in rules.items():
+            for alias in aliases:
+                group = f"c{len(self.canonical_names)}"
+                self.canonical_names[group] = name
+                alternatives.append(f"(?P<{group}>{alias})")
+        self.aliases = re.compile("|".join(alternatives)) if alternatives else None
+
+    def _canonicalize(self, text):
+        if self.aliases is None:
+            return text
+        return self.aliases.sub(lambda m: self.canonical_names[m.lastgroup], text)
+
+    def preprocess(self, text, company_name=None):
+        """Whitespace/character cleanup and credit-rating noise removal (was preprocess_text)"""
+        text = WHITESPACE.sub(" ", text)
+        text = DISALLOWED_CHARS.sub("", text)
+        if company_name:
+            text = repeated_name_pattern(company_name).sub(r"\1", text)
+        text = self.preprocess_deletions.sub("", text)
+        return text.strip()
+
+    def clean(self, text):
+        """Alias unification and abbreviation/number-run removal (was clean_text)"""
+        text = TRAILING_LT.sub("Ltd.", text)
+        text = self._canonicalize(text)
+        text = self.clean_deletions.sub("", text)
+        text = WHITESPACE.sub(" ", text)
+        return text.strip()
+
+    def normalize(self, text, company_name=None):
+        """preprocess + clean for a full report"""
+        return self.clean(self.preprocess(text, company_name))
+
+    def normalize_batch(self, items, workers=None):
+        """Normalize many (text, company_name) pairs; workers > 1 uses a process pool"""
+        items = list(items)
+        if not workers or workers <= 1 or len(items) < 2:
+            return [self.normalize(text, company_name) for text, company_name in items]
+        with Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            return pool.starmap(_normalize_in_worker, items, chunksize=max(1, len(items) // (workers * 4)))
+
+
+_worker_normalizer = None
+
+
+def _init_worker(normalizer):
+    global _worker_normalizer
+    _worker_normalizer = normalizer
+
+
+def _normalize_in_worker(text, company_name):
+    return _worker_normalizer.normalize(text, company_name)
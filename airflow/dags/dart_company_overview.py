@@ -2,14 +2,17 @@ from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
 import requests
-import zipfile
 import os
-from io import BytesIO
-from bs4 import BeautifulSoup
 import pymysql
 import pandas as pd
 from dotenv import load_dotenv
 import logging
+# ETL_dart 공용 모듈 (docker-compose에서 /opt/airflow/ETL_dart 마운트 + PYTHONPATH)
+from dart_client import DartClient
+from dart_quota import QuotaExceeded, todays_batch
+from corp_codes import iter_corp_codes
+from report_sections import SectionExtractor, COMPANY_OVERVIEW_PATTERNS
+from etl_watermark import WatermarkStore, FilingFeedError, fetch_new_filings, feed_window, select_candidates
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +21,9 @@ logger = logging.getLogger(__name__)
 # 환경 변수 로드
 load_dotenv()
 
+# company_overviews 적재용 watermark (ETL_dart/data/etl_watermark.sqlite3)
+WATERMARK_PIPELINE = 'company_overviews'
+
 # 데이터베이스 설정
 DB_CONFIG = {
     'host': os.getenv('host'),
@@ -53,107 +59,116 @@ def create_table():
 
 def get_company_list():
     """DART에서 기업 목록 가져오기"""
-    api_key = os.getenv('DART_API_KEY')
-    url = "https://opendart.fss.or.kr/api/corpCode.xml"
-    
-    response = requests.get(url, params={'crtfc_key': api_key})
-    if response.status_code != 200:
-        raise Exception(f"Failed to get company list: {response.status_code}")
-    
-    with zipfile.ZipFile(BytesIO(response.content)) as z:
-        with z.open(z.namelist()[0]) as f:
-            soup = BeautifulSoup(f, 'xml')
+    dart = DartClient(os.getenv('DART_API_KEY'))
+    try:
+        response = dart.get("corpCode.xml")
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"Failed to get company list: {e}")
+    finally:
+        dart.close()
     
-    companies = []
-    for corp in soup.find_all('list'):
-        stock_code = corp.find('stock_code').text.strip()
-        if stock_code:  # 상장 기업만 포함
-            companies.append({
-                'corp_code': corp.find('corp_code').text.strip(),
-                'corp_name': corp.find('corp_name').text.strip(),
-                'stock_code': stock_code
-            })
+    # 상장 기업만 포함 (ZIP 안의 XML을 스트리밍 파싱)
+    companies = [
+        {
+            'corp_code': corp.corp_code,
+            'corp_name': corp.corp_name,
+            'stock_code': corp.stock_code,
+            'modify_date': corp.modify_date
+        }
+        for corp in iter_corp_codes(response.content, listed_only=True)
+    ]
     
     logger.info(f"Retrieved {len(companies)} listed companies")
     return companies
 
-def extract_company_overview(xml_content):
-    """XML에서 회사 개요 추출"""
-    soup = BeautifulSoup(xml_content, 'xml')
-    section = soup.find("TITLE", string=lambda text: text and "회사의 개요" in text)
-    
-    if not section:
-        return None
-    
-    content = []
-    for sibling in section.find_all_next():
-        if sibling.name == "TITLE":
-            break
-        if sibling.name in ["P", "TABLE", "SPAN"]:
-            text = sibling.get_text(strip=True)
-            if text and text not in content:
-                content.append(text)
-    
-    return "\n".join(content) if content else None
+# "회사의 개요" TITLE 아래 P/TABLE/SPAN 블록 (ZIP에서 한 번에 스트리밍 파싱)
+overview_extractor = SectionExtractor(
+    COMPANY_OVERVIEW_PATTERNS, title_tags=("TITLE",), content_tags=("P", "TABLE", "SPAN"),
+    min_chars=1, skip_phrases=()
+)
 
-def get_processed_corp_codes():
-    """MySQL에서 이미 처리된 기업 목록 조회"""
-    conn = pymysql.connect(**DB_CONFIG)
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT corp_code FROM company_overviews")
-            processed_corp_codes = {row[0] for row in cursor.fetchall()}
-    finally:
-        conn.close()
-    return processed_corp_codes
+def extract_company_overview(report):
+    """document.xml ZIP에서 회사 개요 추출"""
+    return overview_extractor.extract_text(report)
+
+def get_changed_companies(dart, store, companies):
+    """watermark 이후 새 정기공시가 있거나 기업정보(modify_date)가 바뀐 기업만 선택"""
+    since = feed_window(store)
+    new_filings = None
+    if since is not None:
+        try:
+            new_filings = fetch_new_filings(dart, since)
+            logger.info(f"{len(new_filings)} companies filed new periodic reports since {since}")
+        except (requests.exceptions.RequestException, FilingFeedError) as e:
+            logger.warning(f"Failed to fetch new filings since {since}, re-checking all companies: {e}")
+    return select_candidates(store, companies, new_filings), new_filings or {}
 
 def process_company_batch(**context):
-    """기업 배치 처리 (이미 처리된 기업 제외)"""
-    api_key = os.getenv('DART_API_KEY')
+    """기업 배치 처리 (watermark 이후 새 공시가 있는 기업만)"""
+    dart = DartClient(os.getenv('DART_API_KEY'))
+    store = WatermarkStore(WATERMARK_PIPELINE)
     task_instance = context['task_instance']
     companies = task_instance.xcom_pull(task_ids='get_company_list')
+    run_date = datetime.now().strftime("%Y%m%d")
 
-    # ✅ MySQL에서 이미 처리된 기업 조회
-    processed_corp_codes = get_processed_corp_codes()
+    # ✅ 전체 기업이 아니라 그날 변경분만 처리
+    new_companies, new_filings = get_changed_companies(dart, store, companies)
+    candidate_count = len(new_companies)
 
-    new_companies = [company for company in companies if company['corp_code'] not in processed_corp_codes]
+    # ✅ 기업당 list.json + document.xml 2건: 오늘 남은 DART 한도만큼만 처리하고 나머지는 다음 실행으로 이월
+    todays = todays_batch(new_companies, calls_per_item=2, api_key=dart.api_key)
+    if len(todays) < len(new_companies):
+        logger.info(f"Daily DART quota: deferring {len(new_companies) - len(todays)} companies to the next run")
+    new_companies = todays
 
     if not new_companies:
         logger.info("No new companies to process.")
+        if candidate_count == 0:
+            store.set_feed_date(run_date)
         return
 
+    # ✅ MySQL 커밋 후에 watermark를 올리기 위해 모아 둠
+    advanced = []
+    stopped = False
+
     # ✅ MySQL 연결을 전체 로직에서 관리
     conn = pymysql.connect(**DB_CONFIG)
     try:
         cursor = conn.cursor()
         for company in new_companies:
             try:
-                url = "https://opendart.fss.or.kr/api/list.json"
-                params = {
-                    'crtfc_key': api_key,
-                    'corp_code': company['corp_code'],
-                    'pblntf_ty': 'A',  
-                    'page_count': 1,
-                    'pblntf_detail_ty': ['A001', 'A002', 'A003', 'A004']
-                }
-                response = requests.get(url, params=params)
-                if response.status_code != 200 or not response.json().get('list'):
-                    logger.warning(f"No reports found for {company['corp_name']}")
+                # 공시 피드에서 이미 최신 rcept_no를 알면 list.json 호출 생략
+                rcept_no = new_filings.get(company['corp_code'])
+                if not rcept_no:
+                    params = {
+                        'corp_code': company['corp_code'],
+                        'pblntf_ty': 'A',  
+                        'page_count': 1,
+                        'pblntf_detail_ty': ['A001', 'A002', 'A003', 'A004']
+                    }
+                    try:
+                        reports = dart.get_json("list.json", params)
+                    except requests.exceptions.RequestException:
+                        reports = {}
+                    if not reports.get('list'):
+                        logger.warning(f"No reports found for {company['corp_name']}")
+                        continue
+
+                    rcept_no = reports['list'][0]['rcept_no']
+
+                mark = store.get(company['corp_code'])
+                if mark and mark['rcept_no'] == rcept_no:
+                    # 기업정보만 바뀌고 새 공시는 없음
+                    advanced.append((company['corp_code'], rcept_no, company.get('modify_date')))
                     continue
 
-                rcept_no = response.json()['list'][0]['rcept_no']
-
-                doc_url = "https://opendart.fss.or.kr/api/document.xml"
-                doc_params = {'crtfc_key': api_key, 'rcept_no': rcept_no}
-                doc_response = requests.get(doc_url, params=doc_params)
-                if doc_response.status_code != 200:
+                try:
+                    doc_response = dart.get("document.xml", {'rcept_no': rcept_no})
+                except requests.exceptions.RequestException:
                     logger.warning(f"Failed to get document for {company['corp_name']}")
                     continue
 
-                with zipfile.ZipFile(BytesIO(doc_response.content)) as z:
-                    xml_content = z.read(z.namelist()[0]).decode('utf-8')
-
-                overview = extract_company_overview(xml_content)
+                overview = extract_company_overview(doc_response.content)
                 if overview:
                     cursor.execute("""
                         INSERT INTO company_overviews 
@@ -162,20 +177,32 @@ def process_company_batch(**context):
                         ON DUPLICATE KEY UPDATE overview=VALUES(overview), updated_at=CURRENT_TIMESTAMP
                     """, (company['corp_code'], company['corp_name'], company['stock_code'], overview))
                     logger.info(f"Successfully processed {company['corp_name']}")
+                advanced.append((company['corp_code'], rcept_no, company.get('modify_date')))
 
+            except QuotaExceeded as e:
+                logger.warning(f"{e}; stopping before {company['corp_name']}")
+                stopped = True
+                break
             except Exception as e:
                 logger.error(f"Error processing company {company['corp_name']}: {str(e)}")
                 continue  # ✅ 오류 발생 시 다음 기업으로 계속 진행
 
         conn.commit()  # ✅ 모든 데이터를 처리한 후 한 번만 `commit()`
+
+        for corp_code, rcept_no, modify_date in advanced:
+            store.advance(corp_code, rcept_no, modify_date)
+        # 한도 때문에 남은 기업이 없을 때만 공시 피드 시작일을 오늘로 이동
+        if not stopped and len(new_companies) == candidate_count:
+            store.set_feed_date(run_date)
     
     except Exception as e:
         logger.error(f"Batch processing error: {str(e)}")
     
     finally:
         conn.close()  # ✅ MySQL 연결은 최종적으로 닫기
+        dart.close()
 
-    logger.info(f"Successfully processed batch of {len(new_companies)} new companies")
+    logger.info(f"Processed batch of {len(new_companies)} changed companies ({len(advanced)} watermarks advanced)")
 
 
 
@@ -1,13 +1,21 @@
 import os
+import time
+import asyncio
+import logging
 import openai
 from dotenv import load_dotenv
 from elasticsearch import Elasticsearch
-import pandas as pd
-import pymysql
-from sqlalchemy import create_engine
+from app.databases import fetch_all
+from app.usage_ledger import ledger, count_stream_usage
+from app.model_router import router
+from app.retrieval import select_business_context
+from app.ncs_ranker import rank_competencies, format_competencies
+from app.ncs_catalog import ncs_catalog
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # 엘라스틱 연결
 ELASTICSEARCH_HOST = os.getenv('ELASTICSEARCH_HOST', 'localhost')
 ELASTICSEARCH_PORT = int(os.getenv('ELASTICSEARCH_PORT', 9200))
@@ -15,14 +23,6 @@ es_client = Elasticsearch(
     hosts=[{'host': ELASTICSEARCH_HOST, 'port': ELASTICSEARCH_PORT, 'scheme': 'http'}]
 )
 
-# mysql 연결
-mysql_user = os.getenv('mysql_user')
-mysql_password = os.getenv('mysql_password')
-mysql_host = os.getenv('mysql_host')
-mysql_port = os.getenv('mysql_port')
-connecting_string = f"mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/NCS_DB"
-engine = create_engine(connecting_string)
-
 # LLM 연결
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
@@ -31,6 +31,78 @@ if not OPENAI_API_KEY:
 openai.api_key = OPENAI_API_KEY
 
 
+# 호출 지연시간을 라우터에 반영하고 사용량 ledger에 기록
+async def _record_call(route, selected, started, usage, companyname, session_id, status):
+    latency_ms = (time.perf_counter() - started) * 1000
+    router.observe(selected["model"], latency_ms)
+    await asyncio.to_thread(
+        ledger.record,
+        route=route,
+        model=selected["model"],
+        usage=usage,
+        latency_ms=latency_ms,
+        companyname=companyname,
+        session_id=session_id,
+        status=status,
+        model_route=selected["route"],
+    )
+
+
+# LLM 호출: 작업별 모델 라우팅 + 사용량/지연시간 기록
+async def create_chat_completion(route, task, messages, companyname=None, session_id=None):
+    selected = router.select(task)
+    started = time.perf_counter()
+    response = None
+    status = "ok"
+    try:
+        response = await openai.ChatCompletion.acreate(
+            model=selected["model"],
+            messages=messages,
+            max_tokens=selected["max_tokens"],
+            temperature=selected["temperature"],
+        )
+        return response
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        usage = response.get("usage") if response else None
+        await _record_call(route, selected, started, usage, companyname, session_id, status)
+
+
+# 스트리밍 LLM 호출: 토큰(delta) 단위로 yield
+# 스트리밍 응답에는 usage가 없으므로 요청 메시지와 받은 응답을 tiktoken으로 세어 기록
+async def stream_chat_completion(route, task, messages, companyname=None, session_id=None):
+    selected = router.select(task)
+    started = time.perf_counter()
+    completion = []
+    status = "ok"
+    try:
+        response = await openai.ChatCompletion.acreate(
+            model=selected["model"],
+            messages=messages,
+            max_tokens=selected["max_tokens"],
+            temperature=selected["temperature"],
+            stream=True,
+        )
+        async for chunk in response:
+            content = chunk["choices"][0]["delta"].get("content")
+            if content:
+                completion.append(content)
+                yield content
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        try:
+            usage = await asyncio.to_thread(count_stream_usage, selected["model"], messages, "".join(completion))
+        except Exception as e:
+            # 토큰을 세지 못해도 호출/지연시간은 기록 (usage 없이)
+            logger.warning("스트리밍 토큰 집계 실패", extra={"error": str(e)})
+            usage = None
+        await _record_call(route, selected, started, usage, companyname, session_id, status)
+
+
 # 엘라스틱에 답 받아오기
 def search_business_overview(company_name):
     # 검색 쿼리 구성: company_name 필드에 대해 입력 받은 값을 매치하고, _source 파라미터로 반환할 필드를 지정합니다.
@@ -40,7 +112,7 @@ def search_business_overview(company_name):
                 "company_name": company_name
             }
         },
-        "_source": ["business_overview_summary"]
+        "_source": ["business_overview_summary", "passage_index", "updated_at"]
     }
 
     try:
@@ -48,92 +120,129 @@ def search_business_overview(company_name):
         hits = results.get("hits", {}).get("hits", [])
         return hits
     except :
-        return ""
+        return []
 
 # 직무내용 받아오기
-def create_query(subcategory) :
-    query = f"""
+def create_query():
+    query = """
     with ncs_code2 as (
     select dutyCd from ncs_code
-    where ncsSubdCdNm = '{subcategory}')
+    where ncsSubdCdNm = :subcategory)
     select gbnName, gbnVal
     from ncs_code2 c, ncs_skills s
-    where c.dutyCd = s.dutyCd;
+    where c.dutyCd = s.dutyCd
     """
     return query
-def execute_query_to_dataframe(query):
+
+
+async def get_skill_rows(subcategory):
+    """직무 역량: 메모리에 올려 둔 요약 테이블에서 조회 (적재 전이면 공용 풀로 원본 테이블 조인)"""
+    if ncs_catalog.loaded:
+        return ncs_catalog.get(subcategory)
     try:
-        # pandas의 read_sql 함수를 사용하여 쿼리 실행 및 DataFrame 생성
-        df = pd.read_sql(query, engine)
-        return df
+        rows = await fetch_all(create_query(), {"subcategory": subcategory})
+        return [(row["gbnName"], row["gbnVal"]) for row in rows]
     except Exception as e:
-        print(f"Error executing query: {e}")
-        return None
+        logger.error("Error executing query", extra={"error": str(e)})
+        return []
 
 
-async def get_interview_response(user_answer: str, companyname: str, subcategory: str) -> str:
-    try:
-        # 기업정보 받아오기
-        business_overview = search_business_overview(companyname)
-        ncs_skills = execute_query_to_dataframe(create_query(subcategory))
-        print(ncs_skills)
+# 면접 질문 생성용 프롬프트 구성
+def build_interview_messages(user_answer: str, companyname: str, subcategory: str, skill_rows: list) -> list:
+    # 기업정보 받아오기 (답변과 관련된 passage만 선택)
+    hits = search_business_overview(companyname)
+    business_overview = select_business_context(hits, user_answer)
+    logger.debug("ncs skills loaded", extra={"subcategory": subcategory, "catalog_version": ncs_catalog.version})
+    # 답변과 관련된 직무 역량만 선택
+    competencies = format_competencies(rank_competencies(subcategory, skill_rows, user_answer))
+
+    prompt = f"""
+    [기업 정보]
+    {business_overview}
+
+    [지원 직무]
+    {subcategory}
 
-        prompt = f"""
-        [기업 정보]
-        {business_overview}
+    [직무 역량]
+    {competencies}
+    
 
-        [지원 직무]
-        {subcategory}
+    당신은 {companyname}의 면접관입니다.
 
-        [직무 역량]
-        {ncs_skills}
-        
+    지원자가 자기소개한 것을 토대로, 다음 요구사항을 모두 반영하여 후속 질문(꼬리 질문)을 생성하십시오:
+    1. 기업의 사업 특성을 반영한 질문  
+    2. 해당 직무에서 요구되는 역량을 평가할 수 있는 질문  
+    3. 상황판단 능력을 평가하는 질문  
+    4. 앞서 지원자가 제출한 자기소개를 기반으로 한 추가 질문
 
-        당신은 {companyname}의 면접관입니다.
+    반드시 한 번에 하나의 질문만 생성해 주세요.
 
-        지원자가 자기소개한 것을 토대로, 다음 요구사항을 모두 반영하여 후속 질문(꼬리 질문)을 생성하십시오:
-        1. 기업의 사업 특성을 반영한 질문  
-        2. 해당 직무에서 요구되는 역량을 평가할 수 있는 질문  
-        3. 상황판단 능력을 평가하는 질문  
-        4. 앞서 지원자가 제출한 자기소개를 기반으로 한 추가 질문
+    지원자 자기소개:
+    "{user_answer}"
+    """
 
-        반드시 한 번에 하나의 질문만 생성해 주세요.
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": user_answer}
+    ]
 
-        지원자 자기소개:
-        "{user_answer}"
-        """
 
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4o-mini",  # 최신 GPT 모델 사용
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": user_answer}
-            ]
+async def get_interview_response(user_answer: str, companyname: str, subcategory: str, session_id: str = None) -> str:
+    try:
+        skill_rows = await get_skill_rows(subcategory)
+        messages = await asyncio.to_thread(build_interview_messages, user_answer, companyname, subcategory, skill_rows)
+        response = await create_chat_completion(
+            "/interview",
+            "interview",
+            messages=messages,
+            companyname=companyname,
+            session_id=session_id,
         )
         return response["choices"][0]["message"]["content"].strip()
     
     except Exception as e:
-        print(f"❌ OpenAI API 오류 발생: {e}")
+        logger.error("❌ OpenAI API 오류 발생", extra={"error": str(e), "companyname": companyname})
         return "죄송합니다. 응답을 생성하는 중 오류가 발생했습니다."
+
+
+# 면접 질문을 토큰 단위로 스트리밍 (WebSocket 채널용)
+async def stream_interview_response(user_answer: str, companyname: str, subcategory: str, session_id: str = None):
+    skill_rows = await get_skill_rows(subcategory)
+    messages = await asyncio.to_thread(build_interview_messages, user_answer, companyname, subcategory, skill_rows)
+    async for token in stream_chat_completion(
+        "/ws/interview",
+        "interview",
+        messages=messages,
+        companyname=companyname,
+        session_id=session_id,
+    ):
+        yield token
     
 
 
-async def get_interview_feedback(conversation_text: str) -> str:
+async def generate_interview_feedback(conversation_text: str, session_id: str = None) -> str:
+    """피드백 생성 (실패하면 예외를 그대로 전달, 피드백 작업이 error 상태로 기록)"""
+    response = await create_chat_completion(
+        "/interview-feedback",
+        "feedback",
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "당신은 전문 면접관입니다. 다음 대화 내용을 바탕으로 면접 피드백(요약)을 제공하세요. "
+                    "개선할 점을 간략하게 정리해 주세요."
+                )
+            },
+            {"role": "user", "content": conversation_text}
+        ],
+        session_id=session_id,
+    )
+    return response["choices"][0]["message"]["content"].strip()
+
+
+async def get_interview_feedback(conversation_text: str, session_id: str = None) -> str:
     try:
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "당신은 전문 면접관입니다. 다음 대화 내용을 바탕으로 면접 피드백(요약)을 제공하세요. "
-                        "개선할 점을 간략하게 정리해 주세요."
-                    )
-                },
-                {"role": "user", "content": conversation_text}
-            ]
-        )
-        return response["choices"][0]["message"]["content"].strip()
+        return await generate_interview_feedback(conversation_text, session_id)
     except Exception as e:
-        print(f"❌ 피드백 생성 오류 발생: {e}")
+        logger.error("❌ 피드백 생성 오류 발생", extra={"error": str(e)})
         return "죄송합니다. 피드백을 생성하는 중 오류가 발생했습니다."
\ No newline at end of file
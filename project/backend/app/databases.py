@@ -1,4 +1,8 @@
 import os
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
 import sqlalchemy
 import databases
 
@@ -8,8 +12,111 @@ mysql_password = os.getenv('mysql_password', 'your_password')
 mysql_host = os.getenv('mysql_host', 'localhost')
 mysql_port = os.getenv('mysql_port', '3306')
 
-DATABASE_URL = f"mysql+pymysql://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/NCS_DB"
-database = databases.Database(DATABASE_URL)
+# 백엔드의 모든 쿼리가 공유하는 단일 커넥션 풀 설정
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', 5))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv('DB_POOL_RECYCLE_SECONDS', 3600))
+
+DATABASE_URL = f"mysql+aiomysql://{mysql_user}:{mysql_password}@{mysql_host}:{mysql_port}/NCS_DB"
+database = databases.Database(
+    DATABASE_URL,
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    # 풀에 빈 자리가 있어도 새 커넥션을 여는 시간이 무한정 걸리지 않도록
+    connect_timeout=DB_POOL_ACQUIRE_TIMEOUT,
+)
+# 풀의 빈 자리 대기: databases Connection.__aenter__ 는 acquire 도중 취소되면 내부 카운터가 어긋나므로
+# 풀 크기만큼의 semaphore에서 timeout을 걸고, 자리를 얻은 뒤의 acquire는 기다리지 않게 함
+_pool_slots = asyncio.Semaphore(DB_POOL_MAX_SIZE)
+
+
+class PoolMetrics:
+    """커넥션 대기 시간 / 점유 시간 / 사용률 집계 (최근 window개 표본 기준 분위수)"""
+
+    def __init__(self, window=1000):
+        self.acquired = 0
+        self.acquire_timeouts = 0
+        self.in_use = 0
+        self.wait_ms = deque(maxlen=window)
+        self.checkout_ms = deque(maxlen=window)
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return {"p50": None, "p95": None, "max": None}
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+        return {"p50": pick(0.5), "p95": pick(0.95), "max": round(ordered[-1], 3)}
+
+    def snapshot(self):
+        # databases는 aiomysql 풀을 노출하지 않으므로 내부 객체에서 크기를 읽음 (구조가 바뀌면 None)
+        pool = getattr(getattr(database, "_backend", None), "_pool", None)
+        size = getattr(pool, "size", None)
+        free = getattr(pool, "freesize", None)
+        return {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "acquire_timeout_s": DB_POOL_ACQUIRE_TIMEOUT,
+            "pool_size": size,
+            "pool_free": free,
+            "in_use": self.in_use,
+            "utilization": round(self.in_use / DB_POOL_MAX_SIZE, 3),
+            "acquired_total": self.acquired,
+            "acquire_timeouts_total": self.acquire_timeouts,
+            "wait_ms": self._percentiles(self.wait_ms),
+            "checkout_ms": self._percentiles(self.checkout_ms),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+@asynccontextmanager
+async def checkout():
+    """풀에서 커넥션을 acquire timeout 안에 얻어 사용하고 반납 (대기/점유 시간 기록)"""
+    requested = time.perf_counter()
+    try:
+        async with asyncio.timeout(DB_POOL_ACQUIRE_TIMEOUT):
+            await _pool_slots.acquire()
+    except TimeoutError:
+        pool_metrics.acquire_timeouts += 1
+        raise
+    try:
+        async with database.connection() as connection:
+            acquired = time.perf_counter()
+            pool_metrics.acquired += 1
+            pool_metrics.in_use += 1
+            pool_metrics.wait_ms.append((acquired - requested) * 1000)
+            try:
+                yield connection
+            finally:
+                pool_metrics.in_use -= 1
+                pool_metrics.checkout_ms.append((time.perf_counter() - acquired) * 1000)
+    finally:
+        _pool_slots.release()
+
+
+async def fetch_all(query, values=None):
+    async with checkout() as connection:
+        return await connection.fetch_all(query, values)
+
+
+async def fetch_one(query, values=None):
+    async with checkout() as connection:
+        return await connection.fetch_one(query, values)
+
+
+async def fetch_val(query, values=None):
+    async with checkout() as connection:
+        return await connection.fetch_val(query, values)
+
+
+async def execute(query, values=None):
+    async with checkout() as connection:
+        return await connection.execute(query, values)
+
 metadata = sqlalchemy.MetaData()
 
 # NCS 코드 테이블 정의
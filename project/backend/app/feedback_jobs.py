@@ -0,0 +1,145 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from app.ChatGPTService import generate_interview_feedback
+
+logger = logging.getLogger(__name__)
+
+# 피드백 작업 결과 저장소 (SQLite, 결과는 TTL 동안 보관)
+FEEDBACK_JOB_DB_PATH = os.getenv('FEEDBACK_JOB_DB_PATH', 'data/feedback_jobs.sqlite3')
+FEEDBACK_JOB_TTL_SECONDS = int(os.getenv('FEEDBACK_JOB_TTL_SECONDS', 24 * 3600))
+
+FINISHED_STATUSES = ("done", "error")
+
+
+class FeedbackJobStore:
+    def __init__(self, path, ttl_seconds):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback_jobs (
+            job_id TEXT PRIMARY KEY,
+            session_id TEXT,
+            status TEXT NOT NULL,
+            feedback TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """)
+        self._conn.commit()
+
+    def _execute(self, query, params=()):
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            self._conn.commit()
+            return cursor
+
+    def create(self, session_id=None):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO feedback_jobs (job_id, session_id, status, created_at, updated_at, expires_at) "
+            "VALUES (?, ?, 'pending', ?, ?, ?)",
+            (job_id, session_id, now, now, now + self.ttl_seconds),
+        )
+        return job_id
+
+    def update(self, job_id, status, feedback=None, error=None):
+        now = time.time()
+        self._execute(
+            "UPDATE feedback_jobs SET status = ?, feedback = ?, error = ?, updated_at = ?, expires_at = ? "
+            "WHERE job_id = ?",
+            (status, feedback, error, now, now + self.ttl_seconds, job_id),
+        )
+
+    def get(self, job_id):
+        cursor = self._execute(
+            "SELECT job_id, session_id, status, feedback, error, created_at, updated_at "
+            "FROM feedback_jobs WHERE job_id = ? AND expires_at > ?",
+            (job_id, time.time()),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        names = [description[0] for description in cursor.description]
+        return dict(zip(names, row))
+
+    def purge_expired(self):
+        self._execute("DELETE FROM feedback_jobs WHERE expires_at <= ?", (time.time(),))
+
+    def fail_unfinished(self, reason):
+        """서버 재시작 등으로 중단된 작업을 error로 정리"""
+        self._execute(
+            "UPDATE feedback_jobs SET status = 'error', error = ?, updated_at = ? "
+            "WHERE status IN ('pending', 'running')",
+            (reason, time.time()),
+        )
+
+
+store = FeedbackJobStore(FEEDBACK_JOB_DB_PATH, FEEDBACK_JOB_TTL_SECONDS)
+
+# job_id -> 상태 변경을 받을 구독자 큐 (WebSocket push용)
+_subscribers = defaultdict(set)
+# 실행 중인 작업이 GC되지 않도록 참조 유지
+_running_tasks = set()
+
+
+async def _publish(job_id):
+    job = await asyncio.to_thread(store.get, job_id)
+    for queue in list(_subscribers.get(job_id, ())):
+        queue.put_nowait(job)
+
+
+async def _run_feedback_job(job_id, conversation_text, session_id):
+    try:
+        await asyncio.to_thread(store.update, job_id, "running")
+        await _publish(job_id)
+        feedback = await generate_interview_feedback(conversation_text, session_id)
+        await asyncio.to_thread(store.update, job_id, "done", feedback)
+    except Exception as e:
+        logger.error("❌ 피드백 작업 오류", extra={"job_id": job_id, "error": str(e)})
+        await asyncio.to_thread(store.update, job_id, "error", None, str(e))
+    await _publish(job_id)
+
+
+async def submit_feedback_job(conversation_text, session_id=None):
+    """피드백 생성을 백그라운드 작업으로 등록하고 job_id를 바로 반환"""
+    await asyncio.to_thread(store.purge_expired)
+    job_id = await asyncio.to_thread(store.create, session_id)
+    task = asyncio.create_task(_run_feedback_job(job_id, conversation_text, session_id))
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+    return job_id
+
+
+async def get_feedback_job(job_id):
+    return await asyncio.to_thread(store.get, job_id)
+
+
+async def watch_feedback_job(job_id):
+    """작업 상태가 바뀔 때마다 yield, 완료(done/error)되면 종료"""
+    queue = asyncio.Queue()
+    _subscribers[job_id].add(queue)
+    try:
+        job = await get_feedback_job(job_id)
+        while job is not None:
+            yield job
+            if job["status"] in FINISHED_STATUSES:
+                break
+            job = await queue.get()
+    finally:
+        _subscribers[job_id].discard(queue)
+        if not _subscribers[job_id]:
+            _subscribers.pop(job_id, None)
@@ -1,12 +1,25 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import time
+import uuid
+import secrets
+import asyncio
+import logging
+import sqlalchemy
 from typing import List, Optional
-from app.databases import database, ncs_code   # 데이터베이스 및 테이블 임포트
+from app.databases import database, ncs_code, fetch_all, pool_metrics   # 데이터베이스 및 테이블 임포트
 from app.schema import NCSCode, UserAnswer, InterviewRequest   # Pydantic 모델 임포트
 from app.elasticsearch import es_client
-from app.ChatGPTService import get_interview_response
-from app.ChatGPTService import get_interview_response, get_interview_feedback
+from app.logging_config import setup_logging, shutdown_logging
+from app.ChatGPTService import get_interview_response, stream_interview_response
+from app.usage_ledger import ledger
+from app.model_router import router
+from app.ncs_catalog import ncs_catalog, refresh_summary_table, RefreshInProgress
+from app.feedback_jobs import store as feedback_job_store, submit_feedback_job, get_feedback_job, watch_feedback_job
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -19,23 +32,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 관리용 엔드포인트 토큰 (설정하지 않으면 관리용 엔드포인트 비활성화)
+ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN')
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="관리용 엔드포인트가 비활성화되어 있습니다.")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token.encode(), ADMIN_API_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다.")
+
 # 앱 시작/종료 이벤트에서 데이터베이스 연결/해제
 @app.on_event("startup")
 async def startup():
     await database.connect()
+    # 재시작 전에 끝나지 않은 피드백 작업 정리
+    feedback_job_store.fail_unfinished("서버 재시작으로 작업이 중단되었습니다.")
+    # NCS 직무 역량 맵 적재 + version 변경 감시
+    try:
+        await ncs_catalog.load()
+    except Exception as e:
+        logger.warning("NCS 카탈로그 적재 실패 (원본 테이블 조회로 대체)", extra={"error": str(e)})
+    app.state.ncs_catalog_watcher = asyncio.create_task(ncs_catalog.watch())
 
 @app.on_event("shutdown")
 async def shutdown():
+    app.state.ncs_catalog_watcher.cancel()
     await database.disconnect()
+    shutdown_logging()
 
 # NCS 코드 검색 엔드포인트
+ncs_fulltext_available = os.getenv('NCS_FULLTEXT_SEARCH', '1') == '1'
+# MySQL 1191: FULLTEXT 인덱스 없음, 1214: FULLTEXT를 지원하지 않는 테이블 (그 외 오류는 일시적인 것으로 보고 다음 요청에서 다시 시도)
+FULLTEXT_UNAVAILABLE_ERRORS = {1191, 1214}
+
+def is_fulltext_unavailable(error):
+    for exc in (error, error.__cause__):
+        args = getattr(exc, "args", None)
+        if args and args[0] in FULLTEXT_UNAVAILABLE_ERRORS:
+            return True
+    return False
+
 @app.get("/api/ncs-codes", response_model=List[NCSCode])
 async def get_ncs_codes(search: Optional[str] = Query(None, description="ncsSubdCdNm 검색어")):
+    global ncs_fulltext_available
     query = ncs_code.select()
     if search:
+        # 2글자 이상은 ngram FULLTEXT 인덱스 사용 (migrations/NCS_DB/0002), 인덱스가 없으면 ilike로 대체
+        if ncs_fulltext_available and len(search.strip()) >= 2:
+            phrase = '"' + search.strip().replace('"', ' ') + '"'
+            fulltext_query = query.where(
+                sqlalchemy.text("MATCH(ncsSubdCdNm) AGAINST(:phrase IN BOOLEAN MODE)").bindparams(phrase=phrase)
+            )
+            try:
+                return await fetch_all(fulltext_query)
+            except Exception as e:
+                if is_fulltext_unavailable(e):
+                    ncs_fulltext_available = False
+                logger.warning("FULLTEXT 검색 실패, ilike 검색으로 대체", extra={"error": str(e)})
         # 대소문자 구분 없이 검색 (ilike)
         query = query.where(ncs_code.c.ncsSubdCdNm.ilike(f"%{search}%"))
-    results = await database.fetch_all(query)
+    results = await fetch_all(query)
     return results
 
 # Elasticsearch 검색 엔드포인트 예제
@@ -61,23 +117,173 @@ async def search_business_overview(company_name: str = Query(..., description="
 # 인터뷰 엔드포인트
 @app.post("/interview")
 async def interview_endpoint(request: InterviewRequest):
-    print("Received request:", request.dict())
+    logger.info("Received request", extra=request.dict())
     try:
         # 기존 코드
-        interview_response = await get_interview_response(request.answer, request.companyname, request.subcategory)
+        interview_response = await get_interview_response(
+            request.answer, request.companyname, request.subcategory, request.session_id
+        )
         return {"response": interview_response}
     except Exception as e:
-        print(f"❌ 서버 오류: {e}")
+        logger.error("❌ 서버 오류", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
     
 
-@app.post("/interview-feedback")
+# 피드백 생성은 백그라운드 작업으로 실행하고 job_id를 바로 반환
+@app.post("/interview-feedback", status_code=202)
 async def interview_feedback_endpoint(request: dict):
     try:
         conversation_text = request.get("conversation", "")
-        feedback = await get_interview_feedback(conversation_text)
-        return {"feedback": feedback}
+        job_id = await submit_feedback_job(conversation_text, request.get("session_id"))
+        return {"job_id": job_id, "status": "pending"}
+    except Exception as e:
+        logger.error("❌ 피드백 오류", extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# 피드백 작업 상태/결과 조회 (polling)
+@app.get("/interview-feedback/{job_id}")
+async def interview_feedback_status(job_id: str):
+    job = await get_feedback_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="피드백 작업을 찾을 수 없거나 만료되었습니다.")
+    return job
+
+
+# 피드백 작업 상태 push (완료되면 연결 종료)
+@app.websocket("/interview-feedback/{job_id}/ws")
+async def interview_feedback_push(websocket: WebSocket, job_id: str):
+    await websocket.accept()
+    try:
+        found = False
+        async for job in watch_feedback_job(job_id):
+            found = True
+            await websocket.send_json(job)
+        if not found:
+            await websocket.send_json({"job_id": job_id, "status": "not_found"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+async def push_feedback_job(websocket: WebSocket, job_id: str):
+    """피드백 작업 진행 상황을 채널로 push (수신 루프를 막지 않도록 별도 task에서 실행)"""
+    try:
+        async for job in watch_feedback_job(job_id):
+            await websocket.send_json({"type": "feedback_status", "job_id": job_id, "status": job["status"]})
+            if job["status"] == "done":
+                await websocket.send_json({"type": "feedback", "job_id": job_id, "feedback": job["feedback"]})
+            elif job["status"] == "error":
+                await websocket.send_json({"type": "error", "job_id": job_id, "detail": job["error"]})
+    except Exception as e:
+        # 연결이 먼저 끊긴 경우: 작업은 계속 실행되고 결과는 GET /interview-feedback/{job_id}로 조회
+        logger.info("피드백 push 중단", extra={"job_id": job_id, "error": str(e)})
+
+
+# 면접 1회 전체를 하나의 WebSocket 연결로 처리
+# client -> {"type": "start", "companyname", "subcategory", "session_id"?}
+#           {"type": "answer", "answer"}
+#           {"type": "feedback", "conversation"}
+# server -> {"type": "ready"}, {"type": "token"}, {"type": "question"},
+#           {"type": "feedback_submitted", "job_id"}, {"type": "feedback_status"}, {"type": "feedback"}, {"type": "error"}
+@app.websocket("/ws/interview")
+async def interview_channel(websocket: WebSocket):
+    await websocket.accept()
+    session = {}
+    feedback_pushes = set()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            message_type = message.get("type")
+
+            if message_type == "start":
+                session = {
+                    "companyname": str(message.get("companyname", "")),
+                    "subcategory": str(message.get("subcategory", "")),
+                    "session_id": message.get("session_id") or uuid.uuid4().hex,
+                }
+                await websocket.send_json({"type": "ready", "session_id": session["session_id"]})
+
+            elif message_type == "answer":
+                if not session:
+                    await websocket.send_json({"type": "error", "detail": "start 메시지를 먼저 보내야 합니다."})
+                    continue
+                tokens = []
+                try:
+                    async for token in stream_interview_response(
+                        str(message.get("answer", "")),
+                        session["companyname"],
+                        session["subcategory"],
+                        session["session_id"],
+                    ):
+                        tokens.append(token)
+                        await websocket.send_json({"type": "token", "content": token})
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    logger.error("❌ 질문 스트리밍 오류", extra={"error": str(e), "session_id": session["session_id"]})
+                    await websocket.send_json({"type": "error", "detail": "응답을 생성하는 중 오류가 발생했습니다."})
+                    continue
+                await websocket.send_json({"type": "question", "content": "".join(tokens).strip()})
+
+            elif message_type == "feedback":
+                job_id = await submit_feedback_job(message.get("conversation", ""), session.get("session_id"))
+                # 클라이언트는 job_id를 받은 뒤에는 새로 요청하지 않고 같은 작업을 조회
+                await websocket.send_json({"type": "feedback_submitted", "job_id": job_id})
+                push = asyncio.create_task(push_feedback_job(websocket, job_id))
+                feedback_pushes.add(push)
+                push.add_done_callback(feedback_pushes.discard)
+
+            else:
+                await websocket.send_json({"type": "error", "detail": f"알 수 없는 메시지 유형: {message_type}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for push in list(feedback_pushes):
+            push.cancel()
+
+
+# LLM 사용량/비용 집계 엔드포인트 (세션/기업별 비용이 노출되므로 관리자 토큰 필요)
+@app.get("/usage", dependencies=[Depends(require_admin)])
+async def usage_summary(
+    group_by: List[str] = Query(["route", "model"], description="route, model_route, model, companyname, session_id, status"),
+    bucket: str = Query("hour", description="minute, hour, day"),
+    since_hours: Optional[float] = Query(None, description="최근 N시간만 집계"),
+):
+    since = time.time() - since_hours * 3600 if since_hours else None
+    try:
+        return ledger.summarize(group_by=group_by, bucket=bucket, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# NCS 직무 역량 맵 상태 / 갱신
+@app.get("/ncs-catalog")
+async def ncs_catalog_status():
+    return ncs_catalog.status()
+
+
+# 요약 테이블 DDL을 실행하므로 관리자 토큰(X-Admin-Token) 필요
+@app.post("/ncs-catalog/refresh", dependencies=[Depends(require_admin)])
+async def ncs_catalog_refresh():
+    try:
+        await refresh_summary_table()
+        await ncs_catalog.load()
+        return ncs_catalog.status()
+    except RefreshInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
-        print(f"❌ 피드백 오류: {e}")
+        logger.error("❌ NCS 카탈로그 갱신 오류", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# DB 커넥션 풀 상태 (대기 시간, 사용률, checkout 지연)
+@app.get("/metrics/db-pool")
+async def db_pool_metrics():
+    return pool_metrics.snapshot()
+
+
+# 작업별 모델 라우팅 상태 (p95 지연시간, 현재 선택된 경로)
+@app.get("/model-routes")
+async def model_routes():
+    return router.status()
@@ -0,0 +1,86 @@
+import os
+import time
+import threading
+from collections import defaultdict, deque
+
+# 작업(task)별 모델/생성 한도 및 지연시간 SLO
+# fallback_model: primary 모델의 최근 p95 지연시간이 slo_ms를 넘으면 사용하는 빠른 모델
+ROUTES = {
+    "interview": {
+        "model": os.getenv('INTERVIEW_MODEL', 'gpt-4o-mini'),
+        "fallback_model": os.getenv('INTERVIEW_FALLBACK_MODEL', 'gpt-3.5-turbo'),
+        "max_tokens": int(os.getenv('INTERVIEW_MAX_TOKENS', 200)),
+        "temperature": float(os.getenv('INTERVIEW_TEMPERATURE', 0.7)),
+        "slo_ms": float(os.getenv('INTERVIEW_SLO_MS', 4000)),
+    },
+    "feedback": {
+        "model": os.getenv('FEEDBACK_MODEL', 'gpt-4o-mini'),
+        "fallback_model": os.getenv('FEEDBACK_FALLBACK_MODEL', 'gpt-3.5-turbo'),
+        "max_tokens": int(os.getenv('FEEDBACK_MAX_TOKENS', 1200)),
+        "temperature": float(os.getenv('FEEDBACK_TEMPERATURE', 0.3)),
+        "slo_ms": float(os.getenv('FEEDBACK_SLO_MS', 20000)),
+    },
+}
+
+# p95 계산에 사용하는 최근 구간 / 최소 표본 수
+LATENCY_WINDOW_SECONDS = float(os.getenv('LATENCY_WINDOW_SECONDS', 300))
+LATENCY_MIN_SAMPLES = int(os.getenv('LATENCY_MIN_SAMPLES', 10))
+
+
+class ModelRouter:
+    """작업별 모델 선택 + 모델별 최근 지연시간 추적
+
+    primary가 SLO를 넘으면 fallback으로 전환하고, 오래된 표본이 구간 밖으로 밀려나면
+    (표본 부족 -> SLO 판단 보류) 자연스럽게 primary로 복귀함
+    """
+
+    def __init__(self, routes, window_seconds=LATENCY_WINDOW_SECONDS, min_samples=LATENCY_MIN_SAMPLES):
+        self.routes = routes
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self._latencies = defaultdict(lambda: deque(maxlen=1000))
+        self._lock = threading.Lock()
+
+    def observe(self, model, latency_ms):
+        with self._lock:
+            self._latencies[model].append((time.monotonic(), latency_ms))
+
+    def p95(self, model):
+        """최근 구간의 p95 지연시간 (표본이 부족하면 None)"""
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            samples = self._latencies[model]
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+            latencies = sorted(latency for _, latency in samples)
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def select(self, task):
+        """task에 맞는 모델과 생성 파라미터를 반환 (route: 실제로 선택된 경로 이름)"""
+        config = self.routes[task]
+        primary_p95 = self.p95(config["model"])
+        degraded = primary_p95 is not None and primary_p95 > config["slo_ms"]
+        use_fallback = degraded and config.get("fallback_model")
+        return {
+            "route": f"{task}:{'fallback' if use_fallback else 'primary'}",
+            "model": config["fallback_model"] if use_fallback else config["model"],
+            "max_tokens": config["max_tokens"],
+            "temperature": config["temperature"],
+        }
+
+    def status(self):
+        return {
+            task: {
+                "model": config["model"],
+                "fallback_model": config.get("fallback_model"),
+                "slo_ms": config["slo_ms"],
+                "p95_ms": self.p95(config["model"]),
+                "active_route": self.select(task)["route"],
+            }
+            for task, config in self.routes.items()
+        }
+
+
+router = ModelRouter(ROUTES)
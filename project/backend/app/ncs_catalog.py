@@ -0,0 +1,156 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from app.databases import database, checkout, fetch_all, fetch_val
+from app import ncs_ranker
+
+logger = logging.getLogger(__name__)
+
+# version 테이블 확인 주기 (초)
+NCS_CATALOG_CHECK_SECONDS = int(os.getenv('NCS_CATALOG_CHECK_SECONDS', 300))
+# 갱신은 ncs_competency_map_new 를 공유하므로 worker/프로세스 간 MySQL named lock으로 한 번에 하나만 실행
+NCS_REFRESH_LOCK = "ncs_competency_map_refresh"
+NCS_REFRESH_LOCK_TIMEOUT = int(os.getenv('NCS_REFRESH_LOCK_TIMEOUT', 0))
+
+# ncs_code ⨝ ncs_skills 결과를 세부분류명 기준으로 미리 펼쳐 둔 요약 테이블
+REFRESH_STATEMENTS = [
+    "DROP TABLE IF EXISTS ncs_competency_map_new",
+    """
+    CREATE TABLE ncs_competency_map_new (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        ncsSubdCdNm VARCHAR(255) NOT NULL,
+        gbnName VARCHAR(255),
+        gbnVal TEXT,
+        INDEX idx_ncs_competency_map_subd (ncsSubdCdNm)
+    ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+    """,
+    """
+    INSERT INTO ncs_competency_map_new (ncsSubdCdNm, gbnName, gbnVal)
+    SELECT DISTINCT c.ncsSubdCdNm, s.gbnName, s.gbnVal
+    FROM ncs_code c
+    JOIN ncs_skills s ON c.dutyCd = s.dutyCd
+    WHERE c.ncsSubdCdNm IS NOT NULL
+    """,
+    "CREATE TABLE IF NOT EXISTS ncs_competency_map LIKE ncs_competency_map_new",
+    # 조회 중인 요청이 빈 테이블을 보지 않도록 RENAME으로 원자적 교체
+    """
+    RENAME TABLE ncs_competency_map TO ncs_competency_map_old,
+                 ncs_competency_map_new TO ncs_competency_map
+    """,
+    "DROP TABLE ncs_competency_map_old",
+    """
+    CREATE TABLE IF NOT EXISTS ncs_catalog_version (
+        id TINYINT PRIMARY KEY,
+        version VARCHAR(32) NOT NULL,
+        row_count INT,
+        refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+
+class RefreshInProgress(Exception):
+    """다른 worker/프로세스가 요약 테이블을 갱신 중"""
+
+
+async def refresh_summary_table():
+    """NCS 카탈로그 적재 후 실행: 요약 테이블 재생성 + version 갱신"""
+    # GET_LOCK은 커넥션 단위이므로 lock을 잡은 커넥션 하나로 갱신 전체를 실행
+    async with checkout() as connection:
+        locked = await connection.fetch_val(
+            "SELECT GET_LOCK(:name, :timeout)", {"name": NCS_REFRESH_LOCK, "timeout": NCS_REFRESH_LOCK_TIMEOUT}
+        )
+        if locked != 1:
+            raise RefreshInProgress("ncs_competency_map 갱신이 이미 진행 중입니다.")
+        try:
+            for statement in REFRESH_STATEMENTS:
+                await connection.execute(statement)
+            row_count = await connection.fetch_val("SELECT COUNT(*) FROM ncs_competency_map")
+            version = datetime.now().strftime("%Y%m%d%H%M%S")
+            await connection.execute(
+                "REPLACE INTO ncs_catalog_version (id, version, row_count, refreshed_at) "
+                "VALUES (1, :version, :row_count, NOW())",
+                {"version": version, "row_count": row_count},
+            )
+        finally:
+            await connection.fetch_val("SELECT RELEASE_LOCK(:name)", {"name": NCS_REFRESH_LOCK})
+    logger.info("ncs_competency_map refreshed", extra={"version": version, "rows": row_count})
+    return version
+
+
+class NCSCatalog:
+    """세부분류명 -> [(gbnName, gbnVal), ...] 메모리 맵 (version이 바뀌면 다시 적재)"""
+
+    def __init__(self):
+        self.version = None
+        self.competencies = {}
+
+    @property
+    def loaded(self):
+        return self.version is not None
+
+    def get(self, subcategory):
+        return self.competencies.get(subcategory, [])
+
+    async def fetch_version(self):
+        try:
+            return await fetch_val("SELECT version FROM ncs_catalog_version WHERE id = 1")
+        except Exception as e:
+            logger.warning("ncs_catalog_version 조회 실패", extra={"error": str(e)})
+            return None
+
+    async def load(self):
+        version = await self.fetch_version()
+        if version is None:
+            return False
+        rows = await fetch_all(
+            "SELECT ncsSubdCdNm, gbnName, gbnVal FROM ncs_competency_map ORDER BY id"
+        )
+        competencies = {}
+        for row in rows:
+            competencies.setdefault(row["ncsSubdCdNm"], []).append((row["gbnName"], row["gbnVal"]))
+        self.competencies = competencies
+        self.version = version
+        # 역량 목록이 바뀌었으므로 세부분류별 BM25 인덱스도 다시 생성
+        ncs_ranker.clear_cache()
+        logger.info("ncs catalog loaded", extra={"version": version, "subcategories": len(competencies)})
+        return True
+
+    async def refresh_if_stale(self):
+        version = await self.fetch_version()
+        if version is not None and version != self.version:
+            await self.load()
+
+    async def watch(self, interval=NCS_CATALOG_CHECK_SECONDS):
+        """주기적으로 version을 확인해 바뀌었을 때만 다시 적재"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_if_stale()
+            except Exception as e:
+                logger.error("ncs catalog refresh 실패", extra={"error": str(e)})
+
+    def status(self):
+        return {
+            "version": self.version,
+            "subcategories": len(self.competencies),
+            "rows": sum(len(rows) for rows in self.competencies.values()),
+        }
+
+
+ncs_catalog = NCSCatalog()
+
+
+async def _main():
+    await database.connect()
+    try:
+        version = await refresh_summary_table()
+        print(f"✅ ncs_competency_map 갱신 완료 (version: {version})")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    # python -m app.ncs_catalog
+    asyncio.run(_main())
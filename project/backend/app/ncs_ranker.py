@@ -0,0 +1,96 @@
+import os
+from collections import OrderedDict
+import numpy as np
+from app.retrieval import char_ngrams
+
+NCS_TOP_K = int(os.getenv('NCS_TOP_K', 8))
+NCS_INDEX_CACHE_SIZE = int(os.getenv('NCS_INDEX_CACHE_SIZE', 256))
+
+
+class BM25Index:
+    """문자 bigram 기반 BM25 (한국어 형태소 분석기 없이 사용)"""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.size = len(documents)
+        self.vocabulary = {}
+        rows, term_ids, frequencies = [], [], []
+        lengths = np.zeros(self.size, dtype=np.float32)
+
+        for row, document in enumerate(documents):
+            counts = {}
+            for gram in char_ngrams(document, (2, 2)):
+                term_id = self.vocabulary.setdefault(gram, len(self.vocabulary))
+                counts[term_id] = counts.get(term_id, 0) + 1
+            lengths[row] = sum(counts.values())
+            rows.extend([row] * len(counts))
+            term_ids.extend(counts.keys())
+            frequencies.extend(counts.values())
+
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.term_ids = np.asarray(term_ids, dtype=np.int64)
+        tf = np.asarray(frequencies, dtype=np.float32)
+
+        df = np.bincount(self.term_ids, minlength=len(self.vocabulary)).astype(np.float32)
+        idf = np.log(1 + (self.size - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() if self.size else 0.0
+        norm = 1 - b + b * lengths[self.rows] / (avg_length or 1.0)
+        # (문서, 용어) 쌍별 BM25 가중치를 미리 계산해 두고 질의 시에는 합산만 수행
+        self.weights = idf[self.term_ids] * tf * (k1 + 1) / (tf + k1 * norm)
+
+    def scores(self, query):
+        query_ids = [self.vocabulary[g] for g in set(char_ngrams(query, (2, 2))) if g in self.vocabulary]
+        if not query_ids:
+            return np.zeros(self.size, dtype=np.float32)
+        mask = np.isin(self.term_ids, query_ids)
+        return np.bincount(self.rows[mask], weights=self.weights[mask], minlength=self.size)
+
+    def top_k(self, query, k):
+        """점수 상위 k개 문서 번호 (점수 0인 문서 제외, 원래 순서 유지)"""
+        if self.size == 0:
+            return []
+        scores = self.scores(query)
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return np.sort(top[scores[top] > 0]).tolist()
+
+
+# 세부분류명 -> (역량 행 목록, BM25Index)
+_index_cache = OrderedDict()
+
+
+def clear_cache():
+    _index_cache.clear()
+
+
+def get_competency_index(subcategory, rows):
+    """세부분류별 BM25 인덱스를 한 번만 만들어 재사용"""
+    cached = _index_cache.get(subcategory)
+    if cached is not None:
+        _index_cache.move_to_end(subcategory)
+        return cached
+
+    unique_rows = list(dict.fromkeys((str(name), str(value)) for name, value in rows))
+    index = BM25Index([f"{name} {value}" for name, value in unique_rows])
+    cached = (unique_rows, index)
+    # 조회 실패 등으로 비어 있는 결과는 캐시하지 않음
+    if unique_rows:
+        _index_cache[subcategory] = cached
+        if len(_index_cache) > NCS_INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return cached
+
+
+def rank_competencies(subcategory, rows, answer, k=NCS_TOP_K):
+    """지원자 답변과 가장 관련 있는 직무 역량 k개를 (gbnName, gbnVal) 목록으로 반환
+
+    답변과 겹치는 역량이 없으면 앞쪽 k개를 그대로 사용
+    """
+    unique_rows, index = get_competency_index(subcategory, rows)
+    selected = index.top_k(answer, k)
+    if not selected:
+        return unique_rows[:k]
+    return [unique_rows[i] for i in selected]
+
+
+def format_competencies(competencies):
+    return "\n".join(f"- {name}: {value}" for name, value in competencies)
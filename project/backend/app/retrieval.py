@@ -0,0 +1,113 @@
+import os
+import re
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+# ETL_dart/passage_index.py와 동일한 해싱 규칙을 사용해야 함
+HASH_DIM = 2 ** 16
+NGRAM_RANGE = (2, 3)
+WHITESPACE = re.compile(r"\s+")
+
+PASSAGE_TOP_K = int(os.getenv('PASSAGE_TOP_K', 5))
+PASSAGE_CACHE_SIZE = int(os.getenv('PASSAGE_CACHE_SIZE', 64))
+
+
+def char_ngrams(text, ngram_range=NGRAM_RANGE):
+    text = WHITESPACE.sub(" ", text.lower()).strip()
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        for i in range(len(text) - n + 1):
+            gram = text[i:i + n]
+            if not gram.isspace():
+                yield gram
+
+
+def hash_ngrams(text, dim=HASH_DIM, ngram_range=NGRAM_RANGE):
+    counts = {}
+    for gram in char_ngrams(text, ngram_range):
+        index = zlib.crc32(gram.encode("utf-8")) % dim
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+class PassageMatrix:
+    """ETL이 저장한 희소 TF-IDF 벡터를 평탄화해 NumPy로 한 번에 점수 계산"""
+
+    def __init__(self, passage_index):
+        passages = passage_index["passages"]
+        self.dim = passage_index.get("dim", HASH_DIM)
+        self.ngram_range = tuple(passage_index.get("ngram_range", NGRAM_RANGE))
+        self.texts = [p["text"] for p in passages]
+        self.sources = [p["source"] for p in passages]
+        lengths = [len(p["indices"]) for p in passages]
+        self.indices = np.fromiter(
+            (i for p in passages for i in p["indices"]), dtype=np.int64, count=sum(lengths)
+        )
+        self.weights = np.fromiter(
+            (w for p in passages for w in p["weights"]), dtype=np.float32, count=sum(lengths)
+        )
+        self.rows = np.repeat(np.arange(len(passages)), lengths)
+
+    def query_vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts = hash_ngrams(text, self.dim, self.ngram_range)
+        if counts:
+            keys = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            vector[keys] = 1 + np.log(values)
+            vector /= np.linalg.norm(vector)
+        return vector
+
+    def top_k(self, text, k=PASSAGE_TOP_K):
+        """코사인 유사도 상위 k개 passage를 원문 순서대로 반환"""
+        if not self.texts:
+            return []
+        query = self.query_vector(text)
+        scores = np.bincount(self.rows, weights=query[self.indices] * self.weights, minlength=len(self.texts))
+        k = min(k, len(self.texts))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = np.sort(top[scores[top] > 0])
+        return [self.texts[i] for i in top]
+
+
+# (문서 id, updated_at) -> PassageMatrix
+_matrix_cache = OrderedDict()
+
+
+def get_passage_matrix(hit):
+    source = hit.get("_source", {})
+    passage_index = source.get("passage_index")
+    if not passage_index or not passage_index.get("passages"):
+        return None
+
+    key = (hit.get("_id"), source.get("updated_at"))
+    matrix = _matrix_cache.get(key)
+    if matrix is None:
+        matrix = PassageMatrix(passage_index)
+        _matrix_cache[key] = matrix
+        if len(_matrix_cache) > PASSAGE_CACHE_SIZE:
+            _matrix_cache.popitem(last=False)
+    else:
+        _matrix_cache.move_to_end(key)
+    return matrix
+
+
+def select_business_context(hits, answer, k=PASSAGE_TOP_K):
+    """지원자 답변과 관련된 사업 개요 passage만 골라 프롬프트용 텍스트로 반환
+
+    passage_index가 없는(예전 ETL로 적재된) 문서나 답변과 겹치는 passage가 없는 경우(짧거나 주제와
+    무관한 답변)에는 요약문 전체, 요약문도 없으면 앞쪽 k개 passage를 사용
+    """
+    contexts = []
+    for hit in hits:
+        matrix = get_passage_matrix(hit)
+        selected = matrix.top_k(answer, k) if matrix is not None else []
+        if selected:
+            contexts.extend(selected)
+            continue
+        summary = hit.get("_source", {}).get("business_overview_summary")
+        if summary:
+            contexts.append(summary)
+        elif matrix is not None:
+            contexts.extend(matrix.texts[:k])
+    return "\n".join(contexts)
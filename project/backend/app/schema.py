@@ -26,4 +26,5 @@ class UserAnswer(StringCastingBase):
 class InterviewRequest(BaseModel):
     answer: str
     companyname : str 
-    subcategory: str
\ No newline at end of file
+    subcategory: str
+    session_id: Optional[str] = None
\ No newline at end of file
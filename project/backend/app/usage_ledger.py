@@ -0,0 +1,151 @@
+import os
+import logging
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# LLM 호출 사용량 기록 (append-only SQLite)
+USAGE_LEDGER_PATH = os.getenv('USAGE_LEDGER_PATH', 'data/usage_ledger.sqlite3')
+
+# 모델별 1K 토큰당 단가 (USD, prompt / completion)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# 집계 시간 단위 -> strftime 포맷
+TIME_BUCKETS = {
+    "minute": "%Y-%m-%d %H:%M",
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+}
+
+# 집계 기준으로 허용하는 컬럼
+GROUP_COLUMNS = ("route", "model_route", "model", "companyname", "session_id", "status")
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_stream_usage(model, messages, completion):
+    """스트리밍 응답에는 usage가 없으므로 요청 메시지와 받은 응답을 tiktoken으로 세어 usage를 만듦
+    (메시지당 4토큰 + 응답 시작 3토큰은 OpenAI chat 포맷 기준 추정치)"""
+    encoding = _encoding(model)
+    prompt_tokens = 3 + sum(
+        4 + len(encoding.encode(message.get("content") or "")) for message in messages
+    )
+    completion_tokens = len(encoding.encode(completion))
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+class UsageLedger:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at REAL NOT NULL,
+            route TEXT NOT NULL,
+            model_route TEXT,
+            model TEXT NOT NULL,
+            companyname TEXT,
+            session_id TEXT,
+            prompt_tokens INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            total_tokens INTEGER DEFAULT 0,
+            latency_ms REAL,
+            cost_usd REAL DEFAULT 0,
+            status TEXT DEFAULT 'ok'
+        )
+        """)
+        # model_route 컬럼이 없던 기존 ledger 파일 보정
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(llm_usage)")}
+        if "model_route" not in columns:
+            self._conn.execute("ALTER TABLE llm_usage ADD COLUMN model_route TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_created_at ON llm_usage (created_at)")
+        self._conn.commit()
+
+    def record(self, route, model, usage=None, latency_ms=None, companyname=None, session_id=None,
+               status="ok", model_route=None):
+        """LLM 호출 1건을 기록 (기록 실패가 요청을 실패시키지 않도록 예외를 삼킴)"""
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens", 0) or 0)
+        completion_tokens = int(usage.get("completion_tokens", 0) or 0)
+        total_tokens = int(usage.get("total_tokens", 0) or prompt_tokens + completion_tokens)
+        row = (
+            time.time(), route, model_route, model, companyname, session_id,
+            prompt_tokens, completion_tokens, total_tokens, latency_ms,
+            estimate_cost(model, prompt_tokens, completion_tokens), status,
+        )
+        try:
+            with self._lock:
+                self._conn.execute("""
+                INSERT INTO llm_usage (
+                    created_at, route, model_route, model, companyname, session_id,
+                    prompt_tokens, completion_tokens, total_tokens, latency_ms,
+                    cost_usd, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, row)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error("❌ 사용량 기록 오류", extra={"error": str(e)})
+
+    def summarize(self, group_by=("route", "model"), bucket="hour", since=None):
+        """group_by 컬럼 + 시간 버킷 단위로 토큰/비용/지연시간 집계"""
+        if bucket not in TIME_BUCKETS:
+            raise ValueError(f"bucket은 {list(TIME_BUCKETS)} 중 하나여야 합니다.")
+        invalid = [column for column in group_by if column not in GROUP_COLUMNS]
+        if invalid:
+            raise ValueError(f"지원하지 않는 group_by 컬럼: {invalid}")
+
+        columns = list(group_by)
+        bucket_expr = f"strftime('{TIME_BUCKETS[bucket]}', created_at, 'unixepoch', 'localtime')"
+        select_columns = ", ".join(columns + [f"{bucket_expr} AS bucket"])
+        group_columns = ", ".join(columns + ["bucket"])
+        query = f"""
+        SELECT {select_columns},
+            COUNT(*) AS calls,
+            SUM(prompt_tokens) AS prompt_tokens,
+            SUM(completion_tokens) AS completion_tokens,
+            SUM(total_tokens) AS total_tokens,
+            SUM(cost_usd) AS cost_usd,
+            AVG(latency_ms) AS avg_latency_ms,
+            MAX(latency_ms) AS max_latency_ms,
+            SUM(CASE WHEN status != 'ok' THEN 1 ELSE 0 END) AS errors
+        FROM llm_usage
+        WHERE created_at >= ?
+        GROUP BY {group_columns}
+        ORDER BY bucket DESC, cost_usd DESC
+        """
+        with self._lock:
+            cursor = self._conn.execute(query, (since or 0,))
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+ledger = UsageLedger(USAGE_LEDGER_PATH)
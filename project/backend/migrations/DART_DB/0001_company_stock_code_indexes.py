@@ -0,0 +1,17 @@
+from migrations.helpers import table_exists, create_index, drop_index
+
+description = "company_list / company_info stock_code B-tree 인덱스 (종목코드 -> corp_code 조회)"
+
+TABLES = ["company_list", "company_info"]
+
+
+def upgrade(cursor):
+    for table in TABLES:
+        if table_exists(cursor, table):
+            create_index(cursor, table, f"idx_{table}_stock_code", ["stock_code"])
+
+
+def downgrade(cursor):
+    for table in TABLES:
+        if table_exists(cursor, table):
+            drop_index(cursor, table, f"idx_{table}_stock_code")
@@ -0,0 +1,17 @@
+from migrations.helpers import create_index, drop_index
+
+description = "ncs_code.ncsSubdCdNm / ncs_code.dutyCd / ncs_skills.dutyCd B-tree 인덱스"
+
+
+def upgrade(cursor):
+    # 세부분류명 equality 조회 (create_query, ncs_competency_map 갱신)
+    create_index(cursor, "ncs_code", "idx_ncs_code_subd_nm", ["ncsSubdCdNm"])
+    # ncs_code ⨝ ncs_skills 조인 키
+    create_index(cursor, "ncs_code", "idx_ncs_code_duty_cd", ["dutyCd"])
+    create_index(cursor, "ncs_skills", "idx_ncs_skills_duty_cd", ["dutyCd"])
+
+
+def downgrade(cursor):
+    drop_index(cursor, "ncs_skills", "idx_ncs_skills_duty_cd")
+    drop_index(cursor, "ncs_code", "idx_ncs_code_duty_cd")
+    drop_index(cursor, "ncs_code", "idx_ncs_code_subd_nm")
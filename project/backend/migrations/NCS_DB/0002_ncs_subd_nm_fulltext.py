@@ -0,0 +1,11 @@
+from migrations.helpers import create_ngram_fulltext_index, drop_index
+
+description = "ncs_code.ncsSubdCdNm ngram FULLTEXT 인덱스 (/api/ncs-codes 부분 검색)"
+
+
+def upgrade(cursor):
+    create_ngram_fulltext_index(cursor, "ncs_code", "ft_ncs_code_subd_nm", ["ncsSubdCdNm"])
+
+
+def downgrade(cursor):
+    drop_index(cursor, "ncs_code", "ft_ncs_code_subd_nm")
@@ -0,0 +1,124 @@
+"""NCS 조회 쿼리의 EXPLAIN / 실행 시간 측정 (인덱스 마이그레이션 전후 비교용)
+
+사용법 (project/backend 에서 실행):
+    python -m migrations.explain_ncs_queries --label before
+    python -m migrations.migrate --db NCS_DB
+    python -m migrations.explain_ncs_queries --label after
+    python -m migrations.explain_ncs_queries --compare migrations/reports/before.json migrations/reports/after.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime
+from migrations.migrate import connect
+from migrations.helpers import index_exists
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+
+
+def build_queries(subcategory, search):
+    queries = {
+        # /api/ncs-codes 검색 (ILIKE -> MySQL에서는 LIKE)
+        "ncs_code_like_search": (
+            "SELECT * FROM ncs_code WHERE LOWER(ncsSubdCdNm) LIKE LOWER(%s)",
+            (f"%{search}%",),
+        ),
+        # create_query: 세부분류 equality + dutyCd 조인
+        "ncs_skills_by_subcategory": (
+            "WITH ncs_code2 AS (SELECT dutyCd FROM ncs_code WHERE ncsSubdCdNm = %s) "
+            "SELECT gbnName, gbnVal FROM ncs_code2 c, ncs_skills s WHERE c.dutyCd = s.dutyCd",
+            (subcategory,),
+        ),
+    }
+    return queries
+
+
+def explain(cursor, query, params):
+    cursor.execute(f"EXPLAIN {query}", params)
+    names = [description[0] for description in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def time_query(cursor, query, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(query, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "repeat": repeat,
+    }
+
+
+def run(label, subcategory, search, repeat):
+    conn = connect("NCS_DB")
+    try:
+        with conn.cursor() as cursor:
+            queries = build_queries(subcategory, search)
+            # FULLTEXT 인덱스가 있으면 ngram 검색 쿼리도 함께 측정
+            if index_exists(cursor, "ncs_code", "ft_ncs_code_subd_nm"):
+                queries["ncs_code_fulltext_search"] = (
+                    "SELECT * FROM ncs_code WHERE MATCH(ncsSubdCdNm) AGAINST(%s IN BOOLEAN MODE)",
+                    (f'"{search}"',),
+                )
+            report = {"label": label, "created_at": datetime.now().isoformat(), "queries": {}}
+            for name, (query, params) in queries.items():
+                report["queries"][name] = {
+                    "explain": explain(cursor, query, params),
+                    "timing": time_query(cursor, query, params, repeat),
+                }
+                print(f"{name:<30} {report['queries'][name]['timing']['median_ms']:>10} ms (median)")
+    finally:
+        conn.close()
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, f"{label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    print(f"📄 결과 저장: {path}")
+    return path
+
+
+def compare(before_path, after_path):
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)
+
+    print(f"{'query':<30} {before['label']:>12} {after['label']:>12} {'speedup':>9}  access(before -> after)")
+    for name, result in after["queries"].items():
+        after_ms = result["timing"]["median_ms"]
+        after_access = ",".join(str(row.get("type")) for row in result["explain"])
+        if name not in before["queries"]:
+            print(f"{name:<30} {'-':>12} {after_ms:>12} {'-':>9}  - -> {after_access}")
+            continue
+        before_ms = before["queries"][name]["timing"]["median_ms"]
+        before_access = ",".join(str(row.get("type")) for row in before["queries"][name]["explain"])
+        speedup = f"{before_ms / after_ms:.1f}x" if after_ms else "-"
+        print(f"{name:<30} {before_ms:>12} {after_ms:>12} {speedup:>9}  {before_access} -> {after_access}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NCS 쿼리 EXPLAIN/실행 시간 측정")
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--subcategory", default="응용SW엔지니어링")
+    parser.add_argument("--search", default="엔지니어")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args.label, args.subcategory, args.search, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
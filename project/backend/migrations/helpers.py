@@ -0,0 +1,63 @@
+# 마이그레이션 파일에서 공통으로 사용하는 스키마 조회/인덱스 생성 함수
+
+# TEXT/BLOB 컬럼은 전체 길이로 B-tree 인덱스를 만들 수 없어 prefix 길이를 지정
+TEXT_TYPES = {"tinytext", "text", "mediumtext", "longtext", "tinyblob", "blob", "mediumblob", "longblob"}
+
+
+def table_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def index_exists(cursor, table, index_name):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (table, index_name),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def column_type(cursor, table, column):
+    cursor.execute(
+        "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column),
+    )
+    row = cursor.fetchone()
+    return row[0].lower() if row else None
+
+
+def create_index(cursor, table, index_name, columns, prefix_length=64):
+    """B-tree 인덱스 생성 (이미 있으면 건너뜀, TEXT 컬럼은 prefix 인덱스)"""
+    if index_exists(cursor, table, index_name):
+        print(f"  - {table}.{index_name} 이미 존재, 건너뜀")
+        return
+    parts = []
+    for column in columns:
+        if column_type(cursor, table, column) in TEXT_TYPES:
+            parts.append(f"`{column}`({prefix_length})")
+        else:
+            parts.append(f"`{column}`")
+    cursor.execute(f"CREATE INDEX `{index_name}` ON `{table}` ({', '.join(parts)})")
+    print(f"  - {table}.{index_name} 생성")
+
+
+def create_ngram_fulltext_index(cursor, table, index_name, columns):
+    """한국어 부분 문자열 검색용 ngram FULLTEXT 인덱스 (InnoDB, MySQL 5.7.6+)"""
+    if index_exists(cursor, table, index_name):
+        print(f"  - {table}.{index_name} 이미 존재, 건너뜀")
+        return
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    cursor.execute(f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{index_name}` ({column_list}) WITH PARSER ngram")
+    print(f"  - {table}.{index_name} (FULLTEXT ngram) 생성")
+
+
+def drop_index(cursor, table, index_name):
+    if index_exists(cursor, table, index_name):
+        cursor.execute(f"DROP INDEX `{index_name}` ON `{table}`")
+        print(f"  - {table}.{index_name} 삭제")
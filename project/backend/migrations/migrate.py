@@ -0,0 +1,136 @@
+"""NCS_DB / DART_DB 버전 관리 마이그레이션
+
+사용법 (project/backend 에서 실행):
+    python -m migrations.migrate --db NCS_DB             # 미적용 마이그레이션 모두 적용
+    python -m migrations.migrate --db NCS_DB --status    # 적용 현황
+    python -m migrations.migrate --db NCS_DB --downgrade 0002_ncs_subd_nm_fulltext
+"""
+import os
+import sys
+import argparse
+import hashlib
+import importlib.util
+import pymysql
+from dotenv import load_dotenv
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASES = ("NCS_DB", "DART_DB")
+
+
+def connect(db_name):
+    load_dotenv()
+    # 백엔드(mysql_*)와 ETL(host/USER/PASWD/port) 환경 변수 이름을 모두 지원
+    return pymysql.connect(
+        host=os.getenv('mysql_host') or os.getenv('host') or 'localhost',
+        user=os.getenv('mysql_user') or os.getenv('USER'),
+        password=os.getenv('mysql_password') or os.getenv('PASWD'),
+        port=int(os.getenv('mysql_port') or os.getenv('port') or 3306),
+        database=db_name,
+        charset='utf8mb4',
+    )
+
+
+def ensure_migration_table(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(128) PRIMARY KEY,
+        description VARCHAR(255),
+        checksum CHAR(64),
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+
+def discover(db_name):
+    """migrations/<DB>/NNNN_name.py 파일을 버전 순서대로 반환"""
+    directory = os.path.join(MIGRATIONS_DIR, db_name)
+    migrations = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(".py") or not file_name[:4].isdigit():
+            continue
+        path = os.path.join(directory, file_name)
+        version = file_name[:-3]
+        spec = importlib.util.spec_from_file_location(f"migrations.{db_name}.{version}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        with open(path, 'rb') as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        migrations.append((version, module, checksum))
+    return migrations
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def upgrade(conn, db_name):
+    with conn.cursor() as cursor:
+        ensure_migration_table(cursor)
+        applied = applied_versions(cursor)
+        pending = [m for m in discover(db_name) if m[0] not in applied]
+        if not pending:
+            print(f"✅ {db_name}: 적용할 마이그레이션이 없습니다.")
+            return
+        for version, module, checksum in pending:
+            print(f"▶ {db_name} {version}: {module.description}")
+            # MySQL DDL은 암묵적으로 커밋되므로 마이그레이션 단위로 기록
+            module.upgrade(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description, checksum) VALUES (%s, %s, %s)",
+                (version, module.description, checksum),
+            )
+            conn.commit()
+        print(f"✅ {db_name}: {len(pending)}개 마이그레이션 적용 완료")
+
+
+def downgrade(conn, db_name, target_version):
+    migrations = {version: module for version, module, _ in discover(db_name)}
+    if target_version not in migrations:
+        raise SystemExit(f"알 수 없는 마이그레이션: {target_version}")
+    with conn.cursor() as cursor:
+        ensure_migration_table(cursor)
+        if target_version not in applied_versions(cursor):
+            print(f"{target_version}은(는) 적용되지 않은 마이그레이션입니다.")
+            return
+        migrations[target_version].downgrade(cursor)
+        cursor.execute("DELETE FROM schema_migrations WHERE version = %s", (target_version,))
+        conn.commit()
+    print(f"✅ {db_name} {target_version} 되돌림 완료")
+
+
+def status(conn, db_name):
+    with conn.cursor() as cursor:
+        ensure_migration_table(cursor)
+        applied = applied_versions(cursor)
+    for version, module, checksum in discover(db_name):
+        if version not in applied:
+            state = "pending"
+        elif applied[version] != checksum:
+            state = "applied (파일 변경됨)"
+        else:
+            state = "applied"
+        print(f"{version:<40} {state:<22} {module.description}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NCS_DB / DART_DB 마이그레이션")
+    parser.add_argument("--db", choices=DATABASES, required=True)
+    parser.add_argument("--status", action="store_true", help="적용 현황만 출력")
+    parser.add_argument("--downgrade", metavar="VERSION", help="지정한 마이그레이션 되돌리기")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    try:
+        if args.status:
+            status(conn, args.db)
+        elif args.downgrade:
+            downgrade(conn, args.db, args.downgrade)
+        else:
+            upgrade(conn, args.db)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
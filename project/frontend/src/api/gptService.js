@@ -2,12 +2,13 @@ import axios from "axios";
 
 const HOST_IP = process.env.REACT_APP_HOST_IP;
 
-export const getInterviewResponse = async (userAnswer, companyname, subcategory) => {
+export const getInterviewResponse = async (userAnswer, companyname, subcategory, sessionId) => {
   try {
     const response = await axios.post(`https://${HOST_IP}:8000/interview`, {
       answer: String(userAnswer),
       companyname: String(companyname),
       subcategory: String(subcategory),
+      session_id: sessionId,
     });
     return response.data.response;
   } catch (error) {
@@ -17,14 +18,125 @@ export const getInterviewResponse = async (userAnswer, companyname, subcategory)
 };
 
 
-export const getInterviewFeedback = async (conversationText) => {
+const FEEDBACK_POLL_INTERVAL_MS = 1500;
+const FEEDBACK_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// 이미 등록된 피드백 작업이 완료될 때까지 polling
+export const waitForFeedbackJob = async (jobId) => {
+  try {
+    const deadline = Date.now() + FEEDBACK_POLL_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+      const { data: job } = await axios.get(`https://${HOST_IP}:8000/interview-feedback/${jobId}`);
+      if (job.status === "done") {
+        return job.feedback;
+      }
+      if (job.status === "error") {
+        throw new Error(job.error || "피드백 생성 실패");
+      }
+      await sleep(FEEDBACK_POLL_INTERVAL_MS);
+    }
+    throw new Error("피드백 생성 시간 초과");
+  } catch (error) {
+    console.error("FastAPI 피드백 받기 오류:", error);
+    throw error;
+  }
+};
+
+// 피드백은 백그라운드 작업으로 생성되므로 job_id를 받은 뒤 완료될 때까지 polling
+export const getInterviewFeedback = async (conversationText, sessionId) => {
   try {
     const response = await axios.post(`https://${HOST_IP}:8000/interview-feedback`, {
       conversation: conversationText,
+      session_id: sessionId,
     });
-    return response.data.feedback;
+    return await waitForFeedbackJob(response.data.job_id);
   } catch (error) {
-    console.error("FastAPI 피드백 받기 오류:", error);
+    console.error("FastAPI 피드백 요청 오류:", error);
     throw error;
   }
-};
\ No newline at end of file
+};
+
+
+// 면접 1회를 하나의 WebSocket 연결로 처리 (질문 토큰 스트리밍 + 피드백 진행 상황 push)
+export const openInterviewChannel = ({ companyname, subcategory, sessionId }) => {
+  const socket = new WebSocket(`wss://${HOST_IP}:8000/ws/interview`);
+  let pending = null;
+
+  const settle = (action, value) => {
+    if (pending) {
+      const current = pending;
+      pending = null;
+      current[action](value);
+    }
+  };
+
+  const ready = new Promise((resolve, reject) => {
+    socket.onopen = () => {
+      socket.send(
+        JSON.stringify({
+          type: "start",
+          companyname: String(companyname),
+          subcategory: String(subcategory),
+          session_id: sessionId,
+        })
+      );
+    };
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      switch (message.type) {
+        case "ready":
+          resolve();
+          break;
+        case "token":
+          pending?.onToken?.(message.content);
+          break;
+        case "question":
+          settle("resolve", message.content);
+          break;
+        case "feedback_submitted":
+          pending?.onSubmitted?.(message.job_id);
+          break;
+        case "feedback_status":
+          pending?.onStatus?.(message.status);
+          break;
+        case "feedback":
+          settle("resolve", message.feedback);
+          break;
+        case "error":
+          settle("reject", new Error(message.detail));
+          break;
+        default:
+          break;
+      }
+    };
+    socket.onerror = () => reject(new Error("WebSocket 연결 오류"));
+    socket.onclose = () => {
+      reject(new Error("WebSocket 연결 종료"));
+      settle("reject", new Error("WebSocket 연결 종료"));
+    };
+  });
+
+  // 아무도 기다리지 않을 때 연결이 닫혀도 unhandled rejection이 나지 않도록 처리
+  ready.catch(() => {});
+
+  const request = async (payload, handlers) => {
+    await ready;
+    if (pending) {
+      throw new Error("이전 요청이 아직 처리 중입니다.");
+    }
+    return new Promise((resolve, reject) => {
+      pending = { resolve, reject, ...handlers };
+      socket.send(JSON.stringify(payload));
+    });
+  };
+
+  return {
+    sendAnswer: (answer, onToken) => request({ type: "answer", answer: String(answer) }, { onToken }),
+    // onSubmitted(job_id): 서버에 작업이 등록되면 호출 (연결이 끊겨도 같은 작업을 조회할 수 있도록)
+    requestFeedback: (conversation, { onSubmitted, onStatus } = {}) =>
+      request({ type: "feedback", conversation }, { onSubmitted, onStatus }),
+    close: () => socket.close(),
+  };
+};
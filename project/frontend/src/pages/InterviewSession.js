@@ -1,7 +1,12 @@
 import React, { useState, useEffect, useRef } from "react";
 import { useLocation, useNavigate } from "react-router-dom";
 import SpeechRecognitionComponent from "../components/SpeechRecognition";
-import { getInterviewResponse, getInterviewFeedback } from "../api/gptService";
+import {
+  getInterviewResponse,
+  getInterviewFeedback,
+  waitForFeedbackJob,
+  openInterviewChannel,
+} from "../api/gptService";
 import "./InterviewSession.css";
 
 const INTERVIEW_TIME = 60;
@@ -29,6 +34,10 @@ const InterviewSession = () => {
 
   const chatBoxRef = useRef(null);
   const videoRef = useRef(null);
+  // 면접 세션 식별자 (백엔드 사용량 집계용)
+  const sessionIdRef = useRef(crypto.randomUUID());
+  // 면접 전체에서 하나의 WebSocket 연결을 재사용
+  const channelRef = useRef(null);
   const navigate = useNavigate();
 
   const { startListening, stopListening, resetTranscript } = SpeechRecognitionComponent({
@@ -36,6 +45,17 @@ const InterviewSession = () => {
   });
 
 
+  // 면접 채널 연결
+  useEffect(() => {
+    const channel = openInterviewChannel({
+      companyname: company,
+      subcategory: job,
+      sessionId: sessionIdRef.current,
+    });
+    channelRef.current = channel;
+    return () => channel.close();
+  }, [company, job]);
+
   // 채팅창 자동 스크롤
   useEffect(() => {
     if (chatBoxRef.current) {
@@ -67,7 +87,7 @@ const InterviewSession = () => {
   // 봇 메시지 TTS
   useEffect(() => {
     const lastMessage = conversation[conversation.length - 1];
-    if (lastMessage && lastMessage.role === "bot") {
+    if (lastMessage && lastMessage.role === "bot" && !lastMessage.streaming) {
       const utterance = new SpeechSynthesisUtterance(lastMessage.text);
       utterance.lang = "ko-KR";
       utterance.rate = 1.1;
@@ -82,7 +102,21 @@ const InterviewSession = () => {
       .map((msg) => (msg.role === "user" ? "면접자: " : "면접관: ") + msg.text)
       .join("\n");
     try {
-      const feedbackResponse = await getInterviewFeedback(conversationText);
+      let feedbackResponse;
+      let jobId = null;
+      try {
+        feedbackResponse = await channelRef.current.requestFeedback(conversationText, {
+          onSubmitted: (submittedJobId) => {
+            jobId = submittedJobId;
+          },
+        });
+      } catch (channelError) {
+        console.error("WebSocket 피드백 오류:", channelError);
+        // 채널로 작업이 이미 등록됐으면 같은 작업을 조회하고, 등록 전에 실패한 경우에만 새로 요청
+        feedbackResponse = jobId
+          ? await waitForFeedbackJob(jobId)
+          : await getInterviewFeedback(conversationText, sessionIdRef.current);
+      }
       navigate("/interview-results", { state: { feedback: feedbackResponse, conversation } });
     } catch (error) {
       console.error("피드백 요청 오류:", error);
@@ -115,9 +149,21 @@ const InterviewSession = () => {
       return;
     }
 
-    // 새 질문 생성
-    const botResponse = await getInterviewResponse(currentAnswer, company, job);
-    setConversation((prev) => [...prev, { role: "bot", text: botResponse }]);
+    // 새 질문 생성 (WebSocket 토큰 스트리밍, 실패 시 HTTP 요청으로 대체)
+    let botResponse;
+    setConversation((prev) => [...prev, { role: "bot", text: "", streaming: true }]);
+    try {
+      botResponse = await channelRef.current.sendAnswer(currentAnswer, (token) => {
+        setConversation((prev) => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, text: last.text + token }];
+        });
+      });
+    } catch (channelError) {
+      console.error("WebSocket 질문 생성 오류:", channelError);
+      botResponse = await getInterviewResponse(currentAnswer, company, job, sessionIdRef.current);
+    }
+    setConversation((prev) => [...prev.slice(0, -1), { role: "bot", text: botResponse }]);
     setQuestionCount((prev) => prev + 1);
     setIsLoading(false);
 